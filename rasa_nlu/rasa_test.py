@@ -101,6 +101,21 @@ class RasaInference:
         Returns:
             List of prediction results
         """
+        try:
+            # One NLU graph run for the whole list
+            from rasa.core.channels.channel import UserMessage
+            from rasa.engine.constants import PLACEHOLDER_MESSAGE, PLACEHOLDER_TRACKER
+
+            processor = self.agent.processor
+            target = processor.model_metadata.nlu_target
+            outputs = processor.graph_runner.run(
+                inputs={PLACEHOLDER_MESSAGE: [UserMessage(text) for text in texts], PLACEHOLDER_TRACKER: None},
+                targets=[target]
+            )
+            return [message.as_dict(only_output_properties=True) for message in outputs[target]]
+        except Exception as e:
+            print(f"Batched prediction failed ({e}), predicting one by one")
+
         results = []
         for text in texts:
             try:
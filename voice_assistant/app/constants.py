@@ -5,6 +5,13 @@ TOPIC = "home/livingroom/light"
 
 # Model paths
 RASA_MODEL_PATH = "app/modules/intent/rasa_models/nlu-20251012-114449-snowy-dimension.tar.gz"
+FAST_INTENT_MODEL_PATH = "app/modules/intent/fast_models/fast_intent.bin"
+
+# Per-intent fallback thresholds written by tools/optimize_thresholds.py
+INTENT_THRESHOLDS_PATH = "app/modules/intent/intent_thresholds.json"
+
+# Rasa training data, compiled by the grammar fast path
+NLU_DATA_PATH = "../rasa_nlu/data/nlu.yml"
 
 # TTS model paths
 PIPER_MODELS = {
@@ -15,4 +22,19 @@ PIPER_MODELS = {
         "ryan_high": "en_US-ryan-high.onnx"
     },
     "default_voice": "lessac_medium"
-}
\ No newline at end of file
+}
+
+# Batch intent processing
+BATCH_MAX_ITEMS = 5000      # utterances accepted per batch request
+BATCH_CHUNK_SIZE = 64       # utterances per batched Rasa inference call
+
+# Streaming responses
+STREAM_AUDIO_CHUNK_BYTES = 16384    # PCM bytes per streamed audio chunk
+
+# Worker threads per blocking pipeline stage (overridable via settings.executors)
+EXECUTOR_WORKERS = {
+    "intent": 2,    # local intent model (Rasa)
+    "llm": 8,       # LLM HTTP calls, mostly waiting on the network
+    "actions": 4,   # action handlers / MQTT publish
+    "tts": 1        # synthesis + playback share one output device
+}
@@ -0,0 +1,197 @@
+"""
+Admission control and backpressure for the voice pipeline.
+Bounds how many requests are inside the pipeline (with a bounded wait queue
+in front) and how many calls each blocking stage runs at once. Under
+overload requests are shed quickly instead of all timing out together.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Callable, Iterable, Optional
+from starlette.responses import JSONResponse
+from app.constants import EXECUTOR_WORKERS
+from app.core.metrics import gauge, counter
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_QUEUE_DEPTH = gauge("voice_admission_queue_depth", "Requests waiting for a pipeline slot")
+ADMISSION_REJECTED = counter("voice_admission_rejected_total", "Requests shed by admission control", ["reason"])
+STAGE_QUEUE_DEPTH = gauge("voice_stage_queue_depth", "Calls waiting for a stage slot", ["stage"])
+STAGE_IN_FLIGHT = gauge("voice_stage_in_flight", "Calls running in a stage", ["stage"])
+
+
+class BusyError(Exception):
+    """Raised when a request cannot be admitted."""
+
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(f"Server busy: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Pipeline-wide and per-stage concurrency limits."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        admission_config = self.config.get('settings', {}).get('admission', {}) or {}
+        executor_config = self.config.get('settings', {}).get('executors', {}) or {}
+
+        self.enabled = admission_config.get('enabled', True)
+        self.max_in_flight = admission_config.get('max_in_flight', 8)
+        self.max_queue = admission_config.get('max_queue', 16)
+        self.queue_timeout = admission_config.get('queue_timeout', 2.0)
+
+        # stage limits default to the executor sizes so executor queues never grow
+        self.stage_limits = dict(EXECUTOR_WORKERS)
+        self.stage_limits.update(executor_config)
+        self.stage_limits.update(admission_config.get('stage_limits', {}) or {})
+
+        busy_config = admission_config.get('busy_speech', {}) or {}
+        self.busy_speech_enabled = busy_config.get('enabled', False)
+        self.busy_speech_text = busy_config.get('text', "I'm a bit busy right now, please try again in a moment.")
+        self.busy_speech_interval = busy_config.get('min_interval', 10.0)
+        self._last_busy_speech = 0.0
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        # created lazily so they bind to the server's event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stage_slots: Dict[str, asyncio.Semaphore] = {}
+        self._stage_waiting: Dict[str, int] = {}
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        ADMISSION_REJECTED.labels(reason=reason).inc()
+        logger.warning(f"Request rejected: {reason} (in flight: {self.in_flight}, waiting: {self.waiting})")
+        raise BusyError(reason, retry_after=self.queue_timeout)
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold a pipeline slot for the duration of a request, or raise BusyError."""
+        if not self.enabled:
+            yield
+            return
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self._reject("queue_full")
+            self.waiting += 1
+            ADMISSION_QUEUE_DEPTH.set(self.waiting)
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject("queue_timeout")
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUE_DEPTH.set(self.waiting)
+        else:
+            await self._slots.acquire()
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    @asynccontextmanager
+    async def stage(self, stage: str):
+        """Hold one of the stage's slots while a blocking call runs."""
+        if not self.enabled or stage not in self.stage_limits:
+            yield
+            return
+
+        slots = self._stage_slots.get(stage)
+        if slots is None:
+            slots = self._stage_slots[stage] = asyncio.Semaphore(self.stage_limits[stage])
+
+        self._stage_waiting[stage] = self._stage_waiting.get(stage, 0) + 1
+        STAGE_QUEUE_DEPTH.labels(stage=stage).inc()
+        try:
+            await slots.acquire()
+        finally:
+            self._stage_waiting[stage] -= 1
+            STAGE_QUEUE_DEPTH.labels(stage=stage).dec()
+
+        STAGE_IN_FLIGHT.labels(stage=stage).inc()
+        try:
+            yield
+        finally:
+            STAGE_IN_FLIGHT.labels(stage=stage).dec()
+            slots.release()
+
+    def should_speak_busy(self) -> bool:
+        """Rate-limited check for announcing overload on the speaker."""
+        if not self.busy_speech_enabled:
+            return False
+        now = time.monotonic()
+        if now - self._last_busy_speech < self.busy_speech_interval:
+            return False
+        self._last_busy_speech = now
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "stage_limits": self.stage_limits,
+            "stage_waiting": dict(self._stage_waiting)
+        }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware admitting pipeline requests through the controller.
+    Wraps the whole response, so streamed bodies keep their slot until done.
+    """
+
+    def __init__(self, app, paths: Iterable[str], on_busy: Optional[Callable[[BusyError], None]] = None):
+        self.app = app
+        self.paths = set(paths)
+        self.on_busy = on_busy
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        admission = get_admission_controller()
+        started = False
+        try:
+            async with admission.admit():
+                started = True
+                await self.app(scope, receive, send)
+        except BusyError as e:
+            if started:
+                raise
+            if self.on_busy:
+                self.on_busy(e)
+            response = JSONResponse(
+                status_code=429,
+                content={"success": False, "error": "busy", "reason": e.reason},
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+            )
+            await response(scope, receive, send)
+
+
+# Global admission controller instance
+_admission_controller = None
+
+def get_admission_controller(config: Optional[Dict[str, Any]] = None) -> AdmissionController:
+    """Get or create the global admission controller instance."""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(config)
+    return _admission_controller
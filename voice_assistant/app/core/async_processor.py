@@ -0,0 +1,194 @@
+"""
+Async request pipeline for the API server.
+Same flow as RequestProcessor, but every stage is awaited and blocking
+module calls run on dedicated executors so concurrent requests overlap.
+"""
+
+import asyncio
+from app.core.processor import RequestProcessor
+from app.core.executors import run_blocking, iterate_blocking
+from app.core.speculation import get_speculator, StartGate
+from app.core.tracing import span
+from app.core.intent_router import get_intent_router, recognize_async
+from app.constants import STREAM_AUDIO_CHUNK_BYTES
+from app.modules.tts.playback import get_playback_worker
+import logging as log
+logger = log.getLogger(__name__)
+
+
+class AsyncRequestProcessor(RequestProcessor):
+
+    async def process_intent(self):
+        # Repeated commands skip NLU entirely
+        if self._apply_cached_result():
+            return
+
+        # Speculatively start the LLM call so a fallback does not wait for the earlier tiers first
+        speculator = get_speculator()
+        llm_task = None
+        router = get_intent_router()
+        if self.llm_module and router.can_speculate(self._tier_modules()) and speculator.should_speculate(self.text):
+            logger.info(f"{self.log_tag} Speculative LLM call started")
+            gate = StartGate()
+            llm_task = speculator.launched(asyncio.ensure_future(self._recognize_llm(speculative=True, gate=gate)), gate)
+
+        route = None
+        try:
+            # Intent tiers in order (local, then LLM by default) until one is confident enough
+            route = await router.route_async(self.text, self._tier_modules(), self.context, speculative=llm_task)
+            self._apply_route(route)
+        finally:
+            if llm_task and not (route and route.speculative_used):
+                logger.info(f"{self.log_tag} Speculative LLM call discarded")
+                speculator.discard(llm_task)
+
+        self._cache_result()
+
+        return
+
+    async def _recognize_llm(self, speculative=False, gate=None):
+        with span("intent.llm", speculative=speculative) as stage:
+            result = await recognize_async(self.llm_module, self.text, "llm", self.context, gate)
+            self._annotate(stage, intent=result.get("intent", ""), confidence=result.get("confidence", 0))
+            return result
+
+    async def process_action(self):
+        """Execute action based on detected intent."""
+        if not self._should_execute_action():
+            return
+
+        try:
+            with span("action", intent=self.intent) as stage:
+                action_result = await run_blocking("actions", self.action_module.execute_action, self.intent, self.entities, **self.context)
+                self._apply_action_result(action_result)
+                self._annotate(stage, success=bool(self.action_result))
+
+        except Exception as e:
+            self._apply_action_error(e)
+
+        return
+
+    async def process_speechresponse(self, speech_text=None):
+        """Generate speech response based on action result or provided text."""
+        if speech_text:
+            self.speech_text = speech_text
+        if not self.speech_text:
+            self.speech_text = "Something went wrong. Try again later."
+
+        # Synthesis and playback both block, keep them on the tts executor
+        if self.tts_module:
+            try:
+                with span("tts", chars=len(self.speech_text)):
+                    tts_result = await run_blocking("tts", self.tts_module.speak, self.speech_text)
+                    self._log_tts_result(tts_result)
+            except Exception as e:
+                logger.error(f"{self.log_tag} TTS error: {str(e)}")
+
+        self.save_to_db()
+        return { "success": True }
+
+    async def process_stream(self, play_local=False):
+        """
+        Run the pipeline, yielding (event, data) pairs as each stage finishes:
+        intent, action, speech, audio_format, audio (PCM bytes) and done.
+        """
+        await self.process_intent()
+        yield "intent", {
+            "intent": self.intent,
+            "confidence": self.confidence,
+            "entities": self.entities,
+            "llm_fallback_used": self.llm_fallback_used,
+            "answered_by": self.answered_by,
+            "cache_hit": self.cache_hit
+        }
+
+        await self.process_action()
+        yield "action", {"action_result": self.action_result}
+
+        if not self.speech_text:
+            self.speech_text = "Something went wrong. Try again later."
+        yield "speech", {"text": self.speech_text}
+
+        if not self.tts_module:
+            self.save_to_db()
+            yield "done", {"success": True, "audio": False}
+            return
+
+        playback_worker = get_playback_worker() if play_local else None
+        audio_format_sent = False
+        try:
+            with span("tts", chars=len(self.speech_text), streaming=True):
+                async for clip in iterate_blocking("tts", self.tts_module.synthesize_stream, self.speech_text):
+                    if not audio_format_sent:
+                        audio_format_sent = True
+                        yield "audio_format", {
+                            "encoding": "pcm_s16le",
+                            "sample_rate": clip.sample_rate,
+                            "channels": clip.channels,
+                            "sample_width": clip.sample_width
+                        }
+                    if playback_worker:
+                        playback_worker.enqueue(clip)
+                    for start in range(0, len(clip.pcm), STREAM_AUDIO_CHUNK_BYTES):
+                        yield "audio", clip.pcm[start:start + STREAM_AUDIO_CHUNK_BYTES]
+        except NotImplementedError as e:
+            logger.warning(f"{self.log_tag} {str(e)}")
+        except Exception as e:
+            logger.error(f"{self.log_tag} TTS stream error: {str(e)}")
+            yield "error", {"stage": "tts", "error": str(e)[:900]}
+
+        self.save_to_db()
+        yield "done", {"success": True, "audio": audio_format_sent}
+
+    @staticmethod
+    def _annotate(stage, **attributes):
+        if stage is not None:
+            for key, value in attributes.items():
+                stage.set_attribute(key, value)
+
+    async def process(self):
+        """Run the full intent -> action -> speech pipeline."""
+        await self.process_intent()
+        await self.process_action()
+        return await self.process_speechresponse()
+
+
+async def process_batch(texts, intent_module, llm_intent, action_module, tts_module, context=None, execute_actions=True, speak=False):
+    """
+    Run many utterances through the pipeline.
+
+    Each intent tier gets one batched recognize_intents call for the
+    utterances still unanswered, LLM fallbacks for the low-confidence subset
+    run concurrently, and TTS is optional. Returns the processors in input order.
+    """
+    context = context or {}
+    processors = []
+    for text in texts:
+        processor = AsyncRequestProcessor(text, intent_module, llm_intent, action_module, tts_module)
+        processor.context = context
+        processors.append(processor)
+
+    # cached utterances skip the intent tiers
+    pending = [p for p in processors if not p._apply_cached_result()]
+
+    if pending:
+        # LLM fallbacks overlap, bounded by the llm executor size
+        routes = await get_intent_router().route_batch([p.text for p in pending], pending[0]._tier_modules(), context)
+        for processor, route in zip(pending, routes):
+            processor._apply_route(route)
+
+    for processor in pending:
+        processor._cache_result()
+
+    if execute_actions and action_module:
+        await asyncio.gather(*(p.process_action() for p in processors))
+
+    if speak:
+        # one output device, speak in order
+        for processor in processors:
+            await processor.process_speechresponse()
+
+    for processor in processors:
+        processor.save_to_db()
+
+    return processors
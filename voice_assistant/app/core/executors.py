@@ -0,0 +1,95 @@
+"""
+Dedicated thread pools for blocking module calls.
+Keeps Rasa inference, LLM requests and TTS synthesis/playback off the event loop.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, Callable, Iterator, Optional
+from app.constants import EXECUTOR_WORKERS
+from app.core.admission import get_admission_controller
+
+logger = logging.getLogger(__name__)
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_workers: Dict[str, int] = dict(EXECUTOR_WORKERS)
+_lock = threading.Lock()
+
+
+def configure_executors(config: Optional[Dict[str, Any]] = None):
+    """Apply worker counts from settings.executors. Must run before first use."""
+    config = config or {}
+    overrides = config.get('settings', {}).get('executors', {}) or {}
+    for stage, workers in overrides.items():
+        _workers[stage] = int(workers)
+    logger.info(f"Executor workers: {_workers}")
+
+
+def get_executor(stage: str) -> ThreadPoolExecutor:
+    """Get (or lazily create) the thread pool for a pipeline stage."""
+    executor = _executors.get(stage)
+    if executor is None:
+        with _lock:
+            executor = _executors.get(stage)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=_workers.get(stage, 1),
+                    thread_name_prefix=f"va-{stage}"
+                )
+                _executors[stage] = executor
+    return executor
+
+
+async def run_blocking(stage: str, func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking call on the stage's executor and await its result."""
+    loop = asyncio.get_running_loop()
+    # carry the current trace/span into the worker thread
+    context = contextvars.copy_context()
+    async with get_admission_controller().stage(stage):
+        return await loop.run_in_executor(get_executor(stage), functools.partial(context.run, func, *args, **kwargs))
+
+
+async def iterate_blocking(stage: str, func: Callable[..., Iterator], *args, **kwargs) -> AsyncIterator[Any]:
+    """Drive a blocking generator on the stage's executor, yielding items as they are produced."""
+    loop = asyncio.get_running_loop()
+    items: asyncio.Queue = asyncio.Queue()
+    done = object()
+    cancelled = threading.Event()
+
+    def produce():
+        try:
+            for item in func(*args, **kwargs):
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(items.put_nowait, item)
+        except Exception as e:
+            loop.call_soon_threadsafe(items.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(items.put_nowait, done)
+
+    context = contextvars.copy_context()
+    async with get_admission_controller().stage(stage):
+        loop.run_in_executor(get_executor(stage), context.run, produce)
+        try:
+            while True:
+                item = await items.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # consumer went away (client disconnected): stop producing
+            cancelled.set()
+
+
+def shutdown_executors(wait: bool = False):
+    """Shut down all stage executors."""
+    with _lock:
+        for stage, executor in _executors.items():
+            executor.shutdown(wait=wait)
+        _executors.clear()
@@ -0,0 +1,182 @@
+"""
+Shared HTTP client for outbound API calls (LLM providers).
+One httpx.AsyncClient with a keep-alive connection pool lives on its own
+background loop, so async callers and blocking callers on executor threads
+reuse the same warm connections. HTTP/2 is used when the h2 package is
+installed. Connections to known origins can be opened ahead of the first
+request and kept from going idle, so a fallback does not pay TCP and TLS
+handshakes.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import ssl
+import time
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+from app.core.loop_thread import get_background_loop
+from app.core.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+HTTP_REQUESTS = counter("voice_http_client_requests_total", "Requests sent by the shared HTTP client", ["host", "http_version"])
+HTTP_ERRORS = counter("voice_http_client_errors_total", "Shared HTTP client request failures", ["host"])
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class SharedHttpClient:
+    """Pooled keep-alive AsyncClient on the "va-http" background loop."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        client_config = self.config.get('settings', {}).get('http_client', {}) or {}
+        self.http2 = client_config.get('http2', True) and HTTP2_AVAILABLE
+        self.max_connections = client_config.get('max_connections', 20)
+        self.max_keepalive = client_config.get('max_keepalive_connections', 10)
+        self.keepalive_expiry = client_config.get('keepalive_expiry', 120.0)
+        self.connect_timeout = client_config.get('connect_timeout', 3.0)
+        self.timeout = client_config.get('timeout', 5.0)
+        # CA bundle for private endpoints (a local mock provider with a self-signed cert)
+        self.ca_file = client_config.get('ca_file')
+        # connections opened per origin by prewarm(); HTTP/2 multiplexes over one
+        self.prewarm_connections = client_config.get('prewarm_connections', 2)
+        # re-touch warmed origins this often so the pool keeps them open (0 = off)
+        self.keepwarm_interval = client_config.get('keepwarm_interval', 0)
+
+        self._background = get_background_loop("va-http")
+        self._client = None
+        self._origins: List[str] = []
+        self._keepwarm_task = None
+
+        self.requests = 0
+        self.errors = 0
+        self.prewarms = 0
+        self.http_versions: Dict[str, int] = {}
+
+    def _create_client(self):
+        import httpx
+        verify = ssl.create_default_context(cafile=self.ca_file) if self.ca_file else True
+        return httpx.AsyncClient(
+            http2=self.http2,
+            verify=verify,
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry
+            )
+        )
+
+    async def _get_client(self):
+        # created on the client loop, the pool belongs to it
+        if self._client is None:
+            self._client = self._create_client()
+            logger.info(f"Shared HTTP client created (http2={self.http2})")
+        return self._client
+
+    async def _request(self, method: str, url: str, **kwargs):
+        client = await self._get_client()
+        host = urlsplit(url).hostname or ""
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.errors += 1
+            HTTP_ERRORS.labels(host=host).inc()
+            raise
+        self.requests += 1
+        self.http_versions[response.http_version] = self.http_versions.get(response.http_version, 0) + 1
+        HTTP_REQUESTS.labels(host=host, http_version=response.http_version).inc()
+        return response
+
+    def request(self, method: str, url: str, **kwargs):
+        """Blocking request for executor threads; returns the httpx.Response."""
+        return self._background.run(self._request(method, url, **kwargs))
+
+    async def arequest(self, method: str, url: str, **kwargs):
+        """Request from any event loop; the call itself runs on the client loop."""
+        return await self._background.run_async(self._request(method, url, **kwargs))
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs):
+        return await self.arequest("POST", url, **kwargs)
+
+    async def _touch(self, origin: str):
+        """Cheap request that leaves a pooled connection behind; the status does not matter."""
+        try:
+            await self._request("HEAD", origin + "/")
+        except Exception as e:
+            logger.warning(f"Pre-warming {origin} failed: {str(e)}")
+
+    async def _prewarm(self, origins: List[str]) -> float:
+        start = time.perf_counter()
+        count = 1 if self.http2 else self.prewarm_connections
+        await asyncio.gather(*(self._touch(origin) for origin in origins for _ in range(count)))
+        self.prewarms += 1
+        return time.perf_counter() - start
+
+    def prewarm(self, urls: List[str], wait: bool = True) -> Optional[float]:
+        """Open connections to the origins of these URLs. Returns the seconds spent when waiting."""
+        for origin in {origin_of(url) for url in urls}:
+            if origin not in self._origins:
+                self._origins.append(origin)
+        future = self._background.submit(self._prewarm(list(self._origins)))
+        if self.keepwarm_interval and self._keepwarm_task is None:
+            self._keepwarm_task = self._background.submit(self._keepwarm())
+        if not wait:
+            return None
+        seconds = future.result(self.connect_timeout + self.timeout)
+        logger.info(f"Pre-warmed {self._origins} in {seconds * 1000:.1f} ms")
+        return seconds
+
+    async def _keepwarm(self):
+        while True:
+            await asyncio.sleep(self.keepwarm_interval)
+            await asyncio.gather(*(self._touch(origin) for origin in self._origins))
+
+    async def _close(self):
+        if self._keepwarm_task is not None:
+            self._keepwarm_task.cancel()
+            self._keepwarm_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def close(self):
+        if self._background.running:
+            self._background.run(self._close(), timeout=5)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "origins": self._origins,
+            "requests": self.requests,
+            "errors": self.errors,
+            "prewarms": self.prewarms,
+            "http_versions": dict(self.http_versions)
+        }
+
+
+# Global client instance
+_http_client = None
+
+def get_http_client(config: Optional[Dict[str, Any]] = None) -> SharedHttpClient:
+    """Get or create the global shared HTTP client."""
+    global _http_client
+    if _http_client is None:
+        _http_client = SharedHttpClient(config)
+    return _http_client
+
+def stop_http_client():
+    global _http_client
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
@@ -0,0 +1,113 @@
+"""
+Intent result cache.
+Maps a normalized utterance (plus the loaded model versions) to the resolved
+intent so repeated commands skip both NLU tiers. LRU eviction with a TTL.
+"""
+
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from app.core.metrics import CACHE_HITS, CACHE_MISSES
+
+# Words that do not change the meaning of a command
+FILLER_WORDS = {"please", "um", "umm", "uh", "uhh", "uhm", "erm", "er", "hmm", "kindly", "just"}
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s']")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and filler words: 'Um, turn ON the lights please!' -> 'turn on the lights'."""
+    text = text.lower().replace("’", "'")
+    text = _PUNCTUATION_RE.sub(" ", text)
+    words = _SPACE_RE.sub(" ", text).strip().split(" ")
+    kept = [word for word in words if word not in FILLER_WORDS]
+    # an utterance made only of fillers keeps its words
+    return " ".join(kept or words)
+
+
+class IntentCache:
+    """LRU + TTL cache of resolved intent results."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        cache_config = self.config.get('settings', {}).get('intent_cache', {}) or {}
+        self.enabled = cache_config.get('enabled', True)
+        self.max_entries = cache_config.get('max_entries', 1024)
+        self.ttl = cache_config.get('ttl', 3600)
+        # LLM answers to general questions ("what's the weather") go stale
+        self.cache_direct_responses = cache_config.get('cache_direct_responses', False)
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, text: str, model_version: str = "") -> Optional[Dict[str, Any]]:
+        """Cached result for the utterance, or None."""
+        if not self.enabled:
+            return None
+        key = (normalize_text(text), model_version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                CACHE_MISSES.inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        CACHE_HITS.inc()
+        return copy.deepcopy(entry[1])
+
+    def put(self, text: str, model_version: str, result: Dict[str, Any]):
+        if not self.enabled:
+            return
+        if result.get("intent") == "direct_response" and not self.cache_direct_responses:
+            return
+        key = (normalize_text(text), model_version)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry (model reloaded)."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+# Global intent cache instance
+_intent_cache = None
+
+def get_intent_cache(config: Optional[Dict[str, Any]] = None) -> IntentCache:
+    """Get or create the global intent cache instance."""
+    global _intent_cache
+    if _intent_cache is None:
+        _intent_cache = IntentCache(config)
+    return _intent_cache
@@ -0,0 +1,343 @@
+"""
+Cascading intent router.
+Tries the intent tiers from settings.intent_router in order (e.g. grammar ->
+linear model -> Rasa -> LLM) until one answers with enough confidence, and
+records which tier answered. Each tier names a module from the config and
+can set its own threshold, latency budget and short-circuit rules:
+
+    intent_router:
+      tiers:
+        - module: local_intent      # per-intent thresholds when threshold is omitted
+          budget_ms: 300
+        - module: llm_intent
+          final: true               # its answer is taken whatever it is
+
+Without tiers in the config the router runs the two-tier local -> LLM cascade.
+
+budget_ms bounds how long a request waits for a tier. Only tiers with a
+native async path are actually stopped when it runs out; a blocking module
+keeps running on its executor thread (and holds that stage slot) until it
+returns, so a budget there protects the request's latency, not the executor.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from app.modules.intent.intents import OUT_OF_SCOPE, DEVICE_INTENTS
+from app.modules.intent.gazetteer import get_gazetteer
+from app.modules.intent.base import BaseIntent
+from app.core.intent_thresholds import get_intent_thresholds
+from app.core.executors import run_blocking
+from app.core.speculation import get_speculator, StartGate
+from app.core.tracing import span
+from app.core.metrics import counter, LLM_FALLBACKS
+
+logger = logging.getLogger(__name__)
+
+TIER_OUTCOMES = counter("voice_intent_tier_outcomes_total", "Intent tier attempts by outcome", ["tier", "outcome"])
+TIER_ANSWERS = counter("voice_intent_answered_total", "Requests answered per intent tier", ["tier"])
+
+DEFAULT_TIERS = [
+    {"module": "local_intent"},
+    {"module": "llm_intent", "final": True}
+]
+
+# span names of the original two tiers, kept so stage timings stay comparable
+TIER_SPANS = {"local_intent": "intent.local", "llm_intent": "intent.llm"}
+
+# the tier a speculative LLM call stands in for
+LLM_TIER = "llm_intent"
+
+ACCEPTED = "accepted"
+
+
+def has_native_async(module: Any) -> bool:
+    """True when the module awaits its own I/O instead of needing an executor thread."""
+    return type(module).recognize_intent_async is not BaseIntent.recognize_intent_async
+
+
+async def recognize_async(module: Any, text: str, executor: Optional[str] = None,
+                          context: Optional[Dict[str, Any]] = None,
+                          gate: Optional[StartGate] = None, native: bool = True) -> Dict[str, Any]:
+    """
+    Await a module's intent, on the given executor if it only has a blocking
+    path (or always, with native=False).
+    """
+    context = context or {}
+    if executor and not (native and has_native_async(module)):
+        call = gate.wrap(module.recognize_intent) if gate is not None else module.recognize_intent
+        return await run_blocking(executor, call, text, **context)
+    if gate is not None and not gate.start():
+        raise asyncio.CancelledError()
+    return await module.recognize_intent_async(text, **context)
+
+
+class IntentTier:
+    """One step of the cascade and the rules for accepting its answer."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.module = spec['module']
+        self.name = spec.get('name', self.module)
+        # None: per-intent thresholds from intent_thresholds.json
+        self.threshold = spec.get('threshold')
+        self.budget_ms = spec.get('budget_ms')
+        self.final = spec.get('final', False)
+        # short-circuit rules: accepted at any confidence / never accepted from this tier
+        self.accept_intents = set(spec.get('accept_intents', []) or [])
+        self.pass_intents = set(spec.get('pass_intents', []) or [])
+        # an explicit executor runs the module's blocking call there even if it has an async path;
+        # without one, modules lacking an async path use "llm" on the final tier (their own elsewhere)
+        self.executor = spec.get('executor')
+        self.blocking_executor = self.executor or ("llm" if self.final else None)
+        self.span = spec.get('span', TIER_SPANS.get(self.module, f"intent.{self.name}"))
+
+        self.attempts = 0
+        self.answered = 0
+        self.outcomes: Dict[str, int] = {}
+
+    def check(self, module: Any, result: Dict[str, Any]) -> str:
+        """Outcome of a tier answer: accepted, or why the next tier is asked."""
+        if result.get("error"):
+            return "error"
+        intent = result.get("intent", "")
+        if self.final:
+            return ACCEPTED
+        if intent in self.pass_intents:
+            return "passed"
+        if intent in DEVICE_INTENTS and not (result.get("entities") or {}).get("device"):
+            # the action would fail with "Device not specified"
+            return "no_device"
+        if intent in self.accept_intents:
+            return ACCEPTED
+        if intent == OUT_OF_SCOPE:
+            return "out_of_scope"
+        threshold = self.threshold
+        if threshold is None:
+            threshold = get_intent_thresholds().threshold_for(module, intent)
+        return ACCEPTED if (result.get("confidence") or 0) > threshold else "low_confidence"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "module": self.module,
+            "threshold": self.threshold,
+            "budget_ms": self.budget_ms,
+            "final": self.final,
+            "attempts": self.attempts,
+            "answered": self.answered,
+            "outcomes": dict(self.outcomes)
+        }
+
+
+class Route:
+    """What the cascade did for one utterance."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.attempts: List[Dict[str, Any]] = []
+        self.answered_by: Optional[str] = None
+        # answer of the tier that accepted, else of the last tier that answered
+        self.result: Optional[Dict[str, Any]] = None
+        # the last non-final answer (what a fallback overrides) and the final tier's answer
+        self.local_result: Optional[Dict[str, Any]] = None
+        self.final_result: Optional[Dict[str, Any]] = None
+        self.speculative_used = False
+
+    @property
+    def done(self) -> bool:
+        return self.answered_by is not None
+
+
+class IntentRouter:
+    """Runs utterances through the configured intent tiers."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        router_config = self.config.get('settings', {}).get('intent_router', {}) or {}
+        self.tiers = [IntentTier(spec) for spec in (router_config.get('tiers') or DEFAULT_TIERS)]
+        # module name -> instance, filled in as modules finish loading
+        self.modules: Dict[str, Any] = {}
+        logger.info(f"Intent tiers: {' -> '.join(tier.name for tier in self.tiers)}")
+
+    def bind(self, modules: Dict[str, Any]):
+        """Look tier modules up in this dict (the loader fills it in place)."""
+        self.modules = modules
+
+    def resolve(self, overrides: Optional[Dict[str, Any]] = None) -> List[Tuple[IntentTier, Any]]:
+        """(tier, module) pairs; a processor's own modules win over the bound ones."""
+        overrides = overrides or {}
+        pairs = []
+        for tier in self.tiers:
+            module = overrides[tier.module] if tier.module in overrides else self.modules.get(tier.module)
+            pairs.append((tier, module))
+        return pairs
+
+    def final_tier(self, overrides: Optional[Dict[str, Any]] = None) -> Optional[IntentTier]:
+        """The first final tier with a loaded module; the cascade never goes past it."""
+        for tier, module in self.resolve(overrides):
+            if tier.final and module is not None:
+                return tier
+        return None
+
+    def can_speculate(self, overrides: Optional[Dict[str, Any]] = None) -> bool:
+        """A speculative LLM call can only be used when the LLM is the final tier."""
+        tier = self.final_tier(overrides)
+        return tier is not None and tier.module == LLM_TIER
+
+    def model_version(self, overrides: Optional[Dict[str, Any]] = None) -> str:
+        """Versions of the tier models, part of the intent cache key."""
+        return "|".join(getattr(module, "model_version", None) or "" for _, module in self.resolve(overrides))
+
+    def _record(self, route: Route, tier: IntentTier, module: Any, result: Optional[Dict[str, Any]],
+                seconds: float, outcome: Optional[str] = None):
+        if result is not None:
+            if result.get("intent") in DEVICE_INTENTS:
+                # fill in or correct the device before judging the answer
+                entities = get_gazetteer().resolve(route.text, result.get("entities") or {})
+                result = {**result, "entities": entities}
+            outcome = outcome or tier.check(module, result)
+            route.result = result
+            if tier.final:
+                route.final_result = result
+            else:
+                route.local_result = result
+        tier.attempts += 1
+        tier.outcomes[outcome] = tier.outcomes.get(outcome, 0) + 1
+        TIER_OUTCOMES.labels(tier=tier.name, outcome=outcome).inc()
+        route.attempts.append({
+            "tier": tier.name,
+            "intent": (result or {}).get("intent"),
+            "confidence": (result or {}).get("confidence"),
+            "ms": round(seconds * 1000, 3),
+            "outcome": outcome
+        })
+        if outcome == ACCEPTED:
+            route.answered_by = tier.name
+            tier.answered += 1
+            TIER_ANSWERS.labels(tier=tier.name).inc()
+
+    def _start(self, tier: IntentTier):
+        if tier.final:
+            LLM_FALLBACKS.inc()
+            logger.info(f"Intent fallback to {tier.name}")
+
+    def route(self, text: str, overrides: Optional[Dict[str, Any]] = None,
+              context: Optional[Dict[str, Any]] = None) -> Route:
+        """Blocking cascade. A tier over its budget has already cost the time, so its answer still counts."""
+        context = context or {}
+        route = Route(text)
+        for tier, module in self.resolve(overrides):
+            if route.done:
+                break
+            if module is None:
+                continue
+            self._start(tier)
+            start = time.perf_counter()
+            try:
+                with span(tier.span):
+                    result = module.recognize_intent(text, **context)
+            except Exception as e:
+                logger.error(f"Intent tier {tier.name} failed: {str(e)}")
+                result = {"intent": "", "confidence": 0.0, "entities": {}, "error": str(e)}
+            self._record(route, tier, module, result, time.perf_counter() - start)
+        return route
+
+    async def _call(self, tier: IntentTier, module: Any, text: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        with span(tier.span) as stage:
+            result = await recognize_async(module, text, tier.blocking_executor, context, native=tier.executor is None)
+            if stage is not None:
+                stage.set_attribute("intent", result.get("intent", ""))
+                stage.set_attribute("confidence", result.get("confidence", 0))
+            return result
+
+    async def _attempt(self, route: Route, tier: IntentTier, module: Any, context: Dict[str, Any],
+                       speculative: Optional[asyncio.Future] = None):
+        self._start(tier)
+        start = time.perf_counter()
+        if tier.final and tier.module == LLM_TIER and speculative is not None:
+            # the speculative LLM call started alongside the earlier tiers
+            call = asyncio.shield(get_speculator().use(speculative))
+            route.speculative_used = True
+        else:
+            call = self._call(tier, module, route.text, context)
+        try:
+            if tier.budget_ms:
+                result = await asyncio.wait_for(call, tier.budget_ms / 1000)
+            else:
+                result = await call
+        except asyncio.TimeoutError:
+            if (tier.executor is None and has_native_async(module)) or route.speculative_used:
+                logger.warning(f"Intent tier {tier.name} over its {tier.budget_ms} ms budget")
+            else:
+                logger.warning(f"Intent tier {tier.name} over its {tier.budget_ms} ms budget, "
+                               f"its {tier.blocking_executor or 'intent'} executor thread finishes in the background")
+            if route.speculative_used:
+                # shielded, so it runs on; retrieve its outcome so asyncio does not warn
+                speculative.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._record(route, tier, module, None, time.perf_counter() - start, "over_budget")
+            return
+        except Exception as e:
+            logger.error(f"Intent tier {tier.name} failed: {str(e)}")
+            result = {"intent": "", "confidence": 0.0, "entities": {}, "error": str(e)}
+        self._record(route, tier, module, result, time.perf_counter() - start)
+
+    async def route_async(self, text: str, overrides: Optional[Dict[str, Any]] = None,
+                          context: Optional[Dict[str, Any]] = None,
+                          speculative: Optional[asyncio.Future] = None) -> Route:
+        """Awaited cascade; a tier over its budget is abandoned and the next one asked."""
+        context = context or {}
+        route = Route(text)
+        for tier, module in self.resolve(overrides):
+            if route.done:
+                break
+            if module is None:
+                continue
+            await self._attempt(route, tier, module, context, speculative)
+        return route
+
+    async def route_batch(self, texts: List[str], overrides: Optional[Dict[str, Any]] = None,
+                          context: Optional[Dict[str, Any]] = None) -> List[Route]:
+        """
+        Many utterances at once: non-final tiers get one recognize_intents
+        call for everything still unanswered, final tiers run concurrently.
+        """
+        context = context or {}
+        routes = [Route(text) for text in texts]
+        for tier, module in self.resolve(overrides):
+            pending = [route for route in routes if not route.done]
+            if not pending:
+                break
+            if module is None:
+                continue
+            if tier.final:
+                await asyncio.gather(*(self._attempt(route, tier, module, context) for route in pending))
+                continue
+
+            start = time.perf_counter()
+            try:
+                with span(f"{tier.span}.batch", size=len(pending)):
+                    results = await run_blocking("intent", module.recognize_intents, [route.text for route in pending], **context)
+            except Exception as e:
+                logger.error(f"Intent tier {tier.name} batch failed: {str(e)}")
+                results = [{"intent": "", "confidence": 0.0, "entities": {}, "error": str(e)}] * len(pending)
+            seconds = (time.perf_counter() - start) / len(pending)
+            for route, result in zip(pending, results):
+                self._record(route, tier, module, result, seconds)
+        return routes
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tiers": [{"name": tier.name, **tier.get_stats()} for tier in self.tiers],
+            "loaded": [tier.name for tier, module in self.resolve() if module is not None]
+        }
+
+
+# Global router instance
+_intent_router = None
+
+def get_intent_router(config: Optional[Dict[str, Any]] = None) -> IntentRouter:
+    """Get or create the global intent router."""
+    global _intent_router
+    if _intent_router is None:
+        _intent_router = IntentRouter(config)
+    return _intent_router
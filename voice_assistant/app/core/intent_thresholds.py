@@ -0,0 +1,101 @@
+"""
+Per-intent confidence thresholds for the LLM fallback.
+A local result at or below its intent's threshold goes to the LLM. The
+thresholds are written by tools/optimize_thresholds.py, one table per local
+intent module class, and fall back to INTENT_CONFIDENCE_THRESHOLD for
+modules and intents that have not been tuned.
+
+    {"modules": {"RasaIntent": {"default": 0.6, "intents": {"greet": 0.31, ...}, ...}}}
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Any, Optional
+from app.constants import INTENT_CONFIDENCE_THRESHOLD, INTENT_THRESHOLDS_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def module_key(module: Any) -> str:
+    """Thresholds are stored per intent module class."""
+    return type(module).__name__ if module is not None else ""
+
+
+class IntentThresholds:
+    """Fallback threshold lookup over the thresholds file."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        thresholds_config = self.config.get('settings', {}).get('intent_thresholds', {}) or {}
+        self.enabled = thresholds_config.get('enabled', True)
+        self.path = thresholds_config.get('path', INTENT_THRESHOLDS_PATH)
+        self.default = thresholds_config.get('default', INTENT_CONFIDENCE_THRESHOLD)
+
+        self._tables: Dict[str, Dict[str, Any]] = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """(Re)read the file if it changed since the last read."""
+        if not self.enabled:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            self._tables = {}
+            self._mtime = None
+            return
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            try:
+                with open(self.path, 'r') as file:
+                    data = json.load(file)
+                self._tables = data.get("modules", {}) or {}
+                logger.info(f"Loaded intent thresholds for {sorted(self._tables)} from {self.path}")
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read intent thresholds from {self.path}: {str(e)}")
+                self._tables = {}
+            self._mtime = mtime
+
+    def threshold_for(self, module: Any, intent: Optional[str]) -> float:
+        """Fallback threshold for an intent predicted by the given module."""
+        table = self._tables.get(module_key(module))
+        if not table:
+            return self.default
+        return table.get("intents", {}).get(intent, table.get("default", self.default))
+
+    def reload(self) -> Dict[str, Any]:
+        """Re-read the thresholds file if it changed (after re-running the optimizer)."""
+        self._load()
+        return self.get_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "default": self.default,
+            "modules": {
+                name: {
+                    "default": table.get("default", self.default),
+                    "intents": table.get("intents", {}),
+                    "model_version": table.get("model_version"),
+                    "generated_at": table.get("generated_at")
+                }
+                for name, table in self._tables.items()
+            }
+        }
+
+
+# Global thresholds instance
+_intent_thresholds = None
+
+def get_intent_thresholds(config: Optional[Dict[str, Any]] = None) -> IntentThresholds:
+    """Get or create the global intent thresholds."""
+    global _intent_thresholds
+    if _intent_thresholds is None:
+        _intent_thresholds = IntentThresholds(config)
+    return _intent_thresholds
@@ -0,0 +1,255 @@
+"""
+Write-behind interaction log.
+Requests hand a record to a bounded in-memory queue and return; a background
+thread writes batches to SQLite (WAL mode). When the disk falls behind the
+log samples and then drops records instead of blocking the pipeline.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from app.core.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+INTERACTIONS_LOGGED = counter("voice_interaction_log_written_total", "Interaction records written to the store")
+INTERACTIONS_DROPPED = counter("voice_interaction_log_dropped_total", "Interaction records not written", ["reason"])
+INTERACTION_QUEUE_DEPTH = gauge("voice_interaction_log_queue_depth", "Interaction records waiting to be written")
+
+COLUMNS = [
+    "created_at", "request_id", "trace_id", "text",
+    "intent", "confidence", "entities",
+    "local_intent", "local_confidence", "local_result",
+    "llm_intent", "llm_confidence", "llm_result",
+    "llm_fallback_used", "cache_hit", "action_result", "speech_text",
+    "stage_timings", "duration_ms", "answered_by", "tier_attempts"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    request_id TEXT,
+    trace_id TEXT,
+    text TEXT,
+    intent TEXT,
+    confidence REAL,
+    entities TEXT,
+    local_intent TEXT,
+    local_confidence REAL,
+    local_result TEXT,
+    llm_intent TEXT,
+    llm_confidence REAL,
+    llm_result TEXT,
+    llm_fallback_used INTEGER,
+    cache_hit INTEGER,
+    action_result INTEGER,
+    speech_text TEXT,
+    stage_timings TEXT,
+    duration_ms REAL,
+    answered_by TEXT,
+    tier_attempts TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_created_at ON interactions (created_at);
+"""
+
+# fields stored as JSON text
+_JSON_FIELDS = {"entities", "local_result", "llm_result", "stage_timings", "tier_attempts"}
+
+
+class InteractionLog:
+    """Bounded queue in front of a batching SQLite writer thread."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        log_config = self.config.get('settings', {}).get('interaction_log', {}) or {}
+        self.path = log_config.get('path', 'logs/interactions.db')
+        self.max_queue = log_config.get('max_queue', 1000)
+        self.batch_size = log_config.get('batch_size', 100)
+        self.flush_interval = log_config.get('flush_interval', 1.0)
+        # above this queue fill ratio only sample_rate of the records are kept
+        self.sample_above = log_config.get('sample_above', 0.8)
+        self.sample_rate = log_config.get('sample_rate', 0.2)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped: Dict[str, int] = {"queue_full": 0, "sampled": 0, "write_error": 0}
+
+    def start(self):
+        if self._running:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="va-interaction-log", daemon=True)
+        self._thread.start()
+        logger.info(f"Interaction log writing to {self.path}")
+
+    def stop(self):
+        """Flush what is queued and stop the writer."""
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._queue.put(None, timeout=1)
+        except queue.Full:
+            pass
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _drop(self, reason: str, count: int = 1):
+        self.dropped[reason] += count
+        INTERACTIONS_DROPPED.labels(reason=reason).inc(count)
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue a record without blocking. Returns False if it was dropped."""
+        if not self._running:
+            return False
+        self.submitted += 1
+        depth = self._queue.qsize()
+        if depth >= self.max_queue * self.sample_above and random.random() >= self.sample_rate:
+            self._drop("sampled")
+            return False
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._drop("queue_full")
+            return False
+        INTERACTION_QUEUE_DEPTH.set(depth + 1)
+        return True
+
+    def _run(self):
+        connection = None
+        try:
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+        except Exception as e:
+            logger.error(f"Failed to open interaction log {self.path}: {str(e)}")
+            connection = None
+
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._write(connection, batch)
+            # the stop sentinel may not fit in a full queue
+            if not self._running and self._queue.empty():
+                stopping = True
+
+        if connection:
+            connection.close()
+
+    def _next_batch(self):
+        """Wait up to flush_interval for records, return (batch, stop_requested)."""
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if record is None:
+                # drain what is left before stopping
+                while True:
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        return batch, True
+                    if record is not None:
+                        batch.append(record)
+            batch.append(record)
+        INTERACTION_QUEUE_DEPTH.set(self._queue.qsize())
+        return batch, False
+
+    def _write(self, connection, batch: List[Dict[str, Any]]):
+        if connection is None:
+            self._drop("write_error", len(batch))
+            return
+        rows = [tuple(self._column_value(record, column) for column in COLUMNS) for record in batch]
+        try:
+            with connection:
+                connection.executemany(
+                    f"INSERT INTO interactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                    rows
+                )
+            self.written += len(rows)
+            INTERACTIONS_LOGGED.inc(len(rows))
+        except Exception as e:
+            logger.error(f"Failed to write {len(rows)} interaction records: {str(e)}")
+            self._drop("write_error", len(rows))
+
+    @staticmethod
+    def _column_value(record: Dict[str, Any], column: str):
+        value = record.get(column)
+        if value is not None and column in _JSON_FIELDS:
+            return json.dumps(value, default=str)
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._running,
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": dict(self.dropped)
+        }
+
+
+def read_interactions(path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Read logged interactions (oldest first), JSON fields decoded."""
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    try:
+        query = "SELECT * FROM interactions ORDER BY id"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        rows = [dict(row) for row in connection.execute(query)]
+    finally:
+        connection.close()
+    for row in rows:
+        for field in _JSON_FIELDS:
+            if row.get(field):
+                row[field] = json.loads(row[field])
+    return rows
+
+
+# Global interaction log instance (None when disabled)
+_interaction_log = None
+
+def start_interaction_log(config: Optional[Dict[str, Any]] = None) -> Optional[InteractionLog]:
+    """Create and start the global interaction log if enabled in settings.interaction_log."""
+    global _interaction_log
+    log_config = (config or {}).get('settings', {}).get('interaction_log', {}) or {}
+    if not log_config.get('enabled', False):
+        return None
+    if _interaction_log is None:
+        _interaction_log = InteractionLog(config)
+        _interaction_log.start()
+    return _interaction_log
+
+def get_interaction_log() -> Optional[InteractionLog]:
+    """Get the global interaction log, None if disabled."""
+    return _interaction_log
+
+def stop_interaction_log():
+    global _interaction_log
+    if _interaction_log is not None:
+        _interaction_log.stop()
+        _interaction_log = None
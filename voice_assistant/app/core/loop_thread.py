@@ -0,0 +1,91 @@
+"""
+Long-lived event loops on background threads.
+Coroutines that do blocking work internally (Rasa's parse_message runs the
+TensorFlow graph synchronously) run here instead of on the server loop, and
+sync callers reuse the same loop instead of creating one per call.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundLoop:
+    """An asyncio loop running forever on its own daemon thread."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._ready.wait()
+        logger.info(f"Background loop '{self.name}' started")
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop from any thread."""
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block until it finishes."""
+        if self.in_loop_thread():
+            raise RuntimeError(f"Blocking call on background loop '{self.name}' from its own thread")
+        return self.submit(coro).result(timeout)
+
+    async def run_async(self, coro: Awaitable) -> Any:
+        """Run a coroutine on the loop and await it from another loop."""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def stop(self):
+        if self.running:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=2)
+
+
+_loops: Dict[str, BackgroundLoop] = {}
+_loops_lock = threading.Lock()
+
+def get_background_loop(name: str) -> BackgroundLoop:
+    """Get (or create and start) the named background loop."""
+    with _loops_lock:
+        background_loop = _loops.get(name)
+        if background_loop is None:
+            background_loop = _loops[name] = BackgroundLoop(name)
+    background_loop.start()
+    return background_loop
+
+def stop_background_loops():
+    with _loops_lock:
+        for background_loop in _loops.values():
+            background_loop.stop()
+        _loops.clear()
@@ -0,0 +1,53 @@
+"""
+Prometheus metrics for the voice pipeline.
+prometheus_client metrics in the app's own registry, rendered by /metrics.
+"""
+
+from typing import Sequence
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest, disable_created_metrics
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# no *_created series next to every counter and histogram
+disable_created_metrics()
+
+REGISTRY = CollectorRegistry()
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return Counter(name, documentation, labelnames, registry=REGISTRY)
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return Gauge(name, documentation, labelnames, registry=REGISTRY)
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return Histogram(name, documentation, labelnames, registry=REGISTRY, buckets=buckets)
+
+def render() -> bytes:
+    """All metrics in the Prometheus text format."""
+    return generate_latest(REGISTRY)
+
+
+# Pipeline metrics
+REQUESTS_TOTAL = counter("voice_requests_total", "Requests handled by the pipeline", ["endpoint"])
+REQUESTS_IN_FLIGHT = gauge("voice_requests_in_flight", "Requests currently inside the pipeline")
+STAGE_LATENCY = histogram("voice_stage_duration_seconds", "Latency of traced pipeline stages", ["stage"])
+
+RASA_PARSE_LATENCY = histogram("voice_rasa_parse_duration_seconds", "Rasa NLU parse latency")
+LLM_LATENCY = histogram("voice_llm_request_duration_seconds", "LLM provider request latency", ["provider"])
+TTS_REAL_TIME_FACTOR = histogram(
+    "voice_tts_real_time_factor", "Synthesis time divided by audio duration", ["engine"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0)
+)
+MQTT_PUBLISH_LATENCY = histogram(
+    "voice_mqtt_publish_duration_seconds", "MQTT publish latency",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+)
+
+LLM_FALLBACKS = counter("voice_llm_fallback_total", "Requests that fell back to the LLM tier")
+DIRECT_RESPONSES = counter("voice_direct_response_total", "LLM direct (non-action) responses")
+ACTION_FAILURES = counter("voice_action_failures_total", "Failed action executions", ["intent"])
+SPECULATIVE_CALLS = counter("voice_llm_speculative_total", "Speculative LLM calls by outcome", ["outcome"])
+CACHE_HITS = counter("voice_intent_cache_hits_total", "Intent cache hits")
+CACHE_MISSES = counter("voice_intent_cache_misses_total", "Intent cache misses")
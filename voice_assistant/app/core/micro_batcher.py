@@ -0,0 +1,93 @@
+"""
+Micro-batching of concurrent calls.
+Items submitted within max_wait_ms of each other (up to max_batch) are
+processed by one batch call and the results fanned back to the callers.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = histogram(
+    "voice_micro_batch_size", "Items per micro-batch", ["batcher"],
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+BATCH_WAIT = histogram(
+    "voice_micro_batch_wait_seconds", "Time items waited for their batch to start", ["batcher"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+
+class MicroBatcher:
+    """
+    Collects items on one event loop and runs them through process_batch.
+    submit() must be awaited on the loop that owns the batcher. process_batch
+    runs on that loop too; items arriving while it runs form the next batch.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_batch: int = 16, max_wait_ms: float = 5.0, name: str = "batch"):
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if self._pending:
+            # more than one batch queued up, schedule the rest right away
+            self._timer = asyncio.get_running_loop().call_soon(self._flush)
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        for _, _, queued_at in batch:
+            BATCH_WAIT.labels(batcher=self.name).observe(started - queued_at)
+        BATCH_SIZE.labels(batcher=self.name).observe(len(batch))
+        self.batches += 1
+        self.items += len(batch)
+
+        try:
+            results = self.process_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0
+        }
@@ -0,0 +1,230 @@
+"""
+Unpacked model artifact cache.
+Model archives (nlu-*.tar.gz) are extracted once into <cache dir>/<sha256 of
+the archive>/ and reused by later starts, reloads and worker processes.
+Extraction happens under a file lock into a temporary directory that is
+renamed into place, so concurrent processes never see a half-written entry.
+Entries over the size cap are evicted least recently used first.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tarfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+from app.core.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_LOOKUPS = counter("voice_model_cache_lookups_total", "Model artifact cache lookups", ["result"])
+MODEL_CACHE_BYTES = gauge("voice_model_cache_bytes", "Disk used by unpacked model artifacts")
+
+# written last inside an entry; an entry without it is incomplete
+COMPLETE_MARKER = ".complete"
+INDEX_FILE = "index.json"
+LOCK_FILE = ".lock"
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _safe_members(archive: tarfile.TarFile, target: str) -> List[tarfile.TarInfo]:
+    """Regular files and directories that stay inside target (no links, no ../ paths)."""
+    target = os.path.realpath(target)
+    members = []
+    for member in archive.getmembers():
+        path = os.path.realpath(os.path.join(target, member.name))
+        if not (member.isfile() or member.isdir()) or os.path.commonpath([target, path]) != target:
+            logger.warning(f"Skipping archive member {member.name!r}")
+            continue
+        members.append(member)
+    return members
+
+
+class ModelArtifactCache:
+    """On-disk cache of extracted model archives keyed by content hash."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        cache_config = self.config.get('settings', {}).get('model_cache', {}) or {}
+        self.enabled = cache_config.get('enabled', True)
+        self.cache_dir = os.path.abspath(cache_config.get('dir', "cache/models"))
+        self.max_bytes = int(cache_config.get('max_size_mb', 2048) * 1024 * 1024)
+        # entries never evicted, however large: the model in use and the one before it
+        self.keep_min = cache_config.get('keep_min', 2)
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def _locked(self):
+        """Thread and process lock over the cache directory."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._lock:
+            with open(os.path.join(self.cache_dir, LOCK_FILE), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_index(self) -> Dict[str, str]:
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE), 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index: Dict[str, str]):
+        path = os.path.join(self.cache_dir, INDEX_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(index, file)
+        os.replace(tmp_path, path)
+
+    def archive_hash(self, archive_path: str) -> str:
+        """
+        sha256 of the archive. Remembered per (path, size, mtime) in the index
+        so an unchanged archive is not re-read on every start.
+        """
+        stat = os.stat(archive_path)
+        key = f"{os.path.abspath(archive_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        digest = self._read_index().get(key)
+        if digest and self._is_complete(digest):
+            return digest
+        digest = file_sha256(archive_path)
+        with self._locked():
+            index = self._read_index()
+            # drop stale keys for this path
+            prefix = f"{os.path.abspath(archive_path)}|"
+            index = {k: v for k, v in index.items() if not k.startswith(prefix)}
+            index[key] = digest
+            self._write_index(index)
+        return digest
+
+    def _entry_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest)
+
+    def _is_complete(self, digest: str) -> bool:
+        return os.path.exists(os.path.join(self._entry_path(digest), COMPLETE_MARKER))
+
+    def _touch(self, digest: str):
+        try:
+            os.utime(os.path.join(self._entry_path(digest), COMPLETE_MARKER))
+        except OSError:
+            pass
+
+    def unpacked(self, archive_path: str) -> str:
+        """Directory holding the extracted archive, extracting it on a miss."""
+        digest = self.archive_hash(archive_path)
+        entry = self._entry_path(digest)
+        if self._is_complete(digest):
+            self._touch(digest)
+            self.hits += 1
+            MODEL_CACHE_LOOKUPS.labels(result="hit").inc()
+            return entry
+
+        with self._locked():
+            # another process may have extracted it while we waited for the lock
+            if self._is_complete(digest):
+                self._touch(digest)
+                self.hits += 1
+                MODEL_CACHE_LOOKUPS.labels(result="hit").inc()
+                return entry
+
+            start = time.perf_counter()
+            tmp_entry = os.path.join(self.cache_dir, f".tmp-{digest}-{os.getpid()}")
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.makedirs(tmp_entry)
+                with tarfile.open(archive_path, 'r:*') as archive:
+                    archive.extractall(tmp_entry, members=_safe_members(archive, tmp_entry))
+                with open(os.path.join(tmp_entry, COMPLETE_MARKER), 'w') as marker:
+                    marker.write(os.path.basename(archive_path))
+                os.rename(tmp_entry, entry)
+            except Exception:
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+                raise
+
+            self.misses += 1
+            MODEL_CACHE_LOOKUPS.labels(result="miss").inc()
+            logger.info(f"Unpacked {os.path.basename(archive_path)} into the model cache in {time.perf_counter() - start:.2f}s")
+            self._evict(keep=digest)
+        return entry
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """(digest, last used, bytes) of complete entries, most recently used first."""
+        result = []
+        if not os.path.isdir(self.cache_dir):
+            return result
+        for name in os.listdir(self.cache_dir):
+            marker = os.path.join(self.cache_dir, name, COMPLETE_MARKER)
+            if name.startswith(".") or not os.path.exists(marker):
+                continue
+            result.append((name, os.path.getmtime(marker), _dir_size(os.path.join(self.cache_dir, name))))
+        result.sort(key=lambda entry: entry[1], reverse=True)
+        return result
+
+    def _evict(self, keep: str):
+        """Remove least recently used entries until the cache fits max_bytes. Caller holds the lock."""
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        for position, (digest, _, size) in reversed(list(enumerate(entries))):
+            if total <= self.max_bytes:
+                break
+            if digest == keep or position < self.keep_min:
+                continue
+            shutil.rmtree(self._entry_path(digest), ignore_errors=True)
+            total -= size
+            self.evictions += 1
+            logger.info(f"Evicted model cache entry {digest[:12]} ({size / 1e6:.1f} MB)")
+        MODEL_CACHE_BYTES.set(total)
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {
+            "enabled": self.enabled,
+            "dir": self.cache_dir,
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+# Global model cache instance
+_model_cache = None
+
+def get_model_cache(config: Optional[Dict[str, Any]] = None) -> ModelArtifactCache:
+    """Get or create the global model artifact cache."""
+    global _model_cache
+    if _model_cache is None:
+        _model_cache = ModelArtifactCache(config)
+    return _model_cache
@@ -4,9 +4,39 @@ Handles loading and initialization of modules based on configuration.
 """
 
 import importlib
+import inspect
 import logging
-from typing import Dict, Any, Type
+import threading
+import time
+from typing import Dict, Any, Optional, Type
 from app.core.config import Config
+from app.core.intent_cache import get_intent_cache
+from app.core.metrics import gauge
+
+MODULE_LOADING = "loading"
+MODULE_READY = "ready"
+MODULE_FAILED = "failed"
+
+MODULE_LOAD_SECONDS = gauge("voice_module_load_seconds", "Time to load and initialize a module", ["module"])
+
+
+def create_module(module_path: str, config_data: Dict[str, Any]) -> Any:
+    """
+    Instantiate a module class from its path under app.modules, e.g.
+    "intent.rasa_intent.RasaIntent". Classes taking a `config` argument get the config.
+    """
+    # Split the path into module and class name
+    module_parts = module_path.split('.')
+    class_name = module_parts[-1]
+    
+    # Import the module and get the class
+    module = importlib.import_module(f"app.modules.{'.'.join(module_parts[:-1])}")
+    module_class = getattr(module, class_name)
+    
+    # Pass config to modules that need it (like actions and llm_intent)
+    if 'config' in inspect.signature(module_class.__init__).parameters:
+        return module_class(config=config_data)
+    return module_class()
 
 
 class ModuleLoader:
@@ -15,6 +45,9 @@ class ModuleLoader:
     def __init__(self, config: Config):
         self.config = config
         self.modules: Dict[str, Any] = {}
+        # module name -> {"state": loading|ready|failed, "module_path", "seconds", "error"}
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self._threads: Dict[str, threading.Thread] = {}
         self.logger = logging.getLogger(__name__)
     
     def load_module(self, module_name: str) -> Any:
@@ -22,23 +55,7 @@ class ModuleLoader:
         try:
             # Get the module class path from config
             module_path = self.config.get_module_config(module_name)
-            
-            # Split the path into module and class name
-            module_parts = module_path.split('.')
-            class_name = module_parts[-1]
-            module_path = '.'.join(module_parts[:-1])
-            
-            # Import the module
-            module = importlib.import_module(f"app.modules.{module_path}")
-            
-            # Get the class and instantiate it
-            module_class = getattr(module, class_name)
-            
-            # Pass config to modules that need it (like actions and llm_intent)
-            if module_name in ['actions', 'llm_intent']:
-                instance = module_class(self.config.config_data)
-            else:
-                instance = module_class()
+            instance = create_module(module_path, self.config.config_data)
             
             # Initialize the module if it has an initialize method
             if hasattr(instance, 'initialize'):
@@ -51,29 +68,78 @@ class ModuleLoader:
                 except Exception as e:
                     self.logger.error(f"Failed to initialize {module_name}: {str(e)}")
             
-            self.logger.info(f"{module_name}  \t => {module_path}.{class_name}")
+            self.logger.info(f"{module_name}  \t => {module_path}")
             return instance
             
         except Exception as e:
             self.logger.error(f"Failed to load module {module_name}: {str(e)}")
             raise
     
+    def _module_names(self):
+        # Skip non-module configuration sections
+        return [name for name in self.config.get_all_modules() if name not in ['settings']]
+
+    def _load_tracked(self, module_name: str) -> Optional[Any]:
+        """Load a module, recording its state. Returns the instance if it is ready."""
+        self.states[module_name] = {"state": MODULE_LOADING, "module_path": self.config.get_module_config(module_name)}
+        start = time.perf_counter()
+        error = None
+        instance = None
+        try:
+            instance = self.load_module(module_name)
+            if not getattr(instance, 'is_initialized', True):
+                error = "initialization failed"
+        except Exception as e:
+            error = str(e)
+        seconds = round(time.perf_counter() - start, 3)
+        MODULE_LOAD_SECONDS.labels(module=module_name).set(seconds)
+
+        state = {"state": MODULE_FAILED if error else MODULE_READY, "seconds": seconds}
+        if error:
+            state["error"] = error
+        self.states[module_name].update(state)
+        return instance
+
     def load_all_modules(self) -> Dict[str, Any]:
         """Load all configured modules."""
         self.modules = {}
         
-        for module_name in self.config.get_all_modules():
-            # Skip non-module configuration sections
-            if module_name in ['settings']:
-                continue
-                
-            try:
-                self.modules[module_name] = self.load_module(module_name)
-            except Exception as e:
-                self.logger.error(f"Failed to load module {module_name}: {str(e)}")
-                continue #handle
+        for module_name in self._module_names():
+            instance = self._load_tracked(module_name)
+            if instance is not None:
+                self.modules[module_name] = instance
         
         return self.modules
+
+    def load_all_modules_background(self) -> Dict[str, Any]:
+        """
+        Load every configured module on its own thread and return right away.
+        The returned dict is self.modules; each module is added once it is ready.
+        """
+        for module_name in self._module_names():
+            self.states[module_name] = {"state": MODULE_LOADING, "module_path": self.config.get_module_config(module_name)}
+            thread = threading.Thread(target=self._load_in_background, args=(module_name,), name=f"va-load-{module_name}", daemon=True)
+            self._threads[module_name] = thread
+            thread.start()
+        return self.modules
+
+    def _load_in_background(self, module_name: str):
+        instance = self._load_tracked(module_name)
+        if instance is not None and self.states[module_name]["state"] == MODULE_READY:
+            self.modules[module_name] = instance
+        self.logger.info(f"{module_name} {self.states[module_name]['state']} after {self.states[module_name]['seconds']}s")
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Block until background loading finishes. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in list(self._threads.values()):
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                return False
+        return True
+
+    def get_states(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(state) for name, state in self.states.items()}
     
     def get_module(self, module_name: str) -> Any:
         """Get a loaded module by name."""
@@ -84,12 +150,17 @@ class ModuleLoader:
     def reload_module(self, module_name: str) -> Any:
         """Reload a specific module."""
         self.modules[module_name] = self.load_module(module_name)
+        if module_name in ['local_intent', 'llm_intent']:
+            # cached results came from the previous model
+            get_intent_cache().invalidate()
         return self.modules[module_name]
     
     def reload_all_modules(self) -> Dict[str, Any]:
         """Reload all modules."""
         self.config.reload()
-        return self.load_all_modules()
+        modules = self.load_all_modules()
+        get_intent_cache().invalidate()
+        return modules
 
 
 def initialize_modules(config_path: str = "config.yaml") -> Dict[str, Any]:
@@ -1,6 +1,11 @@
+import time
 import uuid
 from app.modules.intent.intents import OUT_OF_SCOPE, ALL_INTENTS
-from app.constants import INTENT_CONFIDENCE_THRESHOLD
+from app.core.intent_router import get_intent_router
+from app.core.metrics import DIRECT_RESPONSES, ACTION_FAILURES
+from app.core.intent_cache import get_intent_cache
+from app.core.interaction_log import get_interaction_log
+from app.core.tracing import current_trace, span
 import logging as log 
 logger = log.getLogger(__name__)
 
@@ -26,43 +31,114 @@ class RequestProcessor():
 
         self.actionable_command = False
         self.speech_text = None
+        self.llm_fallback_used = False
+        self.cache_hit = False
+        # intent tier that answered and what each tier tried
+        self.answered_by = None
+        self.tier_attempts = []
+
+        # raw tier results
+        self.local_result = None
+        self.llm_result = None
 
         # logger 
         self.log_tag = f"[{str(uuid.uuid4())[:4]}]"
+        self.started_at = time.time()
+        self._started_perf = time.perf_counter()
+        self._saved = False
 
     
     def process_intent(self):
-        # Rasa intent recognition -LOCAL
-        intent_result = self.intent_module.recognize_intent(self.text, **self.context)
+        # Repeated commands skip NLU entirely
+        if self._apply_cached_result():
+            return
+
+        # Intent tiers in order (local, then LLM by default) until one is confident enough
+        route = get_intent_router().route(self.text, self._tier_modules(), self.context)
+        self._apply_route(route)
+
+        self._cache_result()
+
+        return 
+
+    def _tier_modules(self):
+        """The modules this processor was given, for the router tiers of the same name."""
+        return {"local_intent": self.intent_module, "llm_intent": self.llm_module}
+
+    def _model_version(self):
+        """Versions of the loaded intent models, part of the cache key."""
+        return get_intent_router().model_version(self._tier_modules())
+
+    def _apply_cached_result(self):
+        """Use a cached intent for this utterance. Returns True on a hit."""
+        cached = get_intent_cache().get(self.text, self._model_version())
+        if cached is None:
+            return False
+
+        self.cache_hit = True
+        self.answered_by = "cache"
+        self.intent = cached.get("intent", "")
+        self.confidence = cached.get("confidence", 0)
+        self.entities = cached.get("entities", {})
+        if self.intent == "direct_response":
+            self.speech_text = cached.get("speech_response")
+        logger.info(f"{self.log_tag} CACHE : Intent[{self.intent}] confidence[{self.confidence}] entities[{self.entities}]")
+        return True
+
+    def _cache_result(self):
+        """Cache the resolved intent, unless it is an error or still unresolved."""
+        last_result = self.llm_result if self.llm_fallback_used else self.local_result
+        if not self.intent or self.intent == OUT_OF_SCOPE or (last_result or {}).get("error"):
+            return
+        # no tier was confident enough
+        if not self.answered_by:
+            return
 
+        result = {
+            "intent": self.intent,
+            "confidence": self.confidence,
+            "entities": self.entities
+        }
+        if self.intent == "direct_response":
+            result["speech_response"] = self.speech_text
+        get_intent_cache().put(self.text, self._model_version(), result)
+
+    def _apply_local_result(self, intent_result):
+        """Store the local (Rasa) intent result on the processor."""
+        self.local_result = intent_result
         self.intent = intent_result.get("intent", "")
         self.confidence = intent_result.get("confidence", 0)
         self.entities = intent_result.get("entities", {})
 
         logger.info(f"{self.log_tag} LOCAL : Intent[{self.intent}] confidence[{self.confidence}] entities[{self.entities}]")
 
-        # If Rasa returns out_of_scope or low confidence, use LLM fallback
-        if self.intent == OUT_OF_SCOPE or self.confidence <= INTENT_CONFIDENCE_THRESHOLD: 
-            logger.info(f"{self.log_tag} LLM intent fallback")
-            
-            intent_result = self.llm_module.recognize_intent(self.text, **self.context)
-            
-            # Update with LLM results
-            self.intent = intent_result.get("intent", "")
-            self.confidence = intent_result.get("confidence", 0)
-            self.entities = intent_result.get("entities", {})
-            
-            # Handle direct response from LLM
-            if self.intent == "direct_response":
-                self.speech_text = intent_result.get("speech_response", "I'm sorry, I couldn't process that request.")
-                self.actionable_command = False
-                logger.info(f"{self.log_tag} LLM Direct Response: {self.speech_text}")
-            else:
-                logger.info(f"{self.log_tag} LLM Intent[{self.intent}] confidence[{self.confidence}] entities[{self.entities}]")
-        
-        self.save_to_db()
+    def _apply_route(self, route):
+        """Store what the intent tiers answered."""
+        self.answered_by = route.answered_by
+        self.tier_attempts = route.attempts
+        # device entities were already filled in or corrected by the router's gazetteer pass
+        self._apply_local_result(route.local_result or {})
+        if route.final_result is not None:
+            self._apply_llm_result(route.final_result)
+        logger.info(f"{self.log_tag} Answered by [{self.answered_by}] tiers {[(a['tier'], a['outcome']) for a in self.tier_attempts]}")
 
-        return 
+    def _apply_llm_result(self, intent_result):
+        """Store the LLM intent result, handling direct responses."""
+        self.llm_fallback_used = True
+        self.llm_result = intent_result
+        # Update with LLM results
+        self.intent = intent_result.get("intent", "")
+        self.confidence = intent_result.get("confidence", 0)
+        self.entities = intent_result.get("entities", {})
+        
+        # Handle direct response from LLM
+        if self.intent == "direct_response":
+            DIRECT_RESPONSES.inc()
+            self.speech_text = intent_result.get("speech_response", "I'm sorry, I couldn't process that request.")
+            self.actionable_command = False
+            logger.info(f"{self.log_tag} LLM Direct Response: {self.speech_text}")
+        else:
+            logger.info(f"{self.log_tag} LLM Intent[{self.intent}] confidence[{self.confidence}] entities[{self.entities}]")
 
     def _determine_actionable_command(self):
         """Determine if the current intent requires action execution."""
@@ -81,47 +157,61 @@ class RequestProcessor():
             self.actionable_command = self.intent in actionable_intents
             logger.info(f"{self.log_tag} Actionable command: {self.actionable_command} for intent: {self.intent}")
 
-    def process_action(self):
-        """Execute action based on detected intent."""
+    def _should_execute_action(self):
+        """Check whether the current intent maps to an action."""
         # Skip action execution for direct responses
         if self.intent == "direct_response":
             logger.info(f"{self.log_tag} Direct response - skipping action execution")
             # Preserve the speech_text from LLM response
             logger.info(f"{self.log_tag} Preserving speech text: {self.speech_text}")
-            return
+            return False
             
         if self.intent not in ALL_INTENTS:
             logger.info(f"{self.log_tag} No action required for intent: {self.intent}")
-            return
+            return False
 
         logger.info(f"{self.log_tag} Executing action for intent: {self.intent}")
+        return True
+
+    def process_action(self):
+        """Execute action based on detected intent."""
+        if not self._should_execute_action():
+            return
         
         try:
-            action_result = self.action_module.execute_action(self.intent, self.entities, **self.context)
-            
-            logger.info(f"{self.log_tag} Action result: {action_result}")
-            
-            # Store action result for potential use in speech response
-            self.action_result = action_result.get('success', False)
-            
-            # Only update speech_text if action provides one
-            if action_result.get('speech_op'):
-                self.speech_text = action_result.get('speech_op')
-                logger.info(f"{self.log_tag} Action provided speech: {self.speech_text}")
-            
-            if self.action_result == False:
-                self.speech_text = "Something went wrong. Try again later."
-                self.save_to_db()
-            else:
-                logger.warning(f"{self.log_tag} Action execution failed: {action_result.get('error', 'Unknown error')}")
+            with span("action", intent=self.intent):
+                action_result = self.action_module.execute_action(self.intent, self.entities, **self.context)
+            self._apply_action_result(action_result)
                 
         except Exception as e:
-            logger.error(f"{self.log_tag} Action execution error: {str(e)}")
-            self.speech_text = "Something went wrong. Try again later."
-            self.action_result = False
+            self._apply_action_error(e)
         
         return
 
+    def _apply_action_result(self, action_result):
+        """Store the action result and any speech it provides."""
+        logger.info(f"{self.log_tag} Action result: {action_result}")
+        
+        # Store action result for potential use in speech response
+        self.action_result = action_result.get('success', False)
+        
+        # Only update speech_text if action provides one
+        if action_result.get('speech_op'):
+            self.speech_text = action_result.get('speech_op')
+            logger.info(f"{self.log_tag} Action provided speech: {self.speech_text}")
+        
+        if self.action_result == False:
+            ACTION_FAILURES.labels(intent=self.intent).inc()
+            self.speech_text = "Something went wrong. Try again later."
+            logger.warning(f"{self.log_tag} Action execution failed: {action_result.get('error', 'Unknown error')}")
+
+    def _apply_action_error(self, error):
+        """Record an exception raised by the action module."""
+        logger.error(f"{self.log_tag} Action execution error: {str(error)}")
+        ACTION_FAILURES.labels(intent=self.intent).inc()
+        self.speech_text = "Something went wrong. Try again later."
+        self.action_result = False
+
     def process_speechresponse(self):
         """Generate speech response based on action result or provided text."""
         if not self.speech_text:
@@ -130,19 +220,67 @@ class RequestProcessor():
         # Generate TTS audio if TTS module is available
         if self.tts_module:
             try:
-                tts_result = self.tts_module.speak(self.speech_text)
-                if tts_result.get("success", False):
-                    logger.info(f"{self.log_tag} TTS audio generated successfully")
-                    return { "success": True }
-                else:
-                    logger.warning(f"{self.log_tag} TTS generation failed: {tts_result.get('error')}")
+                with span("tts", chars=len(self.speech_text)):
+                    tts_result = self.tts_module.speak(self.speech_text)
+                self._log_tts_result(tts_result)
             except Exception as e:
                 logger.error(f"{self.log_tag} TTS error: {str(e)}")
         
+        self.save_to_db()
         return { "success": True }
 
+    def _log_tts_result(self, tts_result):
+        if tts_result.get("success", False):
+            logger.info(f"{self.log_tag} TTS audio generated successfully")
+        else:
+            logger.warning(f"{self.log_tag} TTS generation failed: {tts_result.get('error')}")
+
+    def summary(self):
+        """Per-request result as returned by the batch endpoints."""
+        return {
+            "text": self.text,
+            "intent": self.intent,
+            "confidence": self.confidence,
+            "entities": self.entities,
+            "speech_text": self.speech_text,
+            "action_result": self.action_result,
+            "llm_fallback_used": self.llm_fallback_used,
+            "answered_by": self.answered_by,
+            "cache_hit": self.cache_hit
+        }
+
     def save_to_db(self):
-        # TODO
-        pass
+        """Hand the request record to the interaction log (once per request, never blocks)."""
+        interaction_log = get_interaction_log()
+        if self._saved or not interaction_log:
+            return
+        self._saved = True
+        interaction_log.submit(self._interaction_record())
 
-    
\ No newline at end of file
+    def _interaction_record(self):
+        trace = current_trace()
+        local_result = self.local_result or {}
+        llm_result = self.llm_result or {}
+        return {
+            "created_at": self.started_at,
+            "request_id": self.log_tag.strip("[]"),
+            "trace_id": trace.trace_id if trace else None,
+            "text": self.text,
+            "intent": self.intent,
+            "confidence": self.confidence,
+            "entities": self.entities,
+            "local_intent": local_result.get("intent"),
+            "local_confidence": local_result.get("confidence"),
+            "local_result": self.local_result,
+            "llm_intent": llm_result.get("intent"),
+            "llm_confidence": llm_result.get("confidence"),
+            "llm_result": self.llm_result,
+            "llm_fallback_used": self.llm_fallback_used,
+            "answered_by": self.answered_by,
+            "tier_attempts": self.tier_attempts,
+            "cache_hit": self.cache_hit,
+            "action_result": self.action_result,
+            "speech_text": self.speech_text,
+            "stage_timings": trace.stage_timings() if trace else None,
+            "duration_ms": round((time.perf_counter() - self._started_perf) * 1000, 3)
+        }
@@ -0,0 +1,163 @@
+"""
+Speculative LLM fallback.
+Starts the LLM request alongside local intent recognition so the fallback
+path costs max(rasa, llm) instead of rasa + llm, and tracks wasted calls.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+from typing import Dict, Any, Optional
+from app.core.metrics import SPECULATIVE_CALLS
+
+logger = logging.getLogger(__name__)
+
+# Words the local model is trained on. Utterances with none of them are
+# very likely to end up out_of_scope / low confidence.
+LOCAL_INTENT_KEYWORDS = {
+    # greet
+    "hi", "hello", "hey", "morning", "evening", "greetings", "hola", "howdy", "yo", "namaste", "up",
+    # devices
+    "turn", "switch", "power", "on", "off", "activate", "kill", "shut", "start",
+    "light", "lights", "lamp", "fan", "fans", "bulbs", "dark", "bright", "brighter", "ac",
+    # time / day / date
+    "time", "clock", "day", "date", "today", "week", "month", "monday", "tuesday",
+    "wednesday", "thursday", "friday", "saturday", "sunday"
+}
+
+# Openers of general questions the local model cannot answer
+QUESTION_OPENERS = {"who", "why", "how", "explain", "tell", "where", "which", "define", "should", "can", "could"}
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+class FallbackPredictor:
+    """Cheap keyword check that flags utterances likely to need the LLM."""
+
+    def __init__(self, keywords=None):
+        self.keywords = set(keywords or LOCAL_INTENT_KEYWORDS)
+
+    def likely_fallback(self, text: str) -> bool:
+        words = _WORD_RE.findall(text.lower())
+        if not words:
+            return False
+        hits = sum(1 for word in words if word in self.keywords)
+        if hits == 0:
+            return True
+        # long questions with a single incidental keyword ("how long is a day on mars")
+        return words[0] in QUESTION_OPENERS and hits == 1 and len(words) > 4
+
+
+class SpeculationStats:
+    """Counters for speculative LLM calls."""
+
+    def __init__(self):
+        self.launched = 0
+        self.used = 0
+        self.cancelled = 0
+        self.wasted = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "launched": self.launched,
+            "used": self.used,
+            "cancelled": self.cancelled,
+            "wasted": self.wasted,
+            "waste_rate": round(self.wasted / self.launched, 4) if self.launched else 0.0
+        }
+
+
+class StartGate:
+    """
+    Shared by a speculative call and its discard; whichever claims it first
+    wins, so a discarded call either never reaches the provider or counts as wasted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state: Optional[str] = None
+
+    def _claim(self, state: str) -> bool:
+        with self._lock:
+            if self.state is None:
+                self.state = state
+            return self.state == state
+
+    def start(self) -> bool:
+        """Called by the call itself right before the provider request."""
+        return self._claim("started")
+
+    def cancel(self) -> bool:
+        """True when the call had not started and now never will."""
+        return self._claim("cancelled")
+
+    def wrap(self, func):
+        """Blocking function that does nothing once the gate was cancelled."""
+        def call(*args, **kwargs):
+            if not self.start():
+                return None
+            return func(*args, **kwargs)
+        return call
+
+
+class Speculator:
+    """Decides when to speculate and accounts for the outcome."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        spec_config = self.config.get('settings', {}).get('speculation', {}) or {}
+        self.enabled = spec_config.get('enabled', False)
+        # "always" speculates on every request, "predicted" only on likely fallbacks
+        self.mode = spec_config.get('mode', 'predicted')
+        self.predictor = FallbackPredictor(spec_config.get('keywords'))
+        self.stats = SpeculationStats()
+        self._gates: Dict[asyncio.Future, StartGate] = {}
+
+    def should_speculate(self, text: str) -> bool:
+        if not self.enabled:
+            return False
+        if self.mode == 'always':
+            return True
+        return self.predictor.likely_fallback(text)
+
+    def launched(self, task: asyncio.Future, gate: Optional[StartGate] = None) -> asyncio.Future:
+        if gate is not None:
+            self._gates[task] = gate
+        self.stats.launched += 1
+        SPECULATIVE_CALLS.labels(outcome="launched").inc()
+        return task
+
+    def use(self, task: asyncio.Future) -> asyncio.Future:
+        self._gates.pop(task, None)
+        self.stats.used += 1
+        SPECULATIVE_CALLS.labels(outcome="used").inc()
+        return task
+
+    def discard(self, task: asyncio.Future):
+        """Drop a speculative call whose result is not needed."""
+        gate = self._gates.pop(task, None)
+        if not task.done():
+            task.cancel()
+            if gate is not None and gate.cancel():
+                # still queued for an admission slot or executor thread: never sent
+                self.stats.cancelled += 1
+                SPECULATIVE_CALLS.labels(outcome="cancelled").inc()
+                return
+            # a call already running on the llm executor finishes in the background
+        elif not task.cancelled():
+            # retrieve the exception (if any) so asyncio does not warn about it
+            task.exception()
+        self.stats.wasted += 1
+        SPECULATIVE_CALLS.labels(outcome="wasted").inc()
+
+
+# Global speculator instance
+_speculator = None
+
+def get_speculator(config: Optional[Dict[str, Any]] = None) -> Speculator:
+    """Get or create the global speculator instance."""
+    global _speculator
+    if _speculator is None:
+        _speculator = Speculator(config)
+    return _speculator
@@ -0,0 +1,93 @@
+"""Tests for the intent result cache."""
+
+from app.core import intent_cache
+from app.core.intent_cache import IntentCache, normalize_text
+
+RESULT = {"intent": "turn_on_device", "confidence": 0.97, "entities": {"device": "fans"}}
+
+
+def _cache(**settings) -> IntentCache:
+    return IntentCache({"settings": {"intent_cache": settings}})
+
+
+def test_normalize_text():
+    assert normalize_text("Um, turn ON the lights please!") == "turn on the lights"
+    assert normalize_text("  what’s   the time? ") == "what's the time"
+    # an utterance made only of fillers keeps its words
+    assert normalize_text("Umm...") == "umm"
+
+
+def test_hit_across_fillers_and_punctuation():
+    cache = _cache()
+    cache.put("turn on the fan", "v1", RESULT)
+    assert cache.get("Please, turn on the fan!", "v1") == RESULT
+    assert cache.get("turn off the fan", "v1") is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_model_version_is_part_of_the_key():
+    cache = _cache()
+    cache.put("turn on the fan", "v1", RESULT)
+    assert cache.get("turn on the fan", "v2") is None
+    assert cache.get("turn on the fan", "v1") == RESULT
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(intent_cache.time, "monotonic", lambda: now[0])
+    cache = _cache(ttl=60)
+    cache.put("turn on the fan", "v1", RESULT)
+    now[0] += 60
+    assert cache.get("turn on the fan", "v1") == RESULT
+    now[0] += 1
+    assert cache.get("turn on the fan", "v1") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = _cache(max_entries=2)
+    cache.put("one", "v1", RESULT)
+    cache.put("two", "v1", RESULT)
+    cache.get("one", "v1")
+    cache.put("three", "v1", RESULT)
+    assert cache.get("two", "v1") is None
+    assert cache.get("one", "v1") is not None
+    assert cache.get("three", "v1") is not None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_direct_responses_are_only_cached_when_configured():
+    answer = {"intent": "direct_response", "confidence": 1.0, "entities": {}, "response": "Sunny."}
+    cache = _cache()
+    cache.put("what's the weather", "v1", answer)
+    assert cache.get("what's the weather", "v1") is None
+
+    cache = _cache(cache_direct_responses=True)
+    cache.put("what's the weather", "v1", answer)
+    assert cache.get("what's the weather", "v1") == answer
+
+
+def test_cached_result_is_a_copy():
+    cache = _cache()
+    result = {"intent": "turn_on_device", "confidence": 0.97, "entities": {"device": "fans"}}
+    cache.put("turn on the fan", "v1", result)
+    result["entities"]["device"] = "all_lights"
+    hit = cache.get("turn on the fan", "v1")
+    hit["entities"]["device"] = "night_mode"
+    assert cache.get("turn on the fan", "v1")["entities"]["device"] == "fans"
+
+
+def test_invalidate_drops_every_entry():
+    cache = _cache()
+    cache.put("turn on the fan", "v1", RESULT)
+    cache.invalidate()
+    assert cache.get("turn on the fan", "v1") is None
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = _cache(enabled=False)
+    cache.put("turn on the fan", "v1", RESULT)
+    assert cache.get("turn on the fan", "v1") is None
+    assert cache.get_stats()["misses"] == 0
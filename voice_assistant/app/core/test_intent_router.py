@@ -0,0 +1,233 @@
+"""Tests for the cascading intent router."""
+
+import asyncio
+import threading
+from typing import Dict, Any, List
+from app.core.intent_router import IntentRouter, has_native_async
+from app.modules.intent.base import BaseIntent
+
+
+class FakeIntent(BaseIntent):
+    """Answers every text with a fixed result and records what it was asked."""
+
+    def __init__(self, intent: str, confidence: float = 1.0, entities: Dict[str, Any] = None):
+        super().__init__()
+        self.result = {"intent": intent, "confidence": confidence, "entities": entities or {}}
+        self.texts: List[str] = []
+        self.batches: List[List[str]] = []
+        self.threads: List[str] = []
+
+    def initialize(self) -> bool:
+        return True
+
+    def recognize_intent(self, text: str, **kwargs) -> Dict[str, Any]:
+        self.texts.append(text)
+        self.threads.append(threading.current_thread().name)
+        return dict(self.result)
+
+    def recognize_intents(self, texts: List[str], **kwargs) -> List[Dict[str, Any]]:
+        self.batches.append(list(texts))
+        return [self.recognize_intent(text) for text in texts]
+
+
+class AsyncFakeIntent(FakeIntent):
+    """Fake with its own async path, optionally slow."""
+
+    def __init__(self, intent: str, delay: float = 0.0, **kwargs):
+        super().__init__(intent, **kwargs)
+        self.delay = delay
+
+    async def recognize_intent_async(self, text: str, **kwargs) -> Dict[str, Any]:
+        await asyncio.sleep(self.delay)
+        return self.recognize_intent(text)
+
+
+class FailingIntent(FakeIntent):
+    def recognize_intent(self, text: str, **kwargs) -> Dict[str, Any]:
+        raise RuntimeError("model not loaded")
+
+
+def _router(tiers: List[Dict[str, Any]], modules: Dict[str, Any]) -> IntentRouter:
+    router = IntentRouter({"settings": {"intent_router": {"tiers": tiers}}})
+    router.bind(modules)
+    return router
+
+
+TWO_TIERS = [
+    {"module": "local_intent", "threshold": 0.5},
+    {"module": "llm_intent", "final": True}
+]
+
+
+def test_confident_first_tier_answers():
+    local = FakeIntent("ask_time", 0.9)
+    llm = FakeIntent("direct_response")
+    route = _router(TWO_TIERS, {"local_intent": local, "llm_intent": llm}).route("what time is it")
+    assert route.answered_by == "local_intent"
+    assert route.result["intent"] == "ask_time"
+    assert llm.texts == []
+
+
+def test_low_confidence_falls_through_to_final_tier():
+    local = FakeIntent("ask_time", 0.3)
+    llm = FakeIntent("direct_response", 0.0)
+    route = _router(TWO_TIERS, {"local_intent": local, "llm_intent": llm}).route("what is a black hole")
+    assert route.answered_by == "llm_intent"
+    assert [attempt["outcome"] for attempt in route.attempts] == ["low_confidence", "accepted"]
+    assert route.local_result["intent"] == "ask_time"
+    assert route.final_result["intent"] == "direct_response"
+
+
+def test_short_circuit_rules():
+    tiers = [
+        {"module": "grammar_intent", "threshold": 0.99, "accept_intents": ["greet"], "pass_intents": ["ask_date"]},
+        {"module": "llm_intent", "final": True}
+    ]
+    llm = FakeIntent("direct_response")
+
+    route = _router(tiers, {"grammar_intent": FakeIntent("greet", 0.1), "llm_intent": llm}).route("hi")
+    assert route.answered_by == "grammar_intent"
+
+    route = _router(tiers, {"grammar_intent": FakeIntent("ask_date", 1.0), "llm_intent": llm}).route("date")
+    assert route.attempts[0]["outcome"] == "passed"
+    assert route.answered_by == "llm_intent"
+
+    route = _router(tiers, {"grammar_intent": FakeIntent("out_of_scope", 1.0), "llm_intent": llm}).route("poem")
+    assert route.attempts[0]["outcome"] == "out_of_scope"
+
+
+def test_device_intent_without_a_device_is_not_accepted():
+    local = FakeIntent("turn_on_device", 0.95)
+    route = _router(TWO_TIERS, {"local_intent": local, "llm_intent": FakeIntent("direct_response")}).route("turn it on")
+    assert route.attempts[0]["outcome"] == "no_device"
+    assert route.answered_by == "llm_intent"
+
+
+def test_gazetteer_fills_the_device_before_the_check():
+    local = FakeIntent("turn_on_device", 0.95)
+    route = _router(TWO_TIERS, {"local_intent": local, "llm_intent": FakeIntent("direct_response")}).route("turn on the fan")
+    assert route.answered_by == "local_intent"
+    assert route.result["entities"]["device"] == "fans"
+
+
+def test_failing_tier_and_missing_module_are_skipped():
+    tiers = [{"module": "grammar_intent", "threshold": 0.5}] + TWO_TIERS
+    local = FakeIntent("ask_day", 0.9)
+    router = _router(tiers, {"grammar_intent": FailingIntent("greet"), "local_intent": local})
+    route = router.route("what day is it")
+    assert route.attempts[0]["outcome"] == "error"
+    assert route.answered_by == "local_intent"
+
+    router.bind({"llm_intent": FakeIntent("direct_response")})
+    assert router.route("what day is it").answered_by == "llm_intent"
+
+
+def test_overrides_win_over_bound_modules():
+    router = _router(TWO_TIERS, {"local_intent": FakeIntent("ask_time", 0.9), "llm_intent": FakeIntent("direct_response")})
+    override = FakeIntent("ask_date", 0.9)
+    route = router.route("what is the date", overrides={"local_intent": override})
+    assert route.result["intent"] == "ask_date"
+    assert override.texts == ["what is the date"]
+
+
+def test_async_tier_over_budget_is_abandoned():
+    tiers = [
+        {"module": "local_intent", "threshold": 0.5, "budget_ms": 50},
+        {"module": "llm_intent", "final": True}
+    ]
+    slow = AsyncFakeIntent("ask_time", delay=5.0, confidence=0.9)
+    llm = AsyncFakeIntent("direct_response")
+    router = _router(tiers, {"local_intent": slow, "llm_intent": llm})
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        route = await router.route_async("what time is it")
+        return route, loop.time() - start
+
+    route, seconds = asyncio.run(scenario())
+    assert seconds < 1.0
+    assert route.attempts[0]["outcome"] == "over_budget"
+    assert route.answered_by == "llm_intent"
+    assert slow.texts == []
+
+
+def test_native_async_module_is_awaited_directly_unless_an_executor_is_set():
+    module = AsyncFakeIntent("ask_time", confidence=0.9)
+    assert has_native_async(module)
+    assert not has_native_async(FakeIntent("ask_time"))
+
+    asyncio.run(_router(TWO_TIERS, {"local_intent": module}).route_async("time"))
+    assert module.threads == [threading.current_thread().name]
+
+    tiers = [{"module": "local_intent", "threshold": 0.5, "executor": "llm"}, TWO_TIERS[1]]
+    asyncio.run(_router(tiers, {"local_intent": module}).route_async("time"))
+    assert module.threads[-1].startswith("va-llm")
+
+
+def test_speculative_call_answers_the_llm_tier():
+    local = FakeIntent("ask_time", 0.1)
+    llm = AsyncFakeIntent("direct_response")
+    router = _router(TWO_TIERS, {"local_intent": local, "llm_intent": llm})
+    assert router.can_speculate()
+
+    async def scenario():
+        speculative = asyncio.ensure_future(asyncio.sleep(0, result={
+            "intent": "direct_response", "confidence": 1.0, "entities": {}, "response": "speculated"}))
+        return await router.route_async("what is a black hole", speculative=speculative)
+
+    route = asyncio.run(scenario())
+    assert route.speculative_used
+    assert route.answered_by == "llm_intent"
+    assert route.result["response"] == "speculated"
+    assert llm.texts == []
+
+
+def test_speculative_call_is_not_used_for_another_final_tier():
+    tiers = [
+        {"module": "local_intent", "threshold": 0.5},
+        {"module": "rasa_intent", "final": True},
+        {"module": "llm_intent", "final": True}
+    ]
+    rasa = FakeIntent("ask_day", 0.2)
+    router = _router(tiers, {"local_intent": FakeIntent("greet", 0.1), "rasa_intent": rasa,
+                             "llm_intent": FakeIntent("direct_response")})
+    assert router.final_tier().module == "rasa_intent"
+    assert not router.can_speculate()
+
+    async def scenario():
+        speculative = asyncio.ensure_future(asyncio.sleep(0, result={"intent": "direct_response"}))
+        route = await router.route_async("what day is it", speculative=speculative)
+        await speculative
+        return route
+
+    route = asyncio.run(scenario())
+    assert not route.speculative_used
+    assert route.answered_by == "rasa_intent"
+    assert rasa.texts == ["what day is it"]
+
+
+def test_batch_sends_one_call_per_tier_for_unanswered_texts():
+    class ByText(FakeIntent):
+        def recognize_intent(self, text: str, **kwargs) -> Dict[str, Any]:
+            super().recognize_intent(text)
+            confident = text.startswith("what time")
+            return {"intent": "ask_time", "confidence": 0.9 if confident else 0.1, "entities": {}}
+
+    local = ByText("ask_time")
+    llm = FakeIntent("direct_response")
+    texts = ["what time is it", "tell me a joke", "what time is it now"]
+    routes = asyncio.run(_router(TWO_TIERS, {"local_intent": local, "llm_intent": llm}).route_batch(texts))
+    assert local.batches == [texts]
+    assert [route.answered_by for route in routes] == ["local_intent", "llm_intent", "local_intent"]
+    assert llm.texts == ["tell me a joke"]
+
+
+def test_stats_count_attempts_and_answers():
+    router = _router(TWO_TIERS, {"local_intent": FakeIntent("ask_time", 0.1), "llm_intent": FakeIntent("direct_response")})
+    router.route("one")
+    router.route("two")
+    stats = {tier["name"]: tier for tier in router.get_stats()["tiers"]}
+    assert stats["local_intent"]["attempts"] == 2
+    assert stats["local_intent"]["outcomes"] == {"low_confidence": 2}
+    assert stats["llm_intent"]["answered"] == 2
@@ -0,0 +1,143 @@
+"""Tests for speculative LLM fallback accounting."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.core.speculation import FallbackPredictor, StartGate, Speculator
+
+
+def _speculator(**settings) -> Speculator:
+    return Speculator({"settings": {"speculation": {"enabled": True, **settings}}})
+
+
+def test_predictor_flags_utterances_without_local_keywords():
+    predictor = FallbackPredictor()
+    assert predictor.likely_fallback("what is the capital of france")
+    assert not predictor.likely_fallback("turn on the fan")
+    assert not predictor.likely_fallback("")
+
+
+def test_predictor_flags_long_questions_with_one_incidental_keyword():
+    predictor = FallbackPredictor()
+    assert predictor.likely_fallback("why is the sky so dark at night")
+    assert not predictor.likely_fallback("what day is it")
+
+
+def test_should_speculate_modes():
+    assert not Speculator().should_speculate("what is the capital of france")
+    assert _speculator(mode="always").should_speculate("turn on the fan")
+    predicted = _speculator()
+    assert predicted.should_speculate("what is the capital of france")
+    assert not predicted.should_speculate("turn on the fan")
+
+
+def test_gate_first_claim_wins():
+    gate = StartGate()
+    assert gate.start()
+    assert gate.start()
+    assert not gate.cancel()
+
+    gate = StartGate()
+    assert gate.cancel()
+    assert not gate.start()
+
+
+def test_wrapped_call_is_skipped_after_cancel():
+    calls = []
+    gate = StartGate()
+    wrapped = gate.wrap(lambda text: calls.append(text) or text)
+    assert gate.cancel()
+    assert wrapped("hello") is None
+    assert calls == []
+
+    gate = StartGate()
+    assert gate.wrap(lambda text: text)("hello") == "hello"
+    assert not gate.cancel()
+
+
+def test_discard_before_start_counts_as_cancelled():
+    async def scenario():
+        speculator = _speculator()
+        gate = StartGate()
+        task = speculator.launched(asyncio.ensure_future(asyncio.sleep(1)), gate)
+        speculator.discard(task)
+        await asyncio.sleep(0)
+        return speculator.stats.to_dict(), task, gate
+
+    stats, task, gate = asyncio.run(scenario())
+    assert task.cancelled()
+    assert gate.state == "cancelled"
+    assert stats["launched"] == 1
+    assert stats["cancelled"] == 1
+    assert stats["wasted"] == 0
+
+
+def test_discard_after_start_counts_as_wasted():
+    async def scenario():
+        speculator = _speculator()
+        gate = StartGate()
+        task = speculator.launched(asyncio.ensure_future(asyncio.sleep(1)), gate)
+        assert gate.start()
+        speculator.discard(task)
+        await asyncio.sleep(0)
+        return speculator.stats.to_dict()
+
+    stats = asyncio.run(scenario())
+    assert stats["cancelled"] == 0
+    assert stats["wasted"] == 1
+    assert stats["waste_rate"] == 1.0
+
+
+def test_discard_of_finished_call_retrieves_its_exception():
+    async def fail():
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        speculator = _speculator()
+        task = speculator.launched(asyncio.ensure_future(fail()), StartGate())
+        await asyncio.sleep(0)
+        assert task.done()
+        speculator.discard(task)
+        return speculator.stats.to_dict()
+
+    stats = asyncio.run(scenario())
+    assert stats["cancelled"] == 0
+    assert stats["wasted"] == 1
+
+
+def test_used_call_is_no_longer_tracked():
+    async def scenario():
+        speculator = _speculator()
+        gate = StartGate()
+        task = speculator.launched(asyncio.ensure_future(asyncio.sleep(0, result="answer")), gate)
+        result = await speculator.use(task)
+        return speculator, result
+
+    speculator, result = asyncio.run(scenario())
+    assert result == "answer"
+    assert speculator._gates == {}
+    assert speculator.stats.used == 1
+    assert speculator.stats.wasted == 0
+
+
+def test_queued_blocking_call_never_runs_once_discarded():
+    """A call waiting for the executor thread is cancelled before it reaches the provider."""
+    release = threading.Event()
+    calls = []
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        speculator = _speculator()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            busy = loop.run_in_executor(executor, release.wait)
+            gate = StartGate()
+            task = speculator.launched(loop.run_in_executor(executor, gate.wrap(calls.append), "queued"), gate)
+            speculator.discard(task)
+            release.set()
+            await busy
+        return speculator.stats.to_dict()
+
+    stats = asyncio.run(scenario())
+    assert calls == []
+    assert stats["cancelled"] == 1
+    assert stats["wasted"] == 0
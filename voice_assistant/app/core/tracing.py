@@ -0,0 +1,305 @@
+"""
+Per-request tracing for the voice pipeline.
+Each request records a trace with one span per stage (local intent, LLM
+fallback, action, MQTT publish, TTS synthesis/playback). Finished traces
+are kept in memory for the /traces endpoints and exported in the background
+to a JSONL file and/or an OTLP/HTTP collector.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+from app.core.metrics import STAGE_LATENCY
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed pipeline stage."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self._start_perf = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+
+    @property
+    def end_ns(self) -> int:
+        return self.start_ns + int((self.duration_ms or 0) * 1e6)
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self, status: Optional[str] = None):
+        if self.duration_ms is None:
+            self.duration_ms = (time.perf_counter() - self._start_perf) * 1000
+        if status:
+            self.status = status
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class Trace:
+    """All spans recorded for one request."""
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(name, self.trace_id, attributes=attributes)
+        self.spans: List[Span] = [self.root]
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.root.name
+
+    def add_span(self, span: Span):
+        # spans are opened from executor threads too
+        with self._lock:
+            self.spans.append(span)
+
+    def stage_timings(self) -> Dict[str, float]:
+        """Total milliseconds spent per span name."""
+        timings: Dict[str, float] = {}
+        for span in self.spans[1:]:
+            if span.duration_ms is not None:
+                timings[span.name] = round(timings.get(span.name, 0.0) + span.duration_ms, 3)
+        return timings
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start_ns": self.root.start_ns,
+            "duration_ms": round(self.root.duration_ms, 3) if self.root.duration_ms is not None else None,
+            "status": self.root.status,
+            "attributes": self.root.attributes,
+            "stages": self.stage_timings(),
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+
+class JSONLTraceExporter:
+    """Append finished traces to a JSON-lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, traces: List[Trace]):
+        with open(self.path, 'a') as file:
+            for trace in traces:
+                file.write(json.dumps(trace.to_dict(), default=str) + "\n")
+
+
+class OTLPTraceExporter:
+    """Send finished traces to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = "voice_assistant", timeout: float = 2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def _span(self, span: Span) -> Dict[str, Any]:
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [self._attribute(k, v) for k, v in span.attributes.items()],
+            # 1 = OK, 2 = ERROR
+            "status": {"code": 1 if span.status == "ok" else 2}
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        return otlp_span
+
+    def export(self, traces: List[Trace]):
+        import requests
+
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [self._span(span) for trace in traces for span in trace.spans]
+                }]
+            }]
+        }
+        response = requests.post(self.endpoint, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class Tracer:
+    """Creates traces, keeps recent ones in memory and exports them off the request path."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        tracing_config = self.config.get('settings', {}).get('tracing', {}) or {}
+        self.enabled = tracing_config.get('enabled', True)
+        self.recent: deque = deque(maxlen=tracing_config.get('buffer_size', 200))
+        self.exporters = []
+        self.export_errors = 0
+
+        if tracing_config.get('file'):
+            self.exporters.append(JSONLTraceExporter(tracing_config['file']))
+        if tracing_config.get('otlp_endpoint'):
+            self.exporters.append(OTLPTraceExporter(
+                tracing_config['otlp_endpoint'],
+                service_name=tracing_config.get('service_name', 'voice_assistant')
+            ))
+
+        self._export_queue: "queue.Queue[Trace]" = queue.Queue(maxsize=tracing_config.get('export_queue_size', 1000))
+        self._export_thread = None
+        if self.exporters:
+            self._export_thread = threading.Thread(target=self._export_loop, name="va-trace-export", daemon=True)
+            self._export_thread.start()
+
+    def finish(self, trace: Trace):
+        trace.root.end()
+        self.recent.append(trace)
+        for finished in trace.spans:
+            if finished.duration_ms is not None:
+                STAGE_LATENCY.labels(stage=finished.name).observe(finished.duration_ms / 1000)
+        if self.exporters:
+            try:
+                self._export_queue.put_nowait(trace)
+            except queue.Full:
+                self.export_errors += 1
+
+    def _export_loop(self):
+        while True:
+            batch = [self._export_queue.get()]
+            while len(batch) < 50:
+                try:
+                    batch.append(self._export_queue.get_nowait())
+                except queue.Empty:
+                    break
+            for exporter in self.exporters:
+                try:
+                    exporter.export(batch)
+                except Exception as e:
+                    self.export_errors += 1
+                    logger.warning(f"Trace export via {exporter.__class__.__name__} failed: {str(e)}")
+
+    def get_trace(self, trace_id: str) -> Optional[Trace]:
+        for trace in self.recent:
+            if trace.trace_id == trace_id:
+                return trace
+        return None
+
+    def query(self, limit: int = 20, name: Optional[str] = None, min_duration_ms: float = 0.0) -> List[Trace]:
+        """Most recent finished traces first."""
+        result = []
+        for trace in reversed(self.recent):
+            if name and trace.name != name:
+                continue
+            if (trace.root.duration_ms or 0) < min_duration_ms:
+                continue
+            result.append(trace)
+            if len(result) >= limit:
+                break
+        return result
+
+
+# Global tracer instance
+_tracer = None
+
+def get_tracer(config: Optional[Dict[str, Any]] = None) -> Tracer:
+    """Get or create the global tracer instance."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(config)
+    return _tracer
+
+
+def current_trace() -> Optional[Trace]:
+    """The trace of the request being processed, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """Start a trace for one request; finished and recorded on exit."""
+    tracer = get_tracer()
+    if not tracer.enabled:
+        yield None
+        return
+
+    new_trace = Trace(name, attributes)
+    trace_token = _current_trace.set(new_trace)
+    span_token = _current_span.set(new_trace.root)
+    try:
+        yield new_trace
+    except BaseException:
+        new_trace.root.status = "error"
+        raise
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        tracer.finish(new_trace)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a stage inside the current trace. No-op outside a trace."""
+    active_trace = _current_trace.get()
+    if active_trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    new_span = Span(name, active_trace.trace_id, parent.span_id if parent else None, attributes)
+    active_trace.add_span(new_span)
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except asyncio.CancelledError:
+        new_span.end("cancelled")
+        raise
+    except BaseException as e:
+        new_span.set_attribute("error", str(e)[:200])
+        new_span.end("error")
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span.end()
@@ -4,20 +4,39 @@ Main FastAPI application for the modular voice assistant platform.
 
 import logging
 import asyncio
-from typing import Dict, Any, Optional
+import os
+import base64
+import json
+from typing import Dict, Any, List, Optional
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 from dotenv import load_dotenv
 load_dotenv()
 
-from app.core.module_loader import initialize_modules, ModuleLoader
+from app.core.module_loader import initialize_modules, ModuleLoader, MODULE_READY
 from app.core.config import Config
-from app.core.processor import RequestProcessor
-# Load configuration
-config = Config()
+from app.core.async_processor import AsyncRequestProcessor, process_batch
+from app.core.executors import configure_executors, run_blocking, shutdown_executors
+from app.core.loop_thread import stop_background_loops
+from app.modules.intent.rasa_workers import stop_worker_pools
+from app.modules.intent.gazetteer import get_gazetteer
+from app.core.intent_thresholds import get_intent_thresholds
+from app.core.intent_router import get_intent_router
+from app.core.http_client import get_http_client, stop_http_client
+from app.core.speculation import get_speculator
+from app.core.intent_cache import get_intent_cache
+from app.core.interaction_log import start_interaction_log, get_interaction_log, stop_interaction_log
+from app.core.tracing import get_tracer, trace
+from app.constants import BATCH_MAX_ITEMS
+from app.modules.tts.playback import start_playback_worker, get_playback_worker, stop_playback_worker, PRIORITY_HIGH
+from app.core.admission import get_admission_controller, AdmissionMiddleware, BusyError
+from app.core.metrics import render as render_metrics, CONTENT_TYPE, REQUESTS_TOTAL, REQUESTS_IN_FLIGHT
+# Load configuration (VA_CONFIG selects another file, e.g. config.offline.yaml)
+CONFIG_PATH = os.environ.get("VA_CONFIG", "config.yaml")
+config = Config(CONFIG_PATH)
 
 # Configure logging from config
 logging_config = config.get_setting('settings', {}).get('logging', {})
@@ -46,16 +65,33 @@ async def lifespan(app: FastAPI):
         logger.info("Starting ===============")
         
         # Load config and Init modules 
-        config = Config("config.yaml")
+        config = Config(CONFIG_PATH)
+        configure_executors(config.config_data)
+        get_admission_controller(config.config_data)
+        get_speculator(config.config_data)
+        get_intent_cache(config.config_data)
+        get_gazetteer(config.config_data)
+        get_intent_thresholds(config.config_data)
+        get_http_client(config.config_data)
+        get_tracer(config.config_data)
+        start_playback_worker(config.config_data)
+        start_interaction_log(config.config_data)
         module_loader = ModuleLoader(config)
-        modules = module_loader.load_all_modules()
+        startup_config = config.config_data.get('settings', {}).get('startup', {}) or {}
+        if startup_config.get('background_loading', True):
+            # serve right away; /health reports each module as it becomes ready
+            modules = module_loader.load_all_modules_background()
+        else:
+            modules = module_loader.load_all_modules()
+            # load_module already initialized (and warmed up) each module
+            for module_name, state in module_loader.get_states().items():
+                if state["state"] != MODULE_READY:
+                    logger.error(f"Module '{module_name}' is not initialized")
         
-        # Initialize all modules
-        for module_name, module in modules.items():
-            if hasattr(module, 'initialize'):
-                success = module.initialize()
-                if not success:
-                    logger.error(f"Failed to initialize module '{module_name}'")
+        # tiers pick their modules up as they finish loading
+        get_intent_router(config.config_data).bind(modules)
+        if get_admission_controller().busy_speech_enabled:
+            _spawn("Busy prompt synthesis", asyncio.to_thread(_prepare_busy_clip))
         
         logger.info("Init done ===============")
         
@@ -67,6 +103,12 @@ async def lifespan(app: FastAPI):
     
     # Shutdown (if needed)
     logger.info("Shutting down Voice Assistant Platform...")
+    stop_playback_worker()
+    shutdown_executors()
+    stop_http_client()
+    stop_background_loops()
+    stop_worker_pools()
+    stop_interaction_log()
 
 
 # Initialize FastAPI app
@@ -77,11 +119,90 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Modules that must be ready before /health reports ready
+REQUIRED_MODULES = ["local_intent", "actions", "tts"]
+
+# Endpoints that go through admission control
+ADMITTED_PATHS = [
+    "/process_intent",
+    "/process_intent/batch",
+    "/process_intent/stream",
+    "/test/intent",
+    "/test/intent/batch",
+    "/test/tts"
+]
+
+# tasks started by handlers and left running, referenced until they finish
+_background_tasks = set()
+
+def _spawn(name: str, awaitable) -> asyncio.Future:
+    """Run in the background, keeping a reference and logging a failure."""
+    task = asyncio.ensure_future(awaitable)
+    _background_tasks.add(task)
+
+    def _done(task):
+        _background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{name} failed: {str(task.exception())}")
+
+    task.add_done_callback(_done)
+    return task
+
+# the busy prompt, synthesized once so overload costs only a playback enqueue
+_busy_clip = None
+
+def _prepare_busy_clip():
+    """Synthesize the busy prompt once the TTS module is loaded (TTS modules that can)."""
+    global _busy_clip
+    if module_loader:
+        module_loader.wait_until_loaded()
+    tts_module = modules.get('tts', None)
+    if not hasattr(tts_module, 'synthesize'):
+        return
+    result = tts_module.synthesize(get_admission_controller().busy_speech_text)
+    if not result.get("success"):
+        raise RuntimeError(result.get("error", "synthesis failed"))
+    _busy_clip = result["clip"]
+
+def _speak_busy(text: str):
+    """Fallback when there is no clip: speak directly, outside the admitted tts stage."""
+    tts_module = modules.get('tts', None)
+    if tts_module:
+        tts_module.speak(text, priority=PRIORITY_HIGH)
+
+def _on_busy(error: BusyError):
+    """Optionally tell the household the assistant is overloaded."""
+    admission = get_admission_controller()
+    if not admission.should_speak_busy():
+        return
+    playback = get_playback_worker()
+    if _busy_clip is not None and playback:
+        # no synthesis and no tts slot while the server is shedding load
+        playback.enqueue(_busy_clip, priority=PRIORITY_HIGH)
+    else:
+        _spawn("Busy prompt", asyncio.to_thread(_speak_busy, admission.busy_speech_text))
+
+app.add_middleware(AdmissionMiddleware, paths=ADMITTED_PATHS, on_busy=_on_busy)
+
 class ProcessIntentRequest(BaseModel):
     """Request model for intent processing."""
     text: str
     context: Optional[Dict[str, Any]] = None
 
+class ProcessIntentStreamRequest(BaseModel):
+    """Request model for streamed intent processing."""
+    text: str
+    context: Optional[Dict[str, Any]] = None
+    # also play the reply on the server's speaker
+    play_local: bool = False
+
+class ProcessIntentBatchRequest(BaseModel):
+    """Request model for batch intent processing."""
+    texts: List[str]
+    context: Optional[Dict[str, Any]] = None
+    execute_actions: bool = True
+    speak: bool = False
+
 
 @app.get("/")
 async def home():
@@ -90,14 +211,173 @@ async def home():
         "message": "Hello from AI_ASS"
     }
 
+def _warmup_stats(module) -> Optional[Dict[str, Any]]:
+    """Warm-up numbers of the module (or the model behind a grammar front end)."""
+    for candidate in (module, getattr(module, 'fallback', None)):
+        stats = getattr(candidate, 'warmup_stats', None)
+        if stats:
+            return stats
+    return None
+
+def _rasa_module(module):
+    """The Rasa module itself or the one behind a grammar front end."""
+    for candidate in (module, getattr(module, 'fallback', None)):
+        if hasattr(candidate, 'worker_pool'):
+            return candidate
+    return None
+
+def _fallback_ready(module) -> bool:
+    """The model behind a grammar front end has loaded and warmed up (True without one)."""
+    return getattr(module, 'fallback_state', None) in (None, "ready")
+
+def _can_serve() -> bool:
+    """Requests can be answered once an intent tier and the actions are ready."""
+    return _intent_ready() and 'actions' in modules
+
+def _intent_ready() -> bool:
+    """At least one intent router tier has its module loaded."""
+    return bool(get_intent_router().get_stats()["loaded"])
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
+    """
+    Health and readiness. Modules load in the background: "degraded" while
+    requests are served by the tiers that are ready, 503 until any can be.
+    """
+    module_states = module_loader.get_states() if module_loader else {}
+    local_intent = modules.get('local_intent')
+    if getattr(local_intent, 'fallback_state', None):
+        # the model behind the grammar loads after the grammar itself is serving
+        module_states.setdefault('local_intent', {})['fallback'] = local_intent.fallback_state
+    # routed only once the model is hot, not just the grammar in front of it
+    ready = all(name in modules for name in REQUIRED_MODULES) and _fallback_ready(local_intent)
+    serving = _can_serve()
+    body = {
+        "status": "healthy" if ready else ("degraded" if serving else "starting"),
+        "ready": ready,
+        "serving": serving,
         "modules_loaded": len(modules),
-        "available_modules": list(modules.keys())
+        "available_modules": list(modules.keys()),
+        "modules": module_states,
+        "warmup": _warmup_stats(modules['local_intent']) if 'local_intent' in modules else None
     }
+    if not serving:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics."""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+@app.get("/stats/speculation")
+async def speculation_stats():
+    """Speculative LLM fallback counters."""
+    speculator = get_speculator()
+    return {
+        "enabled": speculator.enabled,
+        "mode": speculator.mode,
+        **speculator.stats.to_dict()
+    }
+
+@app.get("/stats/cache")
+async def cache_stats():
+    """Intent cache hit rate and size."""
+    return get_intent_cache().get_stats()
+
+@app.delete("/cache/intent")
+async def clear_intent_cache():
+    """Drop all cached intent results."""
+    get_intent_cache().invalidate()
+    return {"success": True}
+
+@app.get("/stats/http_client")
+async def http_client_stats():
+    """Shared outbound HTTP client: requests, protocol versions and pre-warmed origins."""
+    return get_http_client().get_stats()
+
+@app.get("/stats/router")
+async def router_stats():
+    """Intent tiers: attempts, answers and outcomes per tier."""
+    return get_intent_router().get_stats()
+
+@app.get("/stats/thresholds")
+async def threshold_stats():
+    """Per-intent LLM fallback thresholds in use."""
+    return get_intent_thresholds().get_stats()
+
+@app.post("/admin/thresholds/reload")
+async def reload_thresholds():
+    """Re-read the thresholds file written by tools/optimize_thresholds.py."""
+    stats = get_intent_thresholds().reload()
+    # cached local answers were accepted under the old thresholds
+    get_intent_cache().invalidate()
+    return stats
+
+@app.get("/stats/interaction_log")
+async def interaction_log_stats():
+    """Interaction log queue and write counters."""
+    interaction_log = get_interaction_log()
+    if not interaction_log:
+        return {"enabled": False}
+    return interaction_log.get_stats()
+
+@app.get("/stats/rasa")
+async def rasa_stats():
+    """Rasa warm-up, micro-batching and worker process utilization."""
+    rasa_module = _rasa_module(modules.get('local_intent'))
+    if not rasa_module:
+        return {"enabled": False}
+    return rasa_module.get_stats()
+
+class ModelSwapRequest(BaseModel):
+    """Request model for a Rasa model swap."""
+    # model archive to load, the newest in the models directory when omitted
+    path: Optional[str] = None
+    # wait for the load and warm-up instead of returning 202 right away
+    wait: bool = True
+
+def _require_rasa_module():
+    rasa_module = _rasa_module(modules.get('local_intent'))
+    if not rasa_module or not rasa_module.is_initialized:
+        raise HTTPException(status_code=404, detail="No Rasa model loaded")
+    return rasa_module
+
+@app.get("/admin/models")
+async def model_status():
+    """Active, previous and available Rasa models and the swap history."""
+    return _require_rasa_module().get_model_status()
+
+async def _swap_in_background(rasa_module, path: Optional[str]):
+    result = await asyncio.to_thread(rasa_module.swap_model, path)
+    if not result.get("success"):
+        # e.g. model not found or a swap already running; load failures are in swap_state too
+        raise RuntimeError(result.get("error"))
+
+@app.post("/admin/models/swap")
+async def swap_model(request: ModelSwapRequest):
+    """Load, warm up and swap in a Rasa model while requests keep being served."""
+    rasa_module = _require_rasa_module()
+    if not request.wait:
+        _spawn("Rasa model swap", _swap_in_background(rasa_module, request.path))
+        return JSONResponse(status_code=202, content={"success": True, "swap_state": "loading"})
+    result = await asyncio.to_thread(rasa_module.swap_model, request.path)
+    if not result.get("success"):
+        return JSONResponse(status_code=409, content=result)
+    return result
+
+@app.post("/admin/models/rollback")
+async def rollback_model():
+    """Swap back to the model that was active before the last swap."""
+    result = await asyncio.to_thread(_require_rasa_module().rollback)
+    if not result.get("success"):
+        return JSONResponse(status_code=409, content=result)
+    return result
+
+@app.get("/stats/admission")
+async def admission_stats():
+    """Admission control and stage queue status."""
+    return get_admission_controller().get_status()
 
 @app.post("/process_intent")
 async def process_intent(request: ProcessIntentRequest):
@@ -115,26 +395,30 @@ async def process_intent(request: ProcessIntentRequest):
         action_module = modules.get('actions', None)
         tts_module = modules.get('tts', None)
 
-        if not intent_module or not action_module or not tts_module:
-            return {"error": f"Missing required modules: intent[{intent_module}] action[{action_module}] tts[{tts_module}]", "success": False}
+        # while modules load, serve with whatever tiers are ready (no speech without tts)
+        if not _intent_ready() or not action_module:
+            return {"error": f"Missing required modules: intent[{intent_module}] llm[{llm_intent}] action[{action_module}]", "success": False}
 
         #request processing pipeling 
-        request_processor = RequestProcessor(text, intent_module, llm_intent, action_module, tts_module)
+        request_processor = AsyncRequestProcessor(text, intent_module, llm_intent, action_module, tts_module)
+        request_processor.context = context
 
-        try:
-            # intent 
-            request_processor.process_intent()
+        REQUESTS_TOTAL.labels(endpoint="process_intent").inc()
+        with REQUESTS_IN_FLIGHT.track_inprogress(), trace("process_intent", text=text, log_tag=request_processor.log_tag):
+            try:
+                # intent 
+                await request_processor.process_intent()
 
-            # action
-            request_processor.process_action()
+                # action
+                await request_processor.process_action()
 
-            # speech response 
-            request_processor.process_speechresponse()
-            
-            return { "success": True }
-        except Exception as ex: 
-            request_processor.process_speechresponse("Sorry. Something went wrong.")
-            return { "success": False , "mssg": str(ex)[:900]}
+                # speech response 
+                await request_processor.process_speechresponse()
+                
+                return { "success": True }
+            except Exception as ex: 
+                await request_processor.process_speechresponse("Sorry. Something went wrong.")
+                return { "success": False , "mssg": str(ex)[:900]}
         
     except Exception as e:
         logger.error(f"Error processing intent: {str(e)}")
@@ -145,6 +429,164 @@ async def process_intent(request: ProcessIntentRequest):
 
 
 
+def _stream_processor(text: str, context: Optional[Dict[str, Any]]) -> AsyncRequestProcessor:
+    """Build a processor for the streaming endpoints."""
+    intent_module = modules.get('local_intent', None)
+    llm_intent = modules.get('llm_intent', None)
+    action_module = modules.get('actions', None)
+    tts_module = modules.get('tts', None)
+
+    if not _intent_ready() or not action_module:
+        raise HTTPException(status_code=503, detail=f"Missing required modules: intent[{intent_module}] llm[{llm_intent}] action[{action_module}]")
+
+    request_processor = AsyncRequestProcessor(text, intent_module, llm_intent, action_module, tts_module)
+    request_processor.context = context or {}
+    return request_processor
+
+async def _traced_stream(request_processor: AsyncRequestProcessor, play_local: bool):
+    """Stage events for one request, with the request traced like /process_intent."""
+    REQUESTS_TOTAL.labels(endpoint="process_intent_stream").inc()
+    with REQUESTS_IN_FLIGHT.track_inprogress(), trace("process_intent_stream", text=request_processor.text, log_tag=request_processor.log_tag):
+        try:
+            async for event, data in request_processor.process_stream(play_local=play_local):
+                yield event, data
+        except Exception as e:
+            logger.error(f"Error streaming intent: {str(e)}")
+            yield "error", {"error": str(e)[:900]}
+            yield "done", {"success": False}
+
+@app.post("/process_intent/stream")
+async def process_intent_stream(request: ProcessIntentStreamRequest):
+    """
+    Server-sent events: intent, action, speech, then base64 PCM audio chunks
+    while later sentences are still being synthesized.
+    """
+    request_processor = _stream_processor(request.text, request.context)
+    logger.info(f"Streaming intent for text: '{request.text}'")
+
+    async def event_source():
+        seq = 0
+        async for event, data in _traced_stream(request_processor, request.play_local):
+            if event == "audio":
+                data = {"seq": seq, "pcm": base64.b64encode(data).decode("ascii")}
+                seq += 1
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ws/process_intent")
+async def process_intent_ws(websocket: WebSocket):
+    """
+    WebSocket variant: send {"text": ..., "context": ..., "play_local": false},
+    receive JSON stage events and raw PCM audio as binary frames.
+    The connection stays open for further utterances.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_json()
+            try:
+                request_processor = _stream_processor(message.get("text", ""), message.get("context"))
+            except HTTPException as e:
+                await websocket.send_json({"event": "error", "data": {"error": e.detail}})
+                continue
+
+            try:
+                async with get_admission_controller().admit():
+                    async for event, data in _traced_stream(request_processor, bool(message.get("play_local", False))):
+                        if event == "audio":
+                            await websocket.send_bytes(data)
+                        else:
+                            await websocket.send_json({"event": event, "data": data})
+            except BusyError as e:
+                _on_busy(e)
+                await websocket.send_json({"event": "error", "data": {"error": "busy", "reason": e.reason}})
+    except WebSocketDisconnect:
+        logger.info("Streaming client disconnected")
+
+@app.post("/process_intent/batch")
+async def process_intent_batch(request: ProcessIntentBatchRequest):
+    """
+    Process many texts at once: one batched local inference call, concurrent
+    LLM fallbacks for the low-confidence subset, optional actions and TTS.
+    """
+    if len(request.texts) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(request.texts)} > {BATCH_MAX_ITEMS}")
+    
+    try:
+        intent_module = modules.get('local_intent', None)
+        llm_intent = modules.get('llm_intent', None)
+        action_module = modules.get('actions', None)
+        tts_module = modules.get('tts', None)
+
+        if not _intent_ready():
+            return {"success": False, "error": "No intent recognition modules available"}
+
+        logger.info(f"Processing intent batch of {len(request.texts)} texts")
+        REQUESTS_TOTAL.labels(endpoint="process_intent_batch").inc()
+
+        with REQUESTS_IN_FLIGHT.track_inprogress(), trace("process_intent_batch", size=len(request.texts)):
+            processors = await process_batch(
+                request.texts, intent_module, llm_intent, action_module, tts_module,
+                context=request.context,
+                execute_actions=request.execute_actions,
+                speak=request.speak
+            )
+
+        results = [p.summary() for p in processors]
+        return {
+            "success": True,
+            "count": len(results),
+            "llm_fallbacks": sum(1 for r in results if r["llm_fallback_used"]),
+            "results": results
+        }
+
+    except Exception as e:
+        logger.error(f"Error processing intent batch: {str(e)}")
+        return {
+            "success": False,
+            "mssg": str(e)[:900]
+        }
+
+@app.post("/playback/interrupt")
+async def playback_interrupt(clear_queue: bool = True):
+    """Barge-in: stop the reply being spoken, e.g. when a new wake word fires."""
+    playback_worker = get_playback_worker()
+    if not playback_worker:
+        return {"success": False, "error": "Playback worker not enabled"}
+    return {"success": True, **playback_worker.interrupt(clear_queue=clear_queue)}
+
+@app.get("/playback/status")
+async def playback_status():
+    """Playback queue status."""
+    playback_worker = get_playback_worker()
+    if not playback_worker:
+        return {"enabled": False}
+    return {"enabled": True, **playback_worker.get_status()}
+
+@app.get("/traces")
+async def list_traces(limit: int = 20, name: Optional[str] = None, min_duration_ms: float = 0.0):
+    """Recent request traces, newest first."""
+    traces = get_tracer().query(limit=limit, name=name, min_duration_ms=min_duration_ms)
+    return {
+        "count": len(traces),
+        "traces": [t.to_dict() for t in traces]
+    }
+
+@app.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Single request trace with all spans."""
+    found = get_tracer().get_trace(trace_id)
+    if not found:
+        raise HTTPException(status_code=404, detail=f"Trace '{trace_id}' not found")
+    return found.to_dict()
+
+
+
 # test APIs
 
 class TTSRequest(BaseModel):
@@ -182,7 +624,7 @@ async def test_tts(request: TTSRequest):
             tts_params['language'] = request.language
             
         # Call TTS module to generate and play audio
-        result = tts_module.speak(request.text, **tts_params)
+        result = await run_blocking("tts", tts_module.speak, request.text, **tts_params)
         
         # Check if TTS was successful
         if result.get('success', False):
@@ -206,117 +648,45 @@ async def test_tts(request: TTSRequest):
 @app.post("/test/intent")
 async def test_intent(request: IntentTestRequest):
     """
-    Test intent recognition with same logic as main processor.
+    Test intent recognition with same logic as main processor (no speech output).
     """
     try:
         intent_module = modules.get('local_intent', None)
         llm_intent_module = modules.get('llm_intent', None)
         action_module = modules.get('actions', None)
         
-        if not intent_module and not llm_intent_module:
+        if not _intent_ready():
             return {
                 "success": False,
                 "error": "No intent recognition modules available"
             }
         
         logger.info(f"Testing intent recognition with text: '{request.text}'")
+        processor = AsyncRequestProcessor(request.text, intent_module, llm_intent_module, action_module, None)
+        processor.context = request.context or {}
         
-        # Simulate the same logic as processor
-        intent = ""
-        confidence = 0
-        entities = {}
-        speech_text = None
-        action_result = None
-        actionable_command = False
-        
-        # Step 1: Try Rasa intent recognition first
-        if intent_module:
-            try:
-                intent_result = intent_module.recognize_intent(request.text, **request.context)
-                intent = intent_result.get("intent", "")
-                confidence = intent_result.get("confidence", 0)
-                entities = intent_result.get("entities", {})
-                
-                logger.info(f"LOCAL: Intent[{intent}] confidence[{confidence}] entities[{entities}]")
-                
-            except Exception as e:
-                logger.error(f"Rasa intent error: {str(e)}")
-                intent = "out_of_scope"
-                confidence = 0
-        
-        # Step 2: If Rasa returns out_of_scope or low confidence, use LLM fallback
-        if intent == "out_of_scope" or confidence <= 0.5:  # Using same threshold as processor
-            logger.info("LLM intent fallback")
-            
-            if llm_intent_module:
-                try:
-                    intent_result = llm_intent_module.recognize_intent(request.text, **request.context)
-                    
-                    # Update with LLM results
-                    intent = intent_result.get("intent", "")
-                    confidence = intent_result.get("confidence", 0)
-                    entities = intent_result.get("entities", {})
-                    
-                    # Handle direct response from LLM
-                    if intent == "direct_response":
-                        speech_text = intent_result.get("speech_response", "I'm sorry, I couldn't process that request.")
-                        actionable_command = False
-                        logger.info(f"LLM Direct Response: {speech_text}")
-                    else:
-                        logger.info(f"LLM Intent[{intent}] confidence[{confidence}] entities[{entities}]")
-                        
-                except Exception as e:
-                    logger.error(f"LLM intent error: {str(e)}")
-                    intent = "direct_response"
-                    speech_text = "I'm sorry, I encountered an error processing your request."
-                    actionable_command = False
-        
-        # Step 3: Determine if actionable command
-        actionable_intents = [
-            "greet", "turn_on_device", "turn_off_device", 
-            "ask_time", "ask_day", "ask_date", "out_of_scope"
-        ]
-        
-        if intent == "direct_response":
-            actionable_command = False
-        else:
-            actionable_command = intent in actionable_intents
-        
-        # Step 4: Execute action if needed
-        if actionable_command and action_module and intent != "direct_response":
-            try:
-                logger.info(f"Executing action for intent: {intent}")
-                action_result = action_module.execute_action(intent, entities, **request.context)
-                logger.info(f"Action result: {action_result}")
-                
-                # Check if action provides speech output
-                if action_result.get('speech_op'):
-                    speech_text = action_result.get('speech_op')
-                    logger.info(f"Action provided speech: {speech_text}")
-                    
-            except Exception as e:
-                logger.error(f"Action execution error: {str(e)}")
-                speech_text = "Something went wrong. Try again later."
-                action_result = {"success": False, "error": str(e)}
-        
-        # Step 5: Generate speech response if none provided
-        if not speech_text:
-            speech_text = "Something went wrong. Try again later."
+        await processor.process_intent()
+        processor._determine_actionable_command()
+        if processor.actionable_command and action_module:
+            await processor.process_action()
+        speech_text = processor.speech_text or "Something went wrong. Try again later."
         
         return {
             "success": True,
             "text": request.text,
             "context": request.context,
-            "intent": intent,
-            "confidence": confidence,
-            "entities": entities,
+            "intent": processor.intent,
+            "confidence": processor.confidence,
+            "entities": processor.entities,
             "speech_text": speech_text,
-            "actionable_command": actionable_command,
-            "action_result": action_result,
+            "actionable_command": processor.actionable_command,
+            "action_result": processor.action_result,
             "flow": {
-                "rasa_used": intent_module is not None,
-                "llm_fallback_used": intent == "direct_response" or (intent == "out_of_scope" and confidence < 0.5),
-                "action_executed": action_result is not None
+                "answered_by": processor.answered_by,
+                "tiers": processor.tier_attempts,
+                "cache_hit": processor.cache_hit,
+                "llm_fallback_used": processor.llm_fallback_used,
+                "action_executed": processor.action_result is not None
             }
         }
         
@@ -327,6 +697,60 @@ async def test_intent(request: IntentTestRequest):
             "error": str(e)
         }
 
+class IntentBatchTestRequest(BaseModel):
+    """Request model for batch intent recognition testing."""
+    texts: List[str]
+    context: Optional[Dict[str, Any]] = None
+
+@app.post("/test/intent/batch")
+async def test_intent_batch(request: IntentBatchTestRequest):
+    """
+    Intent recognition only (no actions, no TTS) for regression sweeps.
+    """
+    if len(request.texts) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(request.texts)} > {BATCH_MAX_ITEMS}")
+
+    try:
+        intent_module = modules.get('local_intent', None)
+        llm_intent_module = modules.get('llm_intent', None)
+
+        if not _intent_ready():
+            return {
+                "success": False,
+                "error": "No intent recognition modules available"
+            }
+
+        processors = await process_batch(
+            request.texts, intent_module, llm_intent_module, None, None,
+            context=request.context,
+            execute_actions=False,
+            speak=False
+        )
+
+        results = []
+        for p in processors:
+            result = p.summary()
+            result.pop("action_result")
+            result["flow"] = {
+                "answered_by": p.answered_by,
+                "tiers": p.tier_attempts,
+                "llm_fallback_used": p.llm_fallback_used
+            }
+            results.append(result)
+
+        return {
+            "success": True,
+            "count": len(results),
+            "results": results
+        }
+
+    except Exception as e:
+        logger.error(f"Error testing intent batch: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
@@ -10,6 +10,8 @@ from typing import Dict, Any, Optional, Callable
 import threading
 import time
 from app.core.config import Config
+from app.core.tracing import span
+from app.core.metrics import MQTT_PUBLISH_LATENCY
 
 class MQTTHandler:
     """MQTT Handler for device control with optional initialization."""
@@ -143,7 +145,8 @@ class MQTTHandler:
         
         try:
             qos_level = qos if qos is not None else self.qos
-            result = self.client.publish(topic, message, qos=qos_level)
+            with span("mqtt.publish", topic=topic, qos=qos_level), MQTT_PUBLISH_LATENCY.time():
+                result = self.client.publish(topic, message, qos=qos_level)
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 self.logger.info(f"Published message to topic '{topic}': {message}")
@@ -238,14 +241,67 @@ class MQTTHandler:
         self.disconnect()
 
 
+class StubMQTTHandler:
+    """
+    Broker-less MQTT handler for benchmarks and offline runs.
+    Records published messages and waits a fixed latency instead of sending.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.config = config or {}
+        self.publish_latency = self.config.get('stub_latency_ms', 2) / 1000
+        self.qos = self.config.get('qos', 0)
+        self.is_initialized = True
+        self.is_connected = True
+        self.published = []
+        self.max_recorded = 1000
+    
+    def connect(self) -> bool:
+        return True
+    
+    def disconnect(self):
+        pass
+    
+    def publish_message(self, topic: str, message: str, qos: Optional[int] = None) -> Dict[str, Any]:
+        """Pretend to publish, keeping the last messages for inspection."""
+        qos_level = qos if qos is not None else self.qos
+        with span("mqtt.publish", topic=topic, qos=qos_level, stub=True), MQTT_PUBLISH_LATENCY.time():
+            time.sleep(self.publish_latency)
+        self.published.append((topic, message))
+        del self.published[:-self.max_recorded]
+        return {
+            "success": True,
+            "message": f"Message published to {topic}",
+            "topic": topic,
+            "payload": message,
+            "qos": qos_level
+        }
+    
+    def subscribe_to_topic(self, topic: str, callback: Optional[Callable] = None, qos: int = 0) -> Dict[str, Any]:
+        return {"success": True, "message": f"Subscribed to {topic}", "topic": topic}
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "initialized": True,
+            "connected": True,
+            "backend": "stub",
+            "published": len(self.published),
+            "qos": self.qos
+        }
+
+
 # Global MQTT handler instance
 _mqtt_handler = None
 
 def get_mqtt_handler(config: Optional[Dict[str, Any]] = None) -> MQTTHandler:
-    """Get or create the global MQTT handler instance."""
+    """Get or create the global MQTT handler instance (backend "stub" skips the broker)."""
     global _mqtt_handler
     if _mqtt_handler is None:
-        _mqtt_handler = MQTTHandler(config)
+        if (config or {}).get('backend') == 'stub':
+            _mqtt_handler = StubMQTTHandler(config)
+        else:
+            _mqtt_handler = MQTTHandler(config)
     return _mqtt_handler
 
 def initialize_mqtt(config: Optional[Dict[str, Any]] = None) -> bool:
@@ -14,6 +14,8 @@ class BaseIntent(ABC):
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.is_initialized = False
+        # identifies the loaded model, part of the intent cache key
+        self.model_version = None
     
     @abstractmethod
     def initialize(self) -> bool:
@@ -39,6 +41,35 @@ class BaseIntent(ABC):
         """
         pass
     
+    def recognize_intents(self, texts: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """
+        Recognize intents for a batch of texts.
+        
+        Args:
+            texts (List[str]): Input texts to analyze
+            **kwargs: Additional parameters for intent recognition
+            
+        Returns:
+            List[Dict[str, Any]]: One result per text, in input order
+        """
+        # Default implementation - engines with real batch inference override this
+        return [self.recognize_intent(text, **kwargs) for text in texts]
+    
+    async def recognize_intent_async(self, text: str, **kwargs) -> Dict[str, Any]:
+        """
+        Recognize intent without blocking the caller's event loop.
+        
+        Args:
+            text (str): Input text to analyze
+            **kwargs: Additional parameters for intent recognition
+            
+        Returns:
+            Dict[str, Any]: Result containing intent, confidence, and entities
+        """
+        # Default implementation - run the sync call on the intent executor
+        from app.core.executors import run_blocking
+        return await run_blocking("intent", self.recognize_intent, text, **kwargs)
+    
 
     '''
     # Not required as of now 
@@ -0,0 +1,163 @@
+"""
+Device gazetteer.
+Device names from MQTT_TOPIC_LIST plus configured aliases are compiled into
+an Aho-Corasick automaton over word tokens, so one pass over the utterance
+finds every device mention. Used to fill in or correct entities["device"]
+after intent recognition, so the action handlers get a device they can
+publish to.
+"""
+
+import logging
+import re
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from app.modules.actions.mqtt_topics import MQTT_TOPIC_LIST
+from app.core.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+GAZETTEER_FIXES = counter("voice_gazetteer_device_fixes_total", "Device entities filled or corrected by the gazetteer", ["action"])
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _variants(tokens: Tuple[str, ...]) -> List[Tuple[str, ...]]:
+    """The alias plus its singular/plural form ("fan" <-> "fans")."""
+    last = tokens[-1]
+    other = last[:-1] if last.endswith("s") and len(last) > 3 else last + "s"
+    return [tokens, tokens[:-1] + (other,)]
+
+
+class DeviceGazetteer:
+    """Aho-Corasick automaton mapping device mentions to MQTT device names."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        gazetteer_config = self.config.get('settings', {}).get('gazetteer', {}) or {}
+        self.enabled = gazetteer_config.get('enabled', True)
+
+        # device -> surface forms; every topic's device name is an alias of itself
+        self.aliases: Dict[str, List[str]] = {}
+        for topic in MQTT_TOPIC_LIST:
+            device = topic.rsplit('/', 1)[-1]
+            self.aliases.setdefault(device, []).append(device.replace("_", " "))
+        for device, surfaces in (gazetteer_config.get('aliases', {}) or {}).items():
+            self.aliases.setdefault(device, []).extend(surfaces or [])
+
+        # automaton: goto edges per state, failure links, (pattern length, device) outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+        self.pattern_count = 0
+        self._build()
+
+    def _build(self):
+        seen = set()
+        for device, surfaces in self.aliases.items():
+            for surface in surfaces:
+                tokens = tuple(tokenize(surface))
+                if not tokens:
+                    continue
+                for pattern in _variants(tokens):
+                    if pattern not in seen:
+                        seen.add(pattern)
+                        self._add_pattern(pattern, device)
+
+        # breadth-first failure links
+        queue = deque()
+        for state in self._goto[0].values():
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _add_pattern(self, tokens: Tuple[str, ...], device: str):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(tokens), device))
+        self.pattern_count += 1
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """Every device mention as (start token, end token, device), in one scan."""
+        matches = []
+        state = 0
+        for position, token in enumerate(tokenize(text)):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, device in self._output[state]:
+                matches.append((position + 1 - length, position + 1, device))
+        return matches
+
+    def find(self, text: str) -> Optional[str]:
+        """The device of the leftmost, longest mention."""
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        start, end, device = min(matches, key=lambda match: (match[0], -(match[1] - match[0])))
+        return device
+
+    def canonical(self, value: str) -> Optional[str]:
+        """Device name for an entity value, if it is a known device or alias."""
+        tokens = tokenize(value.replace("_", " "))
+        for start, end, device in self.find_all(" ".join(tokens)):
+            if start == 0 and end == len(tokens):
+                return device
+        return None
+
+    def resolve(self, text: str, entities: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        entities with "device" set to a known device: the device mentioned in
+        the text wins, else the model's value if it maps to a device.
+        """
+        if not self.enabled:
+            return entities
+        model_value = entities.get("device")
+        device = self.find(text)
+        if device is None and model_value:
+            device = self.canonical(str(model_value))
+        if device is None or device == model_value:
+            return entities
+
+        action = "corrected" if model_value else "filled"
+        GAZETTEER_FIXES.labels(action=action).inc()
+        logger.info(f"Gazetteer {action} device: {model_value!r} -> {device!r}")
+        return {**entities, "device": device}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "devices": len(self.aliases),
+            "patterns": self.pattern_count,
+            "states": len(self._goto)
+        }
+
+
+# Global gazetteer instance
+_gazetteer = None
+
+def get_gazetteer(config: Optional[Dict[str, Any]] = None) -> DeviceGazetteer:
+    """Get or create the global device gazetteer."""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = DeviceGazetteer(config)
+    return _gazetteer
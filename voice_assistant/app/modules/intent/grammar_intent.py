@@ -0,0 +1,279 @@
+"""
+Grammar Intent Recognition implementation.
+Compiles the nlu.yml examples into a token trie with entity slots ({device})
+filled from the lookup tables, synonyms and MQTT device names. Exact and
+templated phrasings are answered without a model; everything else is passed
+to a fallback module (normally RasaIntent).
+"""
+
+import re
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from .base import BaseIntent
+from .intents import ALL_INTENTS, OUT_OF_SCOPE
+from .nlu_data import load_nlu_data, ENTITY_ANNOTATION_RE
+from app.modules.actions.mqtt_topics import MQTT_TOPIC_LIST
+from app.core.intent_cache import normalize_text
+from app.constants import NLU_DATA_PATH
+
+# Words ignored on both sides of a match ("turn on the fan" == "turn on fan")
+GRAMMAR_STOPWORDS = {"the", "a", "an", "my"}
+
+# Marks a terminal shared by examples of different intents
+AMBIGUOUS = "__ambiguous__"
+
+_SLOT_RE = re.compile(r"^__(\w+)__$")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in normalize_text(text).split(" ") if token and token not in GRAMMAR_STOPWORDS]
+
+
+class _Node:
+    """Trie node: literal edges, slot edges and the intent ending here."""
+    __slots__ = ("children", "slots", "intent", "value")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.slots: Dict[str, "_Node"] = {}
+        self.intent: Optional[str] = None
+        # canonical entity value (slot value tries only)
+        self.value: Optional[str] = None
+
+
+class GrammarIntent(BaseIntent):
+    """Trie matcher over the training phrasings, deferring to a fallback module."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.supported_intents = ALL_INTENTS
+        self.config = config or {}
+
+        grammar_config = self.config.get('settings', {}).get('grammar', {}) or {}
+        self.nlu_path = grammar_config.get('nlu_path', NLU_DATA_PATH)
+        # module path under app.modules, e.g. "intent.rasa_intent.RasaIntent"
+        self.fallback_path = grammar_config.get('fallback')
+        self.fallback = None
+        # loading / ready / failed; the grammar answers on its own until ready
+        self.fallback_state = None
+        startup_config = self.config.get('settings', {}).get('startup', {}) or {}
+        self.background_fallback = startup_config.get('background_loading', True)
+
+        self._root = _Node()
+        self._slot_values: Dict[str, _Node] = {}
+        self.template_count = 0
+        self.hits = 0
+        self.misses = 0
+
+    def initialize(self) -> bool:
+        """Compile the grammar and initialize the fallback module."""
+        try:
+            self.compile(load_nlu_data(self.nlu_path))
+            self.logger.info(f"Grammar compiled: {self.template_count} templates, slots {sorted(self._slot_values)}")
+        except Exception as e:
+            self.logger.error(f"Failed to compile grammar from {self.nlu_path}: {str(e)}")
+            return False
+
+        if self.fallback_path and not (self.fallback and self.fallback.is_initialized):
+            self.fallback_state = "loading"
+            if self.background_fallback:
+                threading.Thread(target=self._load_fallback, name="va-load-grammar-fallback", daemon=True).start()
+            else:
+                self._load_fallback()
+
+        self._update_model_version()
+        self.is_initialized = True
+        self.logger.info("Grammar Intent Recognition initialized successfully")
+        return True
+
+    def _load_fallback(self):
+        """Create and initialize the fallback; it only takes misses once ready."""
+        from app.core.module_loader import create_module
+        try:
+            fallback = create_module(self.fallback_path, self.config)
+            if not fallback.initialize():
+                self.logger.warning(f"Grammar fallback {self.fallback_path} failed to initialize")
+                self.fallback_state = "failed"
+                return
+        except Exception as e:
+            self.logger.error(f"Failed to load grammar fallback {self.fallback_path}: {str(e)}")
+            self.fallback_state = "failed"
+            return
+        self.fallback = fallback
+        self.fallback_state = "ready"
+        self._update_model_version()
+        self.logger.info(f"Grammar fallback {self.fallback_path} ready")
+
+    def _update_model_version(self):
+        fallback_version = getattr(self.fallback, "model_version", None) or ""
+        self.model_version = f"grammar-{self.template_count}+{fallback_version}"
+
+    def compile(self, nlu_data):
+        """Build the slot value tries and the template trie."""
+        self._root = _Node()
+        self._slot_values = {}
+        self.template_count = 0
+
+        # slot values: lookup tables, synonym surfaces, annotated example values
+        for entity, values in nlu_data.lookups.items():
+            for value in values:
+                self._add_slot_value(entity, value, nlu_data.synonyms.get(value.lower(), value))
+        # synonyms in nlu.yml are not tied to an entity
+        for surface, canonical in nlu_data.synonyms.items():
+            for entity in list(self._slot_values) or ["device"]:
+                self._add_slot_value(entity, surface, canonical)
+        for example in nlu_data.examples:
+            for entity, value in example.entities:
+                self._add_slot_value(entity, value, nlu_data.synonyms.get(value.lower(), value))
+
+        # device names the actions module can publish to
+        for topic in MQTT_TOPIC_LIST:
+            device = topic.rsplit('/', 1)[-1]
+            self._add_slot_value("device", device, device)
+            self._add_slot_value("device", device.replace("_", " "), device)
+
+        for example in nlu_data.examples:
+            template = ENTITY_ANNOTATION_RE.sub(lambda m: f" __{m.group(2)}__ ", example.raw)
+            self._add_template(tokenize(template), example.intent)
+
+    def _add_slot_value(self, entity: str, surface: str, canonical: str):
+        node = self._slot_values.setdefault(entity, _Node())
+        tokens = tokenize(surface)
+        if not tokens:
+            return
+        for token in tokens:
+            node = node.children.setdefault(token, _Node())
+        if node.value is None:
+            node.value = canonical
+
+    def _add_template(self, tokens: List[str], intent: str):
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            slot = _SLOT_RE.match(token)
+            if slot:
+                node = node.slots.setdefault(slot.group(1), _Node())
+            else:
+                node = node.children.setdefault(token, _Node())
+        if node.intent is None:
+            self.template_count += 1
+            node.intent = intent
+        elif node.intent != intent:
+            node.intent = AMBIGUOUS
+
+    def _slot_matches(self, entity: str, tokens: List[str], start: int):
+        """(end, canonical value) for every slot value starting at tokens[start], longest first."""
+        matches = []
+        node = self._slot_values.get(entity)
+        position = start
+        while node is not None and position < len(tokens):
+            node = node.children.get(tokens[position])
+            position += 1
+            if node is not None and node.value is not None:
+                matches.append((position, node.value))
+        return reversed(matches)
+
+    def _match(self, node: _Node, tokens: List[str], position: int, entities: Dict[str, str]) -> Optional[Tuple[str, Dict[str, str]]]:
+        if position == len(tokens):
+            if node.intent and node.intent != AMBIGUOUS:
+                return node.intent, entities
+            return None
+
+        # literal words take precedence over slots
+        child = node.children.get(tokens[position])
+        if child is not None:
+            found = self._match(child, tokens, position + 1, entities)
+            if found:
+                return found
+
+        for entity, slot_node in node.slots.items():
+            for end, value in self._slot_matches(entity, tokens, position):
+                found = self._match(slot_node, tokens, end, {**entities, entity: value})
+                if found:
+                    return found
+        return None
+
+    def match(self, text: str) -> Optional[Dict[str, Any]]:
+        """Grammar-only match, None when no template fits."""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        found = self._match(self._root, tokens, 0, {})
+        if not found:
+            return None
+        intent, entities = found
+        return {
+            "success": True,
+            "intent": intent,
+            "confidence": 1.0,
+            "entities": entities,
+            "matched_by": "grammar"
+        }
+
+    def recognize_intent(self, text: str, **kwargs) -> Dict[str, Any]:
+        """Recognize intent from the grammar, falling back to the fallback module."""
+        if not self.is_initialized:
+            return {"error": "Grammar Intent not initialized", "success": False}
+
+        result = self.match(text)
+        if result:
+            self.hits += 1
+            self.logger.info(f"Grammar match for '{text}': {result['intent']}")
+            return result
+
+        self.misses += 1
+        if self.fallback:
+            return self.fallback.recognize_intent(text, **kwargs)
+        return self._no_match()
+
+    async def recognize_intent_async(self, text: str, **kwargs) -> Dict[str, Any]:
+        """Grammar match inline (microseconds), fallback module without blocking the loop."""
+        if not self.is_initialized:
+            return {"error": "Grammar Intent not initialized", "success": False}
+
+        result = self.match(text)
+        if result:
+            self.hits += 1
+            self.logger.info(f"Grammar match for '{text}': {result['intent']}")
+            return result
+
+        self.misses += 1
+        if self.fallback:
+            return await self.fallback.recognize_intent_async(text, **kwargs)
+        return self._no_match()
+
+    def recognize_intents(self, texts: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """Grammar matches for the batch; the rest go to the fallback in one batch."""
+        if not self.is_initialized:
+            return [{"error": "Grammar Intent not initialized", "success": False} for _ in texts]
+
+        results = [self.match(text) for text in texts]
+        unmatched = [i for i, result in enumerate(results) if result is None]
+        self.hits += len(texts) - len(unmatched)
+        self.misses += len(unmatched)
+
+        if unmatched:
+            if self.fallback:
+                fallback_results = self.fallback.recognize_intents([texts[i] for i in unmatched], **kwargs)
+            else:
+                fallback_results = [self._no_match() for _ in unmatched]
+            for i, result in zip(unmatched, fallback_results):
+                results[i] = result
+        return results
+
+    @staticmethod
+    def _no_match() -> Dict[str, Any]:
+        # out_of_scope sends the request on to the LLM tier
+        return {"success": True, "intent": OUT_OF_SCOPE, "confidence": 0.0, "entities": {}}
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "templates": self.template_count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "fallback": self.fallback_path,
+            "fallback_state": self.fallback_state
+        }
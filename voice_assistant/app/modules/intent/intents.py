@@ -17,3 +17,9 @@ ALL_INTENTS = [
     ASK_DATE,
     OUT_OF_SCOPE
 ]
+
+# Intents whose action needs entities["device"]
+DEVICE_INTENTS = [
+    TURN_ON_DEVICE,
+    TURN_OFF_DEVICE
+]
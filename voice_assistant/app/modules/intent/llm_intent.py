@@ -1,10 +1,13 @@
 import os
 import json
-import requests
+import httpx
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 from .base import BaseIntent
 from app.modules.intent.intents import ALL_INTENTS
+from app.core.metrics import LLM_LATENCY
+from app.core.http_client import get_http_client
+from app.core.admission import get_admission_controller
 load_dotenv()
 
 
@@ -19,12 +22,18 @@ class LLMIntent(BaseIntent):
         # API configurations
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
-        self.openai_api_url = "https://api.openai.com/v1/chat/completions"
-        self.gemini_api_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
         
         # LLM configuration from config file
         self.llm_config = self.config.get('settings', {}).get('llm', {})
         self.provider = self.llm_config.get('provider', 'chatgpt')
+        self.model_version = self.provider
+        # overridable to point at a proxy or a local mock provider
+        self.openai_api_url = self.llm_config.get('openai_api_url', "https://api.openai.com/v1/chat/completions")
+        self.gemini_api_url = self.llm_config.get('gemini_api_url', "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent")
+        self.timeout = self.llm_config.get('timeout', 5)
+        # connections open before the first fallback needs them
+        self.prewarm = self.llm_config.get('prewarm', True)
+        self.http_client = get_http_client(self.config)
         
         # Available actions will be fetched dynamically
         self.available_actions = {}
@@ -81,6 +90,9 @@ class LLMIntent(BaseIntent):
             self.logger.info(f"Using LLM provider: {self.provider}")
             
             self.fetch_available_actions()
+            
+            if self.prewarm:
+                self._prewarm()
                 
             self.logger.info("Initializing LLM Intent Recognition...")
             self.is_initialized = True
@@ -90,6 +102,15 @@ class LLMIntent(BaseIntent):
             self.logger.error(f"Failed to initialize LLM Intent: {str(e)}")
             return False
 
+    def _provider_urls(self) -> List[str]:
+        return {"chatgpt": [self.openai_api_url], "gemini": [self.gemini_api_url]}.get(self.provider, [])
+
+    def _prewarm(self):
+        """Open the provider connections now so the first fallback skips the handshakes."""
+        urls = self._provider_urls()
+        if urls:
+            self.http_client.prewarm(urls)
+
     def _check_provider_availability(self, provider: str) -> bool:
         """Check if a specific LLM provider is available."""
         if provider == "chatgpt":
@@ -123,144 +144,141 @@ class LLMIntent(BaseIntent):
         AI Assistant Response:"""
         return prompt
 
-    def _call_chatgpt_api(self, prompt: str) -> Dict[str, Any]:
-        """Call ChatGPT API for intent recognition."""
-        try:
-            if not self.openai_api_key:
-                raise Exception("OpenAI API key not available")
-                
-            headers = {
-                "Authorization": f"Bearer {self.openai_api_key}",
-                "Content-Type": "application/json"
-            }
+    def _chatgpt_request(self, prompt: str):
+        """URL, headers and body of a ChatGPT request."""
+        if not self.openai_api_key:
+            raise Exception("OpenAI API key not available")
             
-            data = {
-                "model": "gpt-3.5-turbo",
-                "messages": [
-                    {"role": "system", "content": "You are an AI assistant for intent recognition. Respond with JSON only. Be concise."},
-                    {"role": "user", "content": prompt}
-                ],
+        headers = {
+            "Authorization": f"Bearer {self.openai_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {"role": "system", "content": "You are an AI assistant for intent recognition. Respond with JSON only. Be concise."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1
+        }
+        return self.openai_api_url, headers, data
+
+    def _parse_chatgpt_response(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        content = result["choices"][0]["message"]["content"].strip()
+        return self._parse_content(content, "ChatGPT")
+
+    def _gemini_request(self, prompt: str):
+        """URL, headers and body of a Gemini request."""
+        if not self.gemini_api_key:
+            raise Exception("Gemini API key not available")
+            
+        headers = {
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.gemini_api_key
+        }
+        
+        data = {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }],
+            "generationConfig": {
                 "temperature": 0.1
             }
-            
-            response = requests.post(self.openai_api_url, headers=headers, json=data, timeout=5)
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-            
-            # Remove markdown code blocks if present
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "").strip()
-            elif content.startswith("```"):
-                content = content.replace("```", "").strip()
-            
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                self.logger.warning("Failed to parse ChatGPT response as JSON, using fallback")
-                return {
-                    "intent": "out_of_scope",
-                    "confidence": 0.5,
-                    "entities": {},
-                    "reasoning": "Failed to parse response"
-                }
-                
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"ChatGPT API request failed: {str(e)}")
+        }
+        return self.gemini_api_url, headers, data
+
+    def _parse_gemini_response(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        # Check if response has content
+        candidate = result["candidates"][0]
+        if "content" not in candidate or "parts" not in candidate["content"]:
+            self.logger.warning("Gemini response has no content")
             return {
                 "intent": "out_of_scope",
                 "confidence": 0.3,
                 "entities": {},
-                "reasoning": f"API error: {str(e)}"
+                "reasoning": "No content in response"
             }
-        except Exception as e:
-            self.logger.error(f"Unexpected error in ChatGPT API call: {str(e)}")
+        
+        content = candidate["content"]["parts"][0]["text"].strip()
+        return self._parse_content(content, "Gemini")
+
+    def _parse_content(self, content: str, name: str) -> Dict[str, Any]:
+        """Parse the JSON answer in a provider's reply text."""
+        # Remove markdown code blocks if present
+        if content.startswith("```json"):
+            content = content.replace("```json", "").replace("```", "").strip()
+        elif content.startswith("```"):
+            content = content.replace("```", "").strip()
+        
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            self.logger.warning(f"Failed to parse {name} response as JSON, using fallback")
             return {
                 "intent": "out_of_scope",
-                "confidence": 0.3,
+                "confidence": 0.5,
                 "entities": {},
-                "reasoning": f"Unexpected error: {str(e)}"
+                "reasoning": "Failed to parse response"
             }
 
-    def _call_gemini_api(self, prompt: str) -> Dict[str, Any]:
-        """Call Gemini API for intent recognition."""
-        try:
-            if not self.gemini_api_key:
-                raise Exception("Gemini API key not available")
-                
-            headers = {
-                "Content-Type": "application/json",
-                "x-goog-api-key": self.gemini_api_key
-            }
-            
-            data = {
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
-                }],
-                "generationConfig": {
-                    "temperature": 0.1
-                }
-            }
-            
-            response = requests.post(self.gemini_api_url, headers=headers, json=data, timeout=5)
-            response.raise_for_status()
-            
+    def _request_builder(self, provider: str):
+        """The provider's request builder; it raises for a missing API key."""
+        if provider == "chatgpt":
+            return self._chatgpt_request
+        elif provider == "gemini":
+            return self._gemini_request
+        else:
+            raise ValueError(f"Unknown LLM provider: {provider}")
 
-            result = response.json()
-            # self.logger.info(f"resp:{result}")
-            
-            # Check if response has content
-            candidate = result["candidates"][0]
-            if "content" not in candidate or "parts" not in candidate["content"]:
-                self.logger.warning("Gemini response has no content")
-                return {
-                    "intent": "out_of_scope",
-                    "confidence": 0.3,
-                    "entities": {},
-                    "reasoning": "No content in response"
-                }
-            
-            content = candidate["content"]["parts"][0]["text"].strip()
+    def _handle_response(self, provider: str, response) -> Dict[str, Any]:
+        response.raise_for_status()
+        result = response.json()
+        if provider == "chatgpt":
+            return self._parse_chatgpt_response(result)
+        return self._parse_gemini_response(result)
+
+    def _error_result(self, provider: str, error: Exception) -> Dict[str, Any]:
+        if isinstance(error, httpx.HTTPError):
+            self.logger.error(f"{provider} API request failed: {str(error)}")
+            reasoning = f"API error: {str(error)}"
+        else:
+            self.logger.error(f"Unexpected error in {provider} API call: {str(error)}")
+            reasoning = f"Unexpected error: {str(error)}"
+        return {
+            "intent": "out_of_scope",
+            "confidence": 0.3,
+            "entities": {},
+            "reasoning": reasoning
+        }
+
+    def recognize_intent(self, text: str, **kwargs) -> Dict[str, Any]:
+        """Recognize intent from text using configured LLM provider."""
+        if not self.is_initialized:
+            return {"error": "LLM Intent not initialized", "success": False}
+        
+        try:
+            self.logger.info(f"LLM analyzing: '{text}'")
+            prompt = self._create_prompt(text)
             
-            # Remove markdown code blocks if present
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "").strip()
-            elif content.startswith("```"):
-                content = content.replace("```", "").strip()
+            self.logger.info(f"Attempting intent recognition with {self.provider}...")
+            with LLM_LATENCY.labels(provider=self.provider).time():
+                result = self._call_llm_provider(self.provider, prompt)
+            return self._process_result(result, text, self.provider)
             
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                self.logger.warning("Failed to parse Gemini response as JSON, using fallback")
-                return {
-                    "intent": "out_of_scope",
-                    "confidence": 0.5,
-                    "entities": {},
-                    "reasoning": "Failed to parse response"
-                }
-                
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Gemini API request failed: {str(e)}")
-            return {
-                "intent": "out_of_scope",
-                "confidence": 0.3,
-                "entities": {},
-                "reasoning": f"API error: {str(e)}"
-            }
         except Exception as e:
-            self.logger.error(f"Unexpected error in Gemini API call: {str(e)}")
+            self.logger.error(f"LLM Intent error: {str(e)}")
             return {
+                "error": str(e), 
+                "success": False,
                 "intent": "out_of_scope",
-                "confidence": 0.3,
-                "entities": {},
-                "reasoning": f"Unexpected error: {str(e)}"
+                "confidence": 0.1
             }
 
-    def recognize_intent(self, text: str, **kwargs) -> Dict[str, Any]:
-        """Recognize intent from text using configured LLM provider."""
+    async def recognize_intent_async(self, text: str, **kwargs) -> Dict[str, Any]:
+        """recognize_intent awaiting the provider instead of blocking an llm executor thread."""
         if not self.is_initialized:
             return {"error": "LLM Intent not initialized", "success": False}
         
@@ -268,8 +286,10 @@ class LLMIntent(BaseIntent):
             self.logger.info(f"LLM analyzing: '{text}'")
             prompt = self._create_prompt(text)
             
-            self.logger.info(f"Attempting intent recognition with {self.provider}...")
-            result = self._call_llm_provider(self.provider, prompt)
+            # same concurrency limit as the blocking path on the llm executor
+            async with get_admission_controller().stage("llm"):
+                with LLM_LATENCY.labels(provider=self.provider).time():
+                    result = await self._call_llm_provider_async(self.provider, prompt)
             return self._process_result(result, text, self.provider)
             
         except Exception as e:
@@ -282,13 +302,24 @@ class LLMIntent(BaseIntent):
             }
 
     def _call_llm_provider(self, provider: str, prompt: str) -> Dict[str, Any]:
-        """Call the specified LLM provider."""
-        if provider == "chatgpt":
-            return self._call_chatgpt_api(prompt)
-        elif provider == "gemini":
-            return self._call_gemini_api(prompt)
-        else:
-            raise ValueError(f"Unknown LLM provider: {provider}")
+        """Call the specified LLM provider over the shared keep-alive client."""
+        build_request = self._request_builder(provider)
+        try:
+            url, headers, data = build_request(prompt)
+            response = self.http_client.post(url, headers=headers, json=data, timeout=self.timeout)
+            return self._handle_response(provider, response)
+        except Exception as e:
+            return self._error_result(provider, e)
+
+    async def _call_llm_provider_async(self, provider: str, prompt: str) -> Dict[str, Any]:
+        """_call_llm_provider without holding a thread while the request is in flight."""
+        build_request = self._request_builder(provider)
+        try:
+            url, headers, data = build_request(prompt)
+            response = await self.http_client.apost(url, headers=headers, json=data, timeout=self.timeout)
+            return self._handle_response(provider, response)
+        except Exception as e:
+            return self._error_result(provider, e)
 
     def _process_result(self, result: Dict[str, Any], text: str, model: str) -> Dict[str, Any]:
         """Process and validate the LLM result."""
@@ -0,0 +1,87 @@
+"""
+Reader for the Rasa training data in rasa_nlu/data/nlu.yml.
+Extracts intent examples (with their [value](entity) annotations), lookup
+tables and entity synonyms without depending on Rasa.
+"""
+
+import re
+import yaml
+from typing import Dict, List, Tuple
+
+# [ceiling light](device)
+ENTITY_ANNOTATION_RE = re.compile(r"\[([^\]]+)\]\((\w+)\)")
+
+
+class NLUExample:
+    """One training example: plain text plus annotated (entity, value) pairs."""
+
+    def __init__(self, intent: str, raw: str):
+        self.intent = intent
+        self.raw = raw
+        self.text = ENTITY_ANNOTATION_RE.sub(lambda m: m.group(1), raw)
+        self.entities: List[Tuple[str, str]] = [(m.group(2), m.group(1)) for m in ENTITY_ANNOTATION_RE.finditer(raw)]
+
+
+class NLUData:
+    """Parsed contents of an nlu.yml file."""
+
+    def __init__(self):
+        self.examples: List[NLUExample] = []
+        self.lookups: Dict[str, List[str]] = {}
+        # surface form -> canonical value
+        self.synonyms: Dict[str, str] = {}
+
+    @property
+    def intents(self) -> List[str]:
+        return sorted({example.intent for example in self.examples})
+
+    def examples_for(self, intent: str) -> List[NLUExample]:
+        return [example for example in self.examples if example.intent == intent]
+
+    def entity_values(self) -> Dict[str, Dict[str, str]]:
+        """entity -> {lowercased surface form: canonical value} from lookups and annotations."""
+        values: Dict[str, Dict[str, str]] = {}
+        pairs = [(entity, value) for entity, lookup in self.lookups.items() for value in lookup]
+        pairs += [pair for example in self.examples for pair in example.entities]
+        for entity, value in pairs:
+            values.setdefault(entity, {})[value.lower()] = self.synonyms.get(value.lower(), value)
+        # synonyms in nlu.yml are not tied to an entity
+        for entity_values in values.values():
+            for surface, canonical in self.synonyms.items():
+                entity_values.setdefault(surface, canonical)
+        return values
+
+
+def _parse_example_block(block: str) -> List[str]:
+    """Split a `examples: |` block into example strings, dropping comments."""
+    examples = []
+    for line in block.splitlines():
+        line = line.strip()
+        if not line.startswith("- "):
+            continue
+        example = line[2:]
+        # inline comments: "it's hot in this room # This could imply ..."
+        if " #" in example:
+            example = example[:example.index(" #")]
+        example = example.strip()
+        if example:
+            examples.append(example)
+    return examples
+
+
+def load_nlu_data(path: str) -> NLUData:
+    """Load intents, lookup tables and synonyms from a Rasa 3.x nlu.yml file."""
+    with open(path, 'r') as file:
+        content = yaml.safe_load(file) or {}
+
+    data = NLUData()
+    for item in content.get("nlu", []) or []:
+        examples = _parse_example_block(item.get("examples", "") or "")
+        if "intent" in item:
+            data.examples.extend(NLUExample(item["intent"], example) for example in examples)
+        elif "lookup" in item:
+            data.lookups.setdefault(item["lookup"], []).extend(examples)
+        elif "synonym" in item:
+            for example in examples:
+                data.synonyms[example.lower()] = item["synonym"]
+    return data
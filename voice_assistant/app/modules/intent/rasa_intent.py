@@ -5,19 +5,83 @@ Uses trained Rasa NLU model for intent and entity extraction.
 
 import sys
 import os
-from typing import Dict, Any, List
+import time
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional
 from .base import BaseIntent
 from .intents import ALL_INTENTS
-from rasa.core.agent import Agent
-from app.constants import RASA_MODEL_PATH
+from app.constants import RASA_MODEL_PATH, BATCH_CHUNK_SIZE, NLU_DATA_PATH
+from app.core.metrics import RASA_PARSE_LATENCY
+from app.core.loop_thread import get_background_loop
+from app.core.micro_batcher import MicroBatcher
+from .rasa_workers import parse_messages, start_worker_pool
+from .rasa_loader import load_agent
+from app.core.admission import get_admission_controller
+from app.core.intent_cache import get_intent_cache
+from app.core.model_cache import get_model_cache
+
+# swaps kept in the model status history
+MODEL_HISTORY_SIZE = 10
+# warm-up set when nlu.yml is missing or has no examples
+WARMUP_FALLBACK_TEXTS = ("hello", "turn on the fan", "what time is it")
+
+
 class RasaIntent(BaseIntent):
     """Rasa Intent Recognition implementation."""
     
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, config: Optional[Dict[str, Any]] = None):
         super().__init__()
         self.model_path = model_path or RASA_MODEL_PATH
         self.agent = None
         self.supported_intents = ALL_INTENTS
+        self.config = config or {}
+        
+        warmup_config = self.config.get('settings', {}).get('rasa', {}).get('warmup', {}) or {}
+        self.warmup_enabled = warmup_config.get('enabled', True)
+        self.warmup_examples = warmup_config.get('max_examples', 30)
+        self.warmup_nlu_path = warmup_config.get('nlu_path', NLU_DATA_PATH)
+        self.warmup_stats: Dict[str, Any] = {}
+        # every parse runs on this one loop thread
+        self._loop = get_background_loop("va-rasa")
+        
+        # concurrent parses arriving within max_wait_ms share one graph run
+        batch_config = self.config.get('settings', {}).get('rasa', {}).get('microbatch', {}) or {}
+        self._batcher = None
+        if batch_config.get('enabled', True):
+            self._batcher = MicroBatcher(
+                self._run_batch,
+                max_batch=batch_config.get('max_batch', 16),
+                max_wait_ms=batch_config.get('max_wait_ms', 5),
+                name="rasa"
+            )
+        
+        # optional pool of worker processes doing the parsing
+        self.workers_config = self.config.get('settings', {}).get('rasa', {}).get('workers', {}) or {}
+        self.worker_pool = None
+        
+        # hot swap: newer models dropped into models_dir are loaded, warmed up and swapped in
+        swap_config = self.config.get('settings', {}).get('rasa', {}).get('hot_swap', {}) or {}
+        self.hot_swap_enabled = swap_config.get('enabled', False)
+        self.models_dir = swap_config.get('models_dir', os.path.dirname(RASA_MODEL_PATH))
+        self.poll_interval = swap_config.get('poll_interval', 10.0)
+        # files modified more recently than this may still be being copied
+        self.settle_seconds = swap_config.get('settle_seconds', 5.0)
+        self.keep_previous = swap_config.get('keep_previous', True)
+        if self.hot_swap_enabled and model_path is None:
+            self.model_path = self.latest_model() or self.model_path
+        
+        self.loaded_at = None
+        self.swap_state = "idle"
+        self.swap_error = None
+        self.swap_history: List[Dict[str, Any]] = []
+        # (agent, path, warmup_stats) of the model before the last swap
+        self._previous = None
+        # path -> mtime of models that failed to load or were rolled back
+        self._rejected: Dict[str, float] = {}
+        self._swap_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watcher = None
     
     def initialize(self) -> bool:
         """Initialize Rasa intent recognition engine."""
@@ -26,42 +90,360 @@ class RasaIntent(BaseIntent):
             print(f"Python Executable: {sys.executable}")
             
             print("------------------")
-            self.agent = Agent.load(self.model_path)
+            agent, self.warmup_stats = self._load_model(self.model_path, self._loop)
+            self._activate(agent, self.model_path, self.warmup_stats)
             self.is_initialized = True
+            if self.hot_swap_enabled:
+                self.start_model_watcher()
             self.logger.info("Rasa Intent Recognition initialized successfully")
             return True
         except Exception as e:
             self.logger.error(f"Failed to initialize Rasa Intent: {str(e)}")
             return False
     
+    def _load_model(self, path: str, loop):
+        """Load a model and warm it up on the given loop. Returns (agent, warmup stats)."""
+        load_start = time.perf_counter()
+        # extracted once into the model cache, so restarts skip the tar extraction
+        agent = load_agent(path, self.config)
+        load_seconds = time.perf_counter() - load_start
+        
+        # ready only once the first-parse cost has been paid
+        warmup_stats = self._warm_up(agent, loop) if self.warmup_enabled else {}
+        warmup_stats["load_seconds"] = round(load_seconds, 3)
+        return agent, warmup_stats
+    
+    def _activate(self, agent, path: str, warmup_stats: Dict[str, Any], action: str = "swap"):
+        """Make a loaded model the active one. Parses already running finish on the old agent."""
+        previous = (self.agent, self.model_path, self.warmup_stats) if self.agent is not None else None
+        # started after warm-up; a forked worker inherits the warm graph, others warm up themselves
+        worker_pool = None
+        if self.workers_config.get('enabled', False):
+            worker_pool = start_worker_pool(agent, path, self.workers_config, self.config)
+        
+        old_pool = self.worker_pool
+        self.agent = agent
+        self.worker_pool = worker_pool
+        self.model_path = path
+        self.model_version = os.path.basename(path)
+        self.warmup_stats = warmup_stats
+        self.loaded_at = time.time()
+        
+        if previous:
+            self._previous = previous if self.keep_previous else None
+            # cached intents came from the old model
+            get_intent_cache().invalidate()
+            self._record_swap(previous[1], path, action)
+        if old_pool:
+            # jobs already queued on the old workers are answered before they stop
+            threading.Thread(target=old_pool.stop, name="va-rasa-pool-stop", daemon=True).start()
+    
+    def _record_swap(self, old_path: str, new_path: str, action: str):
+        self.swap_history.append({
+            "action": action,
+            "from": os.path.basename(old_path),
+            "to": os.path.basename(new_path),
+            "at": time.time()
+        })
+        del self.swap_history[:-MODEL_HISTORY_SIZE]
+        self.logger.info(f"Rasa model {action}: {os.path.basename(old_path)} -> {os.path.basename(new_path)}")
+    
+    def available_models(self) -> List[Dict[str, Any]]:
+        """Model archives in models_dir, newest first."""
+        if not os.path.isdir(self.models_dir):
+            return []
+        models = []
+        for name in os.listdir(self.models_dir):
+            if name.endswith('.tar.gz'):
+                path = os.path.join(self.models_dir, name)
+                models.append({"path": path, "version": name, "mtime": os.path.getmtime(path), "size": os.path.getsize(path)})
+        return sorted(models, key=lambda model: model["mtime"], reverse=True)
+    
+    def latest_model(self) -> Optional[str]:
+        """Newest model in models_dir by mtime (like RasaInference.load_latest_model)."""
+        models = self.available_models()
+        return models[0]["path"] if models else None
+    
+    def swap_model(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load, warm up and swap in a model (the newest in models_dir by default).
+        Blocks for the load; serving continues on the active model meanwhile.
+        """
+        path = path or self.latest_model()
+        if not path or not os.path.exists(path):
+            return {"success": False, "error": f"Model not found: {path}"}
+        if not self._swap_lock.acquire(blocking=False):
+            return {"success": False, "error": "A model swap is already in progress"}
+        try:
+            self.swap_state = "loading"
+            self.swap_error = None
+            self.logger.info(f"Loading Rasa model {path} for hot swap")
+            # warm up on a separate loop so live parses are not queued behind it
+            agent, warmup_stats = self._load_model(path, get_background_loop("va-rasa-swap"))
+            self._activate(agent, path, warmup_stats)
+            self._rejected.pop(path, None)
+            self._pin(path)
+            self.swap_state = "idle"
+            return {"success": True, "model_version": self.model_version, "warmup": warmup_stats}
+        except Exception as e:
+            self.logger.error(f"Rasa model swap to {path} failed, keeping {self.model_version}: {str(e)}")
+            self.swap_state = "failed"
+            self.swap_error = str(e)
+            if os.path.exists(path):
+                self._rejected[path] = os.path.getmtime(path)
+            return {"success": False, "error": str(e), "model_version": self.model_version}
+        finally:
+            self._swap_lock.release()
+    
+    def rollback(self) -> Dict[str, Any]:
+        """Swap back to the model that was active before the last swap."""
+        if not self._previous:
+            return {"success": False, "error": "No previous model to roll back to"}
+        with self._swap_lock:
+            agent, path, warmup_stats = self._previous
+            rolled_back = self.model_path
+            self._activate(agent, path, warmup_stats, action="rollback")
+            # the watcher must not swap the rolled back model in again
+            if os.path.exists(rolled_back):
+                self._rejected[rolled_back] = os.path.getmtime(rolled_back)
+            self._pin(path)
+        return {"success": True, "model_version": self.model_version}
+    
+    def _pin(self, path: str):
+        """
+        Keep a model chosen by hand: archives newer than it are marked rejected,
+        so the watcher only swaps again once a newer file is dropped in.
+        """
+        if not os.path.exists(path):
+            return
+        mtime = os.path.getmtime(path)
+        for model in self.available_models():
+            if model["path"] != path and model["mtime"] > mtime:
+                self._rejected[model["path"]] = model["mtime"]
+    
+    def start_model_watcher(self):
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(target=self._watch_models, name="va-rasa-model-watch", daemon=True)
+        self._watcher.start()
+        self.logger.info(f"Watching {self.models_dir} for new Rasa models every {self.poll_interval}s")
+    
+    def stop_model_watcher(self):
+        self._watch_stop.set()
+    
+    def _watch_models(self):
+        while not self._watch_stop.wait(self.poll_interval):
+            try:
+                models = self.available_models()
+                if not models:
+                    continue
+                newest = models[0]
+                if newest["path"] == self.model_path or self._rejected.get(newest["path"]) == newest["mtime"]:
+                    continue
+                if time.time() - newest["mtime"] < self.settle_seconds:
+                    continue
+                self.swap_model(newest["path"])
+            except Exception as e:
+                self.logger.error(f"Rasa model watcher error: {str(e)}")
+    
+    def get_model_status(self) -> Dict[str, Any]:
+        return {
+            "active": {
+                "version": self.model_version,
+                "path": self.model_path,
+                "loaded_at": self.loaded_at,
+                "warmup": self.warmup_stats
+            },
+            "previous": os.path.basename(self._previous[1]) if self._previous else None,
+            "swap_state": self.swap_state,
+            "swap_error": self.swap_error,
+            "watching": bool(self._watcher and self._watcher.is_alive()),
+            "models_dir": self.models_dir,
+            "available": [{k: v for k, v in model.items() if k != "path"} for model in self.available_models()],
+            "history": list(self.swap_history)
+        }
+    
+    def _warmup_texts(self) -> List[str]:
+        """Up to max_examples nlu.yml examples, cycling through the intents."""
+        from .nlu_data import load_nlu_data
+        try:
+            examples = load_nlu_data(self.warmup_nlu_path).examples
+        except Exception as e:
+            self.logger.warning(f"No warm-up examples from {self.warmup_nlu_path}: {str(e)}")
+            return list(WARMUP_FALLBACK_TEXTS)
+        
+        by_intent: Dict[str, List[str]] = {}
+        for example in examples:
+            by_intent.setdefault(example.intent, []).append(example.text)
+        if not by_intent:
+            self.logger.warning(f"No warm-up examples in {self.warmup_nlu_path}")
+            return list(WARMUP_FALLBACK_TEXTS)
+        texts = []
+        for i in range(max(len(v) for v in by_intent.values())):
+            for intent_texts in by_intent.values():
+                if i < len(intent_texts):
+                    texts.append(intent_texts[i])
+        return texts[:self.warmup_examples]
+
+    def _warm_up(self, agent, loop) -> Dict[str, Any]:
+        """Parse the warm-up set, recording the cold (first) and warm latencies."""
+        texts = self._warmup_texts()
+        latencies = []
+        start = time.perf_counter()
+        for text in texts:
+            parse_start = time.perf_counter()
+            loop.run(agent.parse_message(text))
+            latencies.append((time.perf_counter() - parse_start) * 1000)
+        
+        if not latencies:
+            return {}
+        warm = sorted(latencies[1:]) or latencies
+        stats = {
+            "examples": len(latencies),
+            "cold_ms": round(latencies[0], 3),
+            "warm_p50_ms": round(warm[len(warm) // 2], 3),
+            "warm_max_ms": round(warm[-1], 3)
+        }
+        
+        if self._batcher:
+            # batched graph runs see different tensor shapes, trace them too
+            batch = (texts * self._batcher.max_batch)[:self._batcher.max_batch]
+            batch_start = time.perf_counter()
+            try:
+                parse_messages(agent, batch)
+                stats["batch_ms"] = round((time.perf_counter() - batch_start) * 1000, 3)
+            except Exception as e:
+                self.logger.warning(f"Batched Rasa parse unavailable, micro-batching disabled: {str(e)}")
+                self._batcher = None
+        stats["warmup_seconds"] = round(time.perf_counter() - start, 3)
+        self.logger.info(f"Rasa warm-up: cold {stats['cold_ms']} ms, warm p50 {stats['warm_p50_ms']} ms over {stats['examples']} examples")
+        return stats
+
     def recognize_intent(self, text: str, **kwargs) -> Dict[str, Any]:
         """Recognize intent and entities from text using Rasa."""
         if not self.is_initialized or not self.agent:
             return {"error": "Rasa Intent not initialized", "success": False}
+        # a swap while this request waits does not change the model that parses it
+        agent, worker_pool = self.agent, self.worker_pool
         
         try:
             self.logger.info(f"Rasa Intent analyzing: '{text}'")
-            
-            import asyncio            
-            try:
-                loop = asyncio.get_running_loop()
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self.agent.parse_message(text))
-                    result = future.result()
-            except RuntimeError:
-                result = asyncio.run(self.agent.parse_message(text))
-            
-            intent = result.get("intent", {}).get("name", "unknown")
-            confidence = result.get("intent", {}).get("confidence", 0.0)
-            entities = {e["entity"]: e["value"] for e in result.get("entities", [])}
-    
-            return {
-                "success": True,
-                "intent": intent,
-                "confidence": confidence,
-                "entities": entities
-            }
+            if worker_pool:
+                try:
+                    return self._to_result(worker_pool.parse([text])[0])
+                except Exception as e:
+                    self.logger.warning(f"Rasa worker parse failed, parsing in process: {str(e)}")
+            # parse on the long-lived Rasa loop instead of a new loop per call
+            result = self._loop.run(self._parse(text, agent))
+            return self._to_result(result)
         except Exception as e:
             self.logger.error(f"Rasa Intent error: {str(e)}")
             return {"error": str(e), "success": False}
+
+    async def recognize_intent_async(self, text: str, **kwargs) -> Dict[str, Any]:
+        """Recognize intent from the server loop; the parse itself runs on the Rasa loop thread."""
+        if not self.is_initialized or not self.agent:
+            return {"error": "Rasa Intent not initialized", "success": False}
+        agent, worker_pool = self.agent, self.worker_pool
+        
+        try:
+            self.logger.info(f"Rasa Intent analyzing: '{text}'")
+            if worker_pool:
+                try:
+                    # the pool queues and batches on its own, no stage limit here either
+                    parsed = await asyncio.wrap_future(worker_pool.submit([text]))
+                    return self._to_result(parsed[0])
+                except Exception as e:
+                    self.logger.warning(f"Rasa worker parse failed, parsing in process: {str(e)}")
+            if self._batcher:
+                # the intent stage limit would cap every batch at that many parses;
+                # max_in_flight still bounds the requests waiting here
+                result = await self._loop.run_async(self._parse(text, agent))
+            else:
+                async with get_admission_controller().stage("intent"):
+                    result = await self._loop.run_async(self._parse(text, agent))
+            return self._to_result(result)
+        except Exception as e:
+            self.logger.error(f"Rasa Intent error: {str(e)}")
+            return {"error": str(e), "success": False}
+
+    async def _parse(self, text: str, agent) -> Dict[str, Any]:
+        """Runs on the Rasa loop, so the latency excludes time spent queueing."""
+        if self._batcher:
+            try:
+                return await self._batcher.submit((agent, text))
+            except Exception as e:
+                self.logger.warning(f"Micro-batched Rasa parse failed, parsing alone: {str(e)}")
+        with RASA_PARSE_LATENCY.time():
+            return await agent.parse_message(text)
+
+    def _run_batch(self, items: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Micro-batch callback for (agent, text) items: one graph run per agent
+        (two around a swap), its latency recorded for every message in it.
+        """
+        groups: Dict[int, tuple] = {}
+        for index, (agent, _) in enumerate(items):
+            groups.setdefault(id(agent), (agent, []))[1].append(index)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        for agent, indexes in groups.values():
+            start = time.perf_counter()
+            parsed = self._parse_batch([items[index][1] for index in indexes], agent)
+            elapsed = time.perf_counter() - start
+            for index, result in zip(indexes, parsed):
+                results[index] = result
+                RASA_PARSE_LATENCY.observe(elapsed)
+        return results
+
+    def recognize_intents(self, texts: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """Recognize intents for many texts with one batched NLU graph run per chunk."""
+        if not self.is_initialized or not self.agent:
+            return [{"error": "Rasa Intent not initialized", "success": False} for _ in texts]
+        agent, worker_pool = self.agent, self.worker_pool
+        
+        try:
+            self.logger.info(f"Rasa Intent analyzing batch of {len(texts)}")
+            results = []
+            if worker_pool:
+                # chunks go to the workers in parallel
+                futures = [worker_pool.submit(texts[start:start + BATCH_CHUNK_SIZE])
+                           for start in range(0, len(texts), BATCH_CHUNK_SIZE)]
+                for future in futures:
+                    results.extend(self._to_result(parsed) for parsed in future.result(worker_pool.timeout * 2))
+                return results
+            for start in range(0, len(texts), BATCH_CHUNK_SIZE):
+                chunk = texts[start:start + BATCH_CHUNK_SIZE]
+                results.extend(self._to_result(parsed) for parsed in self._parse_batch(chunk, agent))
+            return results
+        except Exception as e:
+            self.logger.warning(f"Batched Rasa parse failed, parsing one by one: {str(e)}")
+            return super().recognize_intents(texts, **kwargs)
+
+    def _parse_batch(self, texts: List[str], agent) -> List[Dict[str, Any]]:
+        """Run the NLU graph of the given agent once for a list of messages."""
+        return parse_messages(agent, texts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "model_version": self.model_version,
+            "warmup": self.warmup_stats,
+            "swap_state": self.swap_state,
+            "microbatch": self._batcher.get_stats() if self._batcher else None,
+            "workers": self.worker_pool.get_stats() if self.worker_pool else None,
+            "model_cache": get_model_cache(self.config).get_stats()
+        }
+
+    @staticmethod
+    def _to_result(parse_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert Rasa parse data to the module result format."""
+        intent = (parse_data.get("intent") or {}).get("name", "unknown")
+        confidence = (parse_data.get("intent") or {}).get("confidence", 0.0)
+        entities = {e["entity"]: e["value"] for e in parse_data.get("entities", [])}
+
+        return {
+            "success": True,
+            "intent": intent,
+            "confidence": confidence,
+            "entities": entities
+        }
@@ -0,0 +1,80 @@
+"""
+Rasa model loading through the unpacked artifact cache.
+Agent.load extracts the model archive into a fresh temporary directory on
+every call. Here the archive is extracted once into the model cache and the
+predict graph is built straight from the cached directory, so a restart only
+pays for loading the weights.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+from app.core.model_cache import get_model_cache
+
+logger = logging.getLogger(__name__)
+
+# layout of a Rasa 3.x model archive
+COMPONENTS_DIR = "components"
+
+
+def _cached_processor_class():
+    """MessageProcessor that builds its graph runner from an unpacked model directory."""
+    from rasa.core.processor import MessageProcessor
+    from rasa.engine.graph import ExecutionContext
+    from rasa.engine.runner.dask import DaskGraphRunner
+    from rasa.engine.storage.local_model_storage import LocalModelStorage
+
+    class CachedMessageProcessor(MessageProcessor):
+        def __init__(self, unpacked_dir: str, **kwargs):
+            self.unpacked_dir = Path(unpacked_dir)
+            super().__init__(**kwargs)
+
+        def _load_model(self, model_path):
+            # components are read-only at predict time, so every process can share the directory
+            metadata = LocalModelStorage._load_metadata(self.unpacked_dir)
+            model_storage = LocalModelStorage(self.unpacked_dir / COMPONENTS_DIR)
+            runner = DaskGraphRunner.create(
+                graph_schema=metadata.predict_schema,
+                model_storage=model_storage,
+                execution_context=ExecutionContext(graph_schema=metadata.predict_schema, model_id=metadata.model_id)
+            )
+            return os.path.basename(str(model_path)), metadata, runner
+
+    return CachedMessageProcessor
+
+
+def _agent_from_unpacked(model_path: str, unpacked_dir: str):
+    """What Agent.load(model_path) builds, with the processor reading the unpacked directory."""
+    from rasa.core.agent import Agent
+
+    agent = Agent()
+    agent.processor = _cached_processor_class()(
+        unpacked_dir,
+        model_path=model_path,
+        tracker_store=agent.tracker_store,
+        lock_store=agent.lock_store,
+        action_endpoint=agent.action_endpoint,
+        generator=agent.nlg,
+        http_interpreter=agent.http_interpreter
+    )
+    agent.domain = agent.processor.domain
+    agent._set_fingerprint()
+    agent.tracker_store.domain = agent.domain
+    return agent
+
+
+def load_agent(model_path: str, config: Optional[Dict[str, Any]] = None):
+    """Load a Rasa agent, unpacking the archive through the model cache when it is enabled."""
+    from rasa.core.agent import Agent
+
+    cache = get_model_cache(config)
+    if not cache.enabled or not os.path.isfile(model_path):
+        return Agent.load(model_path)
+    try:
+        unpacked_dir = cache.unpacked(model_path)
+        return _agent_from_unpacked(model_path, unpacked_dir)
+    except Exception as e:
+        # a Rasa version with a different archive layout still loads the slow way
+        logger.warning(f"Loading {os.path.basename(model_path)} from the model cache failed, using Agent.load: {str(e)}")
+        return Agent.load(model_path)
@@ -0,0 +1,333 @@
+"""
+Rasa NLU worker processes, so NLU inference runs on every core instead of
+behind the API interpreter's GIL. Parses go to the workers over pipes; a
+crashed worker is replaced by starting a new one.
+
+The server always has other threads running by the time a model is loaded
+(the Rasa loop, TensorFlow's pools, executors, writers), and forking then can
+deadlock the child. Workers are therefore started by a forkserver that has
+the Rasa libraries preloaded, and each loads its own copy of the model from
+the artifact cache: the model is not shared copy-on-write. get_stats reports
+every worker's RSS so the per-worker cost can be watched. fork is only used
+when asked for and the process is still single-threaded (scripts and tools).
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+from app.core.metrics import counter, gauge
+from .rasa_loader import load_agent
+
+logger = logging.getLogger(__name__)
+
+WORKER_UTILIZATION = gauge("voice_rasa_worker_utilization", "Fraction of time a Rasa worker spent parsing", ["worker"])
+WORKER_RESTARTS = counter("voice_rasa_worker_restarts_total", "Rasa worker processes restarted", ["reason"])
+
+
+def parse_messages(agent, texts: List[str]) -> List[Dict[str, Any]]:
+    """Run the NLU graph once for a list of messages (what agent.parse_message does for one)."""
+    from rasa.core.channels.channel import UserMessage
+    from rasa.engine.constants import PLACEHOLDER_MESSAGE, PLACEHOLDER_TRACKER
+
+    processor = agent.processor
+    target = processor.model_metadata.nlu_target
+    messages = [UserMessage(text) for text in texts]
+
+    outputs = processor.graph_runner.run(
+        inputs={PLACEHOLDER_MESSAGE: messages, PLACEHOLDER_TRACKER: None},
+        targets=[target]
+    )
+    return [message.as_dict(only_output_properties=True) for message in outputs[target]]
+
+
+def _worker_main(conn, agent, model_path: str, config: Optional[Dict[str, Any]] = None):
+    """Worker process: parse text lists from the pipe until told to stop."""
+    # the API process handles Ctrl+C and stops the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if agent is None:
+        # forkserver/spawn workers load the unpacked model from the artifact cache
+        agent = load_agent(model_path, config)
+        try:
+            # pay the first-parse cost before the first request does
+            parse_messages(agent, ["hello"])
+        except Exception:
+            pass
+    loop = asyncio.new_event_loop()
+
+    while True:
+        try:
+            texts = conn.recv()
+        except (EOFError, OSError):
+            break
+        if texts is None:
+            break
+        try:
+            try:
+                results = parse_messages(agent, texts)
+            except Exception:
+                results = [loop.run_until_complete(agent.parse_message(text)) for text in texts]
+            conn.send(("ok", results))
+        except Exception as e:
+            conn.send(("error", str(e)))
+    loop.close()
+
+
+# imported once in the forkserver, so workers start with the libraries loaded
+FORKSERVER_PRELOAD = ["rasa.core.agent", "rasa.engine.runner.dask", "app.modules.intent.rasa_loader"]
+
+
+def choose_start_method(requested: str) -> str:
+    """fork only while this is the only thread, otherwise forkserver (or spawn)."""
+    if requested != "fork" or threading.active_count() == 1:
+        return requested
+    fallback = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    logger.warning(f"{threading.active_count()} threads running, starting Rasa workers with {fallback} instead of fork")
+    return fallback
+
+
+def worker_context(start_method: str):
+    context = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+    return context
+
+
+def process_rss_mb(pid: Optional[int]) -> Optional[float]:
+    """Resident set size of a process from /proc (None where unavailable)."""
+    if not pid:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class _Worker:
+    """One worker process, its pipe and its usage counters."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.started_at = 0.0
+        self.busy_seconds = 0.0
+        self.parses = 0
+        self.restarts = 0
+
+    def utilization(self) -> float:
+        uptime = time.monotonic() - self.started_at
+        return min(1.0, self.busy_seconds / uptime) if uptime > 0 else 0.0
+
+
+class RasaWorkerPool:
+    """
+    N Rasa worker processes, each driven by a dispatcher thread in the API
+    process. Jobs queued while a worker is busy are sent to it together as
+    one batch (up to max_batch texts).
+    """
+
+    def __init__(self, agent, model_path: str, processes: int = 0, start_method: str = "forkserver",
+                 max_batch: int = 16, timeout: float = 10.0, config: Optional[Dict[str, Any]] = None):
+        self.agent = agent
+        self.model_path = model_path
+        self.config = config or {}
+        self.processes = processes or max(1, (os.cpu_count() or 2) - 1)
+        self.start_method = choose_start_method(start_method)
+        self.max_batch = max_batch
+        self.timeout = timeout
+
+        self._context = worker_context(self.start_method)
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        for index in range(self.processes):
+            worker = _Worker(index)
+            self._spawn(worker)
+            self._workers.append(worker)
+            thread = threading.Thread(target=self._dispatch, args=(worker,), name=f"va-rasa-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.processes} Rasa worker processes ({self.start_method})")
+
+    def _spawn(self, worker: _Worker):
+        parent_conn, child_conn = self._context.Pipe()
+        # fork inherits the loaded agent; spawned workers load the model themselves
+        agent = self.agent if self.start_method == "fork" else None
+        process = self._context.Process(
+            target=_worker_main, args=(child_conn, agent, self.model_path, self.config),
+            name=f"rasa-worker-{worker.index}", daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker.process = process
+        worker.conn = parent_conn
+        worker.started_at = time.monotonic()
+        worker.busy_seconds = 0.0
+
+    def _restart(self, worker: _Worker, reason: str):
+        logger.warning(f"Restarting Rasa worker {worker.index} ({reason})")
+        WORKER_RESTARTS.labels(reason=reason).inc()
+        worker.restarts += 1
+        try:
+            worker.conn.close()
+        except OSError:
+            pass
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=1)
+        if self._running:
+            if self.start_method == "fork":
+                # the dispatcher threads are running by now
+                self.start_method = choose_start_method(self.start_method)
+                self._context = worker_context(self.start_method)
+            self._spawn(worker)
+
+    def _next_jobs(self) -> Optional[List[tuple]]:
+        """Block for a job, then take whatever else is queued up to max_batch texts."""
+        job = self._jobs.get()
+        if job is None:
+            return None
+        jobs = [job]
+        count = len(job[0])
+        while count < self.max_batch:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                # leave the stop signal for this or another dispatcher
+                self._jobs.put(None)
+                break
+            jobs.append(job)
+            count += len(job[0])
+        return jobs
+
+    def _dispatch(self, worker: _Worker):
+        while self._running:
+            jobs = self._next_jobs()
+            if jobs is None:
+                break
+            texts = [text for job_texts, _ in jobs for text in job_texts]
+            start = time.monotonic()
+            try:
+                worker.conn.send(texts)
+                if not worker.conn.poll(self.timeout):
+                    raise TimeoutError(f"no reply within {self.timeout}s")
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError, TimeoutError) as e:
+                reason = "timeout" if isinstance(e, TimeoutError) else "crashed"
+                self._restart(worker, reason)
+                for _, future in jobs:
+                    future.set_exception(RuntimeError(f"Rasa worker {worker.index} {reason}: {str(e)}"))
+                continue
+
+            worker.busy_seconds += time.monotonic() - start
+            worker.parses += len(texts)
+            WORKER_UTILIZATION.labels(worker=worker.index).set(worker.utilization())
+            if status != "ok":
+                for _, future in jobs:
+                    future.set_exception(RuntimeError(payload))
+                continue
+            offset = 0
+            for job_texts, future in jobs:
+                future.set_result(payload[offset:offset + len(job_texts)])
+                offset += len(job_texts)
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for parsing; the future resolves to their Rasa parse dicts."""
+        future: Future = Future()
+        if not self._running:
+            future.set_exception(RuntimeError("Rasa worker pool is not running"))
+        else:
+            self._jobs.put((list(texts), future))
+        return future
+
+    def parse(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Blocking submit()."""
+        return self.submit(texts).result(self.timeout * 2)
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join(timeout=self.timeout)
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.kill()
+        # a swapped-out pool must not keep its agent alive
+        with _pools_lock:
+            if self in _pools:
+                _pools.remove(self)
+        logger.info("Rasa worker pool stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "processes": self.processes,
+            "start_method": self.start_method,
+            "queued": self._jobs.qsize(),
+            "api_rss_mb": process_rss_mb(os.getpid()),
+            "workers": [
+                {
+                    "index": worker.index,
+                    "pid": worker.process.pid if worker.process else None,
+                    "alive": bool(worker.process and worker.process.is_alive()),
+                    "rss_mb": process_rss_mb(worker.process.pid if worker.process else None),
+                    "parses": worker.parses,
+                    "restarts": worker.restarts,
+                    "utilization": round(worker.utilization(), 4)
+                }
+                for worker in self._workers
+            ]
+        }
+
+
+# Running pools of RasaIntent instances, stopped at shutdown
+_pools: List[RasaWorkerPool] = []
+_pools_lock = threading.Lock()
+
+def start_worker_pool(agent, model_path: str, workers_config: Dict[str, Any],
+                      config: Optional[Dict[str, Any]] = None) -> RasaWorkerPool:
+    """Start a worker pool from settings.rasa.workers."""
+    pool = RasaWorkerPool(
+        agent, model_path,
+        processes=workers_config.get('processes', 0),
+        start_method=workers_config.get('start_method', 'forkserver'),
+        max_batch=workers_config.get('max_batch', 16),
+        timeout=workers_config.get('timeout', 10.0),
+        config=config
+    )
+    pool.start()
+    with _pools_lock:
+        _pools.append(pool)
+    return pool
+
+def stop_worker_pools():
+    with _pools_lock:
+        pools = list(_pools)
+    for pool in pools:
+        pool.stop()
@@ -0,0 +1,51 @@
+"""
+Stub LLM Intent Recognition implementation.
+Runs the LLMIntent prompt/result path but replaces the provider call with a
+fixed-latency canned answer, for benchmarks and offline load tests.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Optional
+from .llm_intent import LLMIntent
+
+
+class StubLLMIntent(LLMIntent):
+    """LLMIntent with a deterministic local provider."""
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__(config)
+        stub_config = self.config.get('settings', {}).get('stub_llm', {}) or {}
+        self.provider = "stub"
+        self.model_version = "stub"
+        self.latency = stub_config.get('latency_ms', 400) / 1000
+        self.speech_response = stub_config.get('speech_response', "This is a stub answer.")
+        self.calls = 0
+    
+    def _check_provider_availability(self, provider: str) -> bool:
+        return provider == "stub" or super()._check_provider_availability(provider)
+    
+    def _call_llm_provider(self, provider: str, prompt: str) -> Dict[str, Any]:
+        if provider != "stub":
+            return super()._call_llm_provider(provider, prompt)
+        
+        time.sleep(self.latency)
+        return self._stub_reply()
+    
+    async def _call_llm_provider_async(self, provider: str, prompt: str) -> Dict[str, Any]:
+        if provider != "stub":
+            return await super()._call_llm_provider_async(provider, prompt)
+        
+        await asyncio.sleep(self.latency)
+        return self._stub_reply()
+    
+    def _stub_reply(self) -> Dict[str, Any]:
+        self.calls += 1
+        # same shape as a parsed provider reply
+        return {
+            "intent": "direct_response",
+            "confidence": 0.9,
+            "entities": {},
+            "reasoning": "stub provider",
+            "speech_response": self.speech_response
+        }
@@ -0,0 +1,76 @@
+"""Tests for the device gazetteer."""
+
+from app.modules.intent.gazetteer import DeviceGazetteer
+
+ALIASES = {
+    "fans": ["ceiling fan"],
+    "lights_corner": ["corner lamp", "side lamp shade"],
+    "ambient_lights": ["lamp"],
+    "night_mode": ["bed side lamp"]
+}
+
+
+def _gazetteer(**settings) -> DeviceGazetteer:
+    return DeviceGazetteer({"settings": {"gazetteer": {"aliases": ALIASES, **settings}}})
+
+
+def test_topic_device_names_and_plural_variants():
+    gazetteer = _gazetteer()
+    assert gazetteer.find("switch on all lights") == "all_lights"
+    assert gazetteer.find("switch on all light") == "all_lights"
+    assert gazetteer.find("turn on the fan") == "fans"
+    assert gazetteer.find("turn on the ceiling fans") == "fans"
+    assert gazetteer.find("what time is it") is None
+
+
+def test_find_all_reports_overlapping_mentions():
+    matches = _gazetteer().find_all("turn off the corner lamp")
+    assert sorted(matches) == [(3, 5, "lights_corner"), (4, 5, "ambient_lights")]
+
+
+def test_find_prefers_the_leftmost_longest_mention():
+    gazetteer = _gazetteer()
+    assert gazetteer.find("turn off the corner lamp") == "lights_corner"
+    assert gazetteer.find("the lamp and the fan") == "ambient_lights"
+
+
+def test_failure_links_continue_into_an_overlapping_pattern():
+    # after "bed side lamp", "shade" is only reachable through the "side lamp" suffix
+    matches = _gazetteer().find_all("bed side lamp shade")
+    assert (0, 3, "night_mode") in matches
+    assert (1, 4, "lights_corner") in matches
+    assert (2, 3, "ambient_lights") in matches
+
+
+def test_canonical_needs_a_whole_match():
+    gazetteer = _gazetteer()
+    assert gazetteer.canonical("Lights_Corner") == "lights_corner"
+    assert gazetteer.canonical("corner lamps") == "lights_corner"
+    assert gazetteer.canonical("lamp shade") is None
+    assert gazetteer.canonical("kitchen") is None
+
+
+def test_resolve_fills_a_missing_device():
+    entities = _gazetteer().resolve("turn on the ceiling fan", {})
+    assert entities == {"device": "fans"}
+
+
+def test_resolve_prefers_the_mention_in_the_text():
+    entities = _gazetteer().resolve("turn off the corner lamp", {"device": "lamp", "state": "off"})
+    assert entities == {"device": "lights_corner", "state": "off"}
+
+
+def test_resolve_keeps_a_correct_device():
+    entities = {"device": "fans"}
+    assert _gazetteer().resolve("turn on the fan", entities) is entities
+
+
+def test_resolve_canonicalizes_the_model_value_without_a_mention():
+    assert _gazetteer().resolve("turn it on", {"device": "corner lamp"}) == {"device": "lights_corner"}
+    assert _gazetteer().resolve("turn it on", {"device": "kitchen"}) == {"device": "kitchen"}
+    assert _gazetteer().resolve("turn it on", {}) == {}
+
+
+def test_disabled_gazetteer_leaves_entities_alone():
+    entities = {"device": "lamp"}
+    assert _gazetteer(enabled=False).resolve("turn off the corner lamp", entities) is entities
@@ -4,7 +4,7 @@ All TTS implementations should inherit from this base class.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 import logging
 
 
@@ -39,6 +39,19 @@ class BaseTTS(ABC):
         """
         pass
     
+    def synthesize_stream(self, text: str, **kwargs) -> Iterator[Any]:
+        """
+        Synthesize text incrementally without playing it.
+        
+        Args:
+            text (str): Text to convert to speech
+            **kwargs: Additional parameters for TTS engine
+            
+        Returns:
+            Iterator[AudioClip]: PCM clips (e.g. one per sentence) as they are ready
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support streaming synthesis")
+    
     @abstractmethod
     def get_available_voices(self) -> list:
         """
@@ -5,19 +5,20 @@ Efficient implementation that loads the model once and reuses it.
 
 import os
 import tempfile
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 from .base import BaseTTS
+from .playback import AudioClip, get_playback_worker, PRIORITY_NORMAL
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 from app.constants import PIPER_MODELS
+from app.core.tracing import span
+from app.core.metrics import TTS_REAL_TIME_FACTOR
+import time
+import importlib.util
 
-try:
-    from piper import PiperVoice
-    PIPER_AVAILABLE = True
-except ImportError:
-    PIPER_AVAILABLE = False
-    PiperVoice = None
+# piper (and onnxruntime) are imported in initialize, not when the tts package is imported
+PIPER_AVAILABLE = importlib.util.find_spec("piper") is not None
 
 
 class PiperTTS(BaseTTS):
@@ -57,6 +58,7 @@ class PiperTTS(BaseTTS):
                 return False
             
             # Load the model once
+            from piper import PiperVoice
             self.voice = PiperVoice.load(self.model_path)
             self._model_loaded = True
             self.is_initialized = True
@@ -68,19 +70,20 @@ class PiperTTS(BaseTTS):
             self.logger.error(f"Failed to initialize Piper TTS: {str(e)}")
             return False
     
-    def speak(self, text: str, **kwargs) -> Dict[str, Any]:
-        """Convert text to speech using Piper TTS."""
+    def synthesize(self, text: str) -> Dict[str, Any]:
+        """Synthesize text to raw PCM without playing it."""
         if not self.is_initialized or not self._model_loaded:
             return {"error": "Piper TTS not initialized", "success": False}
         
         try:
-            self.logger.info(f"Piper TTS speaking: '{text}'")
-            
             # Generate audio chunks
-            audio_chunks = self.voice.synthesize(text)
-            
-            # Convert to list to avoid consuming the iterator twice
-            chunks_list = list(audio_chunks)
+            synth_start = time.perf_counter()
+            with span("tts.synthesize", chars=len(text)) as synth_span:
+                audio_chunks = self.voice.synthesize(text)
+                
+                # Convert to list to avoid consuming the iterator twice
+                chunks_list = list(audio_chunks)
+            synth_seconds = time.perf_counter() - synth_start
             
             if not chunks_list:
                 return {"error": "No audio chunks generated", "success": False}
@@ -90,37 +93,74 @@ class PiperTTS(BaseTTS):
             
             # Get audio properties from the first chunk
             first_chunk = chunks_list[0]
-            sample_rate = first_chunk.sample_rate
-            sample_channels = first_chunk.sample_channels
-            sample_width = first_chunk.sample_width
+            clip = AudioClip(
+                wav_bytes,
+                sample_rate=first_chunk.sample_rate,
+                channels=first_chunk.sample_channels,
+                sample_width=first_chunk.sample_width,
+                text=text
+            )
+            duration = clip.duration
+            
+            self.logger.info(f"Audio generated: {clip.sample_rate}Hz, {clip.channels} channel(s), {duration:.2f}s")
+            if duration > 0:
+                TTS_REAL_TIME_FACTOR.labels(engine="piper").observe(synth_seconds / duration)
+            if synth_span is not None:
+                synth_span.set_attribute("audio_seconds", round(duration, 3))
+            
+            return {"success": True, "clip": clip, "duration": duration}
+            
+        except Exception as e:
+            self.logger.error(f"Piper TTS synthesis error: {str(e)}")
+            return {"error": str(e), "success": False}
+    
+    def synthesize_stream(self, text: str, **kwargs) -> Iterator[AudioClip]:
+        """Yield one PCM clip per sentence as Piper produces it."""
+        if not self.is_initialized or not self._model_loaded:
+            raise RuntimeError("Piper TTS not initialized")
+        
+        with span("tts.synthesize", chars=len(text), streaming=True):
+            for chunk in self.voice.synthesize(text):
+                yield AudioClip(
+                    chunk.audio_int16_bytes,
+                    sample_rate=chunk.sample_rate,
+                    channels=chunk.sample_channels,
+                    sample_width=chunk.sample_width,
+                    text=text
+                )
+    
+    def speak(self, text: str, **kwargs) -> Dict[str, Any]:
+        """
+        Convert text to speech using Piper TTS.
+        
+        With the playback worker running, the audio is queued and this returns
+        as soon as synthesis is done; otherwise it plays and waits. 
+        kwargs: priority (playback queue priority), blocking (force inline playback).
+        """
+        if not self.is_initialized or not self._model_loaded:
+            return {"error": "Piper TTS not initialized", "success": False}
+        
+        try:
+            self.logger.info(f"Piper TTS speaking: '{text}'")
+            
+            synth_result = self.synthesize(text)
+            if not synth_result.get("success", False):
+                return synth_result
+            clip = synth_result["clip"]
+            duration = synth_result["duration"]
             
             # Create temporary file for audio output
             with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
                 # Write WAV header and audio data
-                self._write_wav_file(temp_file, wav_bytes, sample_rate, sample_channels, sample_width)
+                self._write_wav_file(temp_file, clip.pcm, clip.sample_rate, clip.channels, clip.sample_width)
                 audio_file_path = temp_file.name
             
-            # Calculate duration (approximate)
-            duration = len(wav_bytes) / (sample_rate * sample_channels * sample_width)
-            
-            self.logger.info(f"Audio generated: {sample_rate}Hz, {sample_channels} channel(s), {duration:.2f}s")
-            
-            # Play the audio using simpleaudio
-            try:
-                import simpleaudio as sa
-                self.logger.info("Playing audio...")
-                play_obj = sa.play_buffer(
-                    wav_bytes,
-                    num_channels=sample_channels,
-                    bytes_per_sample=sample_width,
-                    sample_rate=sample_rate
-                )
-                play_obj.wait_done()
-                self.logger.info("Audio playback completed!")
-            except ImportError:
-                self.logger.warning("simpleaudio not available - audio generated but not played")
-            except Exception as play_error:
-                self.logger.error(f"Error playing audio: {play_error}")
+            playback_worker = get_playback_worker()
+            if playback_worker and not kwargs.get("blocking", False):
+                queued = playback_worker.enqueue(clip, priority=kwargs.get("priority", PRIORITY_NORMAL))
+                self.logger.info(f"Audio queued for playback: {queued}")
+            else:
+                self._play_blocking(clip)
             
             return {
                 "success": True,
@@ -135,6 +175,26 @@ class PiperTTS(BaseTTS):
             self.logger.error(f"Piper TTS error: {str(e)}")
             return {"error": str(e), "success": False}
     
+    def _play_blocking(self, clip: AudioClip):
+        """Play the clip and wait until it finishes."""
+        # Play the audio using simpleaudio
+        try:
+            import simpleaudio as sa
+            self.logger.info("Playing audio...")
+            with span("tts.playback", audio_seconds=round(clip.duration, 3)):
+                play_obj = sa.play_buffer(
+                    clip.pcm,
+                    num_channels=clip.channels,
+                    bytes_per_sample=clip.sample_width,
+                    sample_rate=clip.sample_rate
+                )
+                play_obj.wait_done()
+            self.logger.info("Audio playback completed!")
+        except ImportError:
+            self.logger.warning("simpleaudio not available - audio generated but not played")
+        except Exception as play_error:
+            self.logger.error(f"Error playing audio: {play_error}")
+    
     def _write_wav_file(self, file, audio_data: bytes, sample_rate: int, channels: int, sample_width: int):
         """Write WAV file header and audio data."""
         import wave
@@ -0,0 +1,172 @@
+"""
+Background audio output worker.
+TTS modules enqueue synthesized PCM and return immediately; a single worker
+thread plays clips in priority order and can be interrupted (barge-in) when
+a new wake word fires.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+from typing import Dict, Any, Optional
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+
+class AudioClip:
+    """Raw PCM audio waiting to be played."""
+
+    def __init__(self, pcm: bytes, sample_rate: int, channels: int = 1, sample_width: int = 2, text: str = ""):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.text = text
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (self.sample_rate * self.channels * self.sample_width)
+
+
+class AudioPlaybackWorker:
+    """Plays queued clips on its own thread."""
+
+    def __init__(self, max_queue: int = 16, backend: str = "simpleaudio", poll_interval: float = 0.02):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_queue = max_queue
+        # "simpleaudio" plays on the sound card, "null" discards (benchmarks, headless servers)
+        self.backend = backend
+        self.poll_interval = poll_interval
+
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._interrupt = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.current: Optional[AudioClip] = None
+        self.played = 0
+        self.dropped = 0
+        self.interrupted = 0
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="va-playback", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Playback worker started (backend: {self.backend})")
+
+    def stop(self):
+        self._running = False
+        self._interrupt.set()
+        # wake the worker if it is waiting on an empty queue
+        self._queue.put((PRIORITY_HIGH, -1, None))
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def enqueue(self, clip: AudioClip, priority: int = PRIORITY_NORMAL) -> bool:
+        """Queue a clip for playback. Returns False if the queue is full."""
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            self.logger.warning(f"Playback queue full, dropping: '{clip.text[:40]}'")
+            return False
+        self._queue.put((priority, next(self._sequence), clip))
+        return True
+
+    def interrupt(self, clear_queue: bool = True) -> Dict[str, Any]:
+        """Stop the clip being played (barge-in) and optionally drop everything queued."""
+        cleared = 0
+        with self._lock:
+            was_playing = self.current is not None
+            if was_playing:
+                self._interrupt.set()
+                self.interrupted += 1
+            if clear_queue:
+                while True:
+                    try:
+                        _, _, clip = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if clip is not None:
+                        cleared += 1
+        self.logger.info(f"Playback interrupted (playing: {was_playing}, cleared: {cleared})")
+        return {"stopped_current": was_playing, "cleared": cleared}
+
+    def get_status(self) -> Dict[str, Any]:
+        current = self.current
+        return {
+            "running": self._running,
+            "backend": self.backend,
+            "playing": current.text if current else None,
+            "queued": self._queue.qsize(),
+            "played": self.played,
+            "dropped": self.dropped,
+            "interrupted": self.interrupted
+        }
+
+    def _run(self):
+        while self._running:
+            _, _, clip = self._queue.get()
+            if clip is None:
+                continue
+            with self._lock:
+                self.current = clip
+                self._interrupt.clear()
+            try:
+                self._play(clip)
+                self.played += 1
+            except Exception as e:
+                self.logger.error(f"Error playing audio: {e}")
+            finally:
+                with self._lock:
+                    self.current = None
+
+    def _play(self, clip: AudioClip):
+        if self.backend == "null":
+            return
+
+        import simpleaudio as sa
+        play_obj = sa.play_buffer(
+            clip.pcm,
+            num_channels=clip.channels,
+            bytes_per_sample=clip.sample_width,
+            sample_rate=clip.sample_rate
+        )
+        # poll so an interrupt can cut the clip short
+        while play_obj.is_playing():
+            if self._interrupt.wait(self.poll_interval):
+                play_obj.stop()
+                return
+
+
+# Global playback worker instance (None when playback runs inline)
+_playback_worker = None
+
+def start_playback_worker(config: Optional[Dict[str, Any]] = None) -> Optional[AudioPlaybackWorker]:
+    """Create and start the global playback worker if enabled in settings.playback."""
+    global _playback_worker
+    playback_config = (config or {}).get('settings', {}).get('playback', {}) or {}
+    if not playback_config.get('enabled', False):
+        return None
+    if _playback_worker is None:
+        _playback_worker = AudioPlaybackWorker(
+            max_queue=playback_config.get('max_queue', 16),
+            backend=playback_config.get('backend', 'simpleaudio')
+        )
+        _playback_worker.start()
+    return _playback_worker
+
+def get_playback_worker() -> Optional[AudioPlaybackWorker]:
+    """Get the global playback worker, None if playback is inline."""
+    return _playback_worker
+
+def stop_playback_worker():
+    global _playback_worker
+    if _playback_worker is not None:
+        _playback_worker.stop()
+        _playback_worker = None
@@ -0,0 +1,52 @@
+"""
+Stub TTS implementation.
+Produces silent PCM with a synthesis delay proportional to the text length,
+for benchmarks and offline load tests on machines without Piper models.
+"""
+
+import time
+from typing import Dict, Any, Iterator, List, Optional
+from .base import BaseTTS
+from .playback import AudioClip, get_playback_worker, PRIORITY_NORMAL
+from app.core.tracing import span
+
+
+class StubTTS(BaseTTS):
+    """Silent TTS with deterministic timing."""
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.config = config or {}
+        stub_config = self.config.get('settings', {}).get('stub_tts', {}) or {}
+        # synthesis cost and spoken length per character
+        self.synth_ms_per_char = stub_config.get('synth_ms_per_char', 1.0)
+        self.audio_ms_per_char = stub_config.get('audio_ms_per_char', 60.0)
+        self.sample_rate = stub_config.get('sample_rate', 22050)
+    
+    def initialize(self) -> bool:
+        self.is_initialized = True
+        return True
+    
+    def _synthesize(self, text: str) -> AudioClip:
+        with span("tts.synthesize", chars=len(text), stub=True):
+            time.sleep(len(text) * self.synth_ms_per_char / 1000)
+        samples = int(self.sample_rate * len(text) * self.audio_ms_per_char / 1000)
+        return AudioClip(b"\x00\x00" * samples, sample_rate=self.sample_rate, text=text)
+    
+    def synthesize_stream(self, text: str, **kwargs) -> Iterator[AudioClip]:
+        for sentence in [s.strip() for s in text.split(".") if s.strip()] or [text]:
+            yield self._synthesize(sentence)
+    
+    def speak(self, text: str, **kwargs) -> Dict[str, Any]:
+        """Synthesize silence and queue it on the playback worker if one runs."""
+        if not self.is_initialized:
+            return {"error": "Stub TTS not initialized", "success": False}
+        
+        clip = self._synthesize(text)
+        playback_worker = get_playback_worker()
+        if playback_worker and not kwargs.get("blocking", False):
+            playback_worker.enqueue(clip, priority=kwargs.get("priority", PRIORITY_NORMAL))
+        return {"success": True, "text": text, "duration": clip.duration}
+    
+    def get_available_voices(self) -> List[str]:
+        return ["stub"]
@@ -9,6 +9,7 @@ from vosk import Model, KaldiRecognizer
 from dotenv import load_dotenv
 import json
 import time
+import requests
 
 load_dotenv()
 
@@ -21,6 +22,7 @@ SILENCE_LIMIT = 0.5
 MAX_LISTEN_TIME = 7
 NO_SPEECH_TIMEOUT = 2
 MAX_SPEECH_LIMIT = 12
+SERVER_URL = os.environ.get("VA_SERVER_URL", "http://localhost:8001")
 
 # ------------------- PORCUPINE SETUP -------------------
 porc_access_key = os.environ.get('porc_env_key')
@@ -140,6 +142,13 @@ def listen_and_transcribe(
         print(f"[ERROR] Error during transcription: {e}")
         return ""
 
+def barge_in():
+    """Stop the assistant's current reply so it does not talk over the user."""
+    try:
+        requests.post(f"{SERVER_URL}/playback/interrupt", timeout=0.5)
+    except requests.exceptions.RequestException as e:
+        print(f"[WARN] Barge-in request failed: {e}")
+
 # ------------------- MAIN LOOP -------------------
 try:
     print("\n\nWake word detection initialized.")
@@ -151,6 +160,7 @@ try:
         result = porcupine.process(pcm)
         if result >= 0:
             print("\n Wake word detected!")
+            barge_in()
             text = listen_and_transcribe()
             if text:
                 print(f" You said: {text}")
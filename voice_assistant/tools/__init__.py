@@ -0,0 +1,4 @@
+"""
+Developer tools: benchmarks and load tests for the voice pipeline.
+Run from the voice_assistant directory, e.g. `python -m tools.replay_benchmark`.
+"""
@@ -0,0 +1,161 @@
+"""
+Accuracy and latency of the fast linear intent model against Rasa DIET.
+
+The fast model is scored with stratified k-fold cross-validation on nlu.yml.
+The shipped DIET model was trained on all of nlu.yml, so both models are also
+scored on the training examples (same footing, optimistic for both) and, with
+--test-file, on a held-out nlu.yml-format file neither was trained on.
+
+    python -m tools.compare_intent_models
+    python -m tools.compare_intent_models --test-file held_out.yml --save report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Any, List, Optional
+
+from app.modules.intent.nlu_data import load_nlu_data, NLUExample
+from app.modules.intent.fast_intent import train_fast_intent
+from app.constants import NLU_DATA_PATH, RASA_MODEL_PATH
+from tools.bench_utils import summarize, rss_mb, format_table
+
+COLUMNS = ["model", "split", "examples", "accuracy", "macro_f1", "p50_ms", "p99_ms"]
+
+
+def stratified_folds(examples: List[NLUExample], k: int, seed: int) -> List[List[NLUExample]]:
+    """Deal each intent's examples round-robin into k folds."""
+    rng = random.Random(seed)
+    folds: List[List[NLUExample]] = [[] for _ in range(k)]
+    by_intent: Dict[str, List[NLUExample]] = {}
+    for example in examples:
+        by_intent.setdefault(example.intent, []).append(example)
+    offset = 0
+    for intent in sorted(by_intent):
+        intent_examples = by_intent[intent][:]
+        rng.shuffle(intent_examples)
+        for i, example in enumerate(intent_examples):
+            folds[(i + offset) % k].append(example)
+        offset += len(intent_examples)
+    return folds
+
+
+def score(labels: List[str], predictions: List[str], latencies_ms: List[float]) -> Dict[str, Any]:
+    """Accuracy, macro F1 and latency percentiles."""
+    correct = sum(label == prediction for label, prediction in zip(labels, predictions))
+    f1s = []
+    for intent in sorted(set(labels)):
+        tp = sum(l == intent and p == intent for l, p in zip(labels, predictions))
+        fp = sum(l != intent and p == intent for l, p in zip(labels, predictions))
+        fn = sum(l == intent and p != intent for l, p in zip(labels, predictions))
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1s.append(2 * precision * recall / (precision + recall) if precision + recall else 0.0)
+    latency = summarize(latencies_ms)
+    return {
+        "examples": len(labels),
+        "accuracy": round(correct / len(labels), 4) if labels else 0.0,
+        "macro_f1": round(sum(f1s) / len(f1s), 4) if f1s else 0.0,
+        "p50_ms": round(latency["p50"], 4),
+        "p99_ms": round(latency["p99"], 4)
+    }
+
+
+def predict_all(predict, examples: List[NLUExample]) -> Dict[str, Any]:
+    predictions, latencies = [], []
+    for example in examples:
+        start = time.perf_counter()
+        predictions.append(predict(example.text))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return score([e.intent for e in examples], predictions, latencies)
+
+
+def evaluate_fast(nlu_data, folds: int, seed: int, test_examples: Optional[List[NLUExample]]) -> List[Dict[str, Any]]:
+    rows = []
+
+    labels, predictions, latencies = [], [], []
+    split = stratified_folds(nlu_data.examples, folds, seed)
+    for i, held_out in enumerate(split):
+        train = [example for j, fold in enumerate(split) if j != i for example in fold]
+        model = train_fast_intent(nlu_data, train)
+        for example in held_out:
+            start = time.perf_counter()
+            predictions.append(model.predict(example.text)[0])
+            latencies.append((time.perf_counter() - start) * 1000)
+            labels.append(example.intent)
+    rows.append({"model": "fast", "split": f"{folds}-fold cv", **score(labels, predictions, latencies)})
+
+    start = time.perf_counter()
+    model = train_fast_intent(nlu_data)
+    train_seconds = time.perf_counter() - start
+    predict = lambda text: model.predict(text)[0]
+    rows.append({"model": "fast", "split": "train", **predict_all(predict, nlu_data.examples)})
+    if test_examples:
+        rows.append({"model": "fast", "split": "test", **predict_all(predict, test_examples)})
+    rows[-1]["train_seconds"] = round(train_seconds, 3)
+    return rows
+
+
+def evaluate_diet(model_path: str, nlu_data, test_examples: Optional[List[NLUExample]]) -> List[Dict[str, Any]]:
+    try:
+        from rasa.core.agent import Agent
+    except ImportError:
+        print("Rasa is not installed, skipping DIET")
+        return []
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    agent = Agent.load(model_path)
+    load_seconds = time.perf_counter() - start
+    loop = asyncio.new_event_loop()
+    predict = lambda text: (loop.run_until_complete(agent.parse_message(text)).get("intent") or {}).get("name")
+    # first parse builds the graph, keep it out of the latencies
+    predict("hello")
+
+    rows = [{"model": "diet", "split": "train", **predict_all(predict, nlu_data.examples)}]
+    if test_examples:
+        rows.append({"model": "diet", "split": "test", **predict_all(predict, test_examples)})
+    rows[-1]["load_seconds"] = round(load_seconds, 3)
+    rows[-1]["rss_mb"] = round(rss_mb() - rss_before, 1)
+    loop.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fast linear intent model with Rasa DIET.")
+    parser.add_argument("--nlu-path", default=NLU_DATA_PATH)
+    parser.add_argument("--test-file", help="held-out examples in nlu.yml format")
+    parser.add_argument("--rasa-model", default=RASA_MODEL_PATH)
+    parser.add_argument("--skip-diet", action="store_true")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()), format="[%(levelname)s][%(name)s] %(message)s")
+
+    nlu_data = load_nlu_data(args.nlu_path)
+    test_examples = load_nlu_data(args.test_file).examples if args.test_file else None
+
+    rows = evaluate_fast(nlu_data, args.folds, args.seed, test_examples)
+    if not args.skip_diet:
+        rows += evaluate_diet(args.rasa_model, nlu_data, test_examples)
+
+    print(format_table(rows, COLUMNS))
+    for row in rows:
+        extras = {key: row[key] for key in ("train_seconds", "load_seconds", "rss_mb") if key in row}
+        if extras:
+            print(f"{row['model']}: {extras}")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(rows, file, indent=2)
+        print(f"\nResults saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
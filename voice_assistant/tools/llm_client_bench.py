@@ -0,0 +1,288 @@
+"""
+LLM fallback latency: a new connection per call vs the shared keep-alive client.
+
+Starts a local mock provider (OpenAI-style chat completions over TLS with a
+self-signed certificate when openssl is available) behind a TCP proxy that
+delays every packet by half of --rtt-ms each way, so TCP and TLS handshakes
+cost real round trips. LLMIntent is then timed three ways:
+
+    requests      requests.post per call, as LLMIntent did before
+    shared-sync   recognize_intent over the shared client (executor threads)
+    shared-async  recognize_intent_async over the shared client
+
+    python -m tools.llm_client_bench
+    python -m tools.llm_client_bench --rtt-ms 40 --calls 50 --concurrency 8 --save llm_client.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+import requests
+import uvicorn
+from fastapi import FastAPI, Request
+
+from app.core.http_client import get_http_client, stop_http_client
+from app.core.loop_thread import get_background_loop
+from app.modules.intent.llm_intent import LLMIntent
+from tools.bench_utils import summarize, format_table
+
+COLUMNS = ["mode", "count", "mean", "p50", "p95", "p99", "max"]
+
+MOCK_REPLY = json.dumps({
+    "intent": "direct_response",
+    "confidence": 1.0,
+    "entities": {},
+    "reasoning": "mock provider",
+    "speech_response": "This is a mock answer."
+})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def self_signed_cert(directory: str) -> Optional[tuple]:
+    """(certfile, keyfile) for 127.0.0.1, or None without openssl."""
+    if not shutil.which("openssl"):
+        return None
+    certfile, keyfile = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", keyfile, "-out", certfile, "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1,DNS:localhost"],
+        check=True, capture_output=True
+    )
+    return certfile, keyfile
+
+
+def mock_provider(server_ms: float) -> FastAPI:
+    """OpenAI-style chat completions endpoint with a fixed think time."""
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        await request.body()
+        await asyncio.sleep(server_ms / 1000)
+        return {"choices": [{"message": {"role": "assistant", "content": MOCK_REPLY}}]}
+
+    @app.head("/")
+    async def root():
+        return {}
+
+    return app
+
+
+def start_mock(server_ms: float, cert: Optional[tuple]) -> int:
+    port = free_port()
+    config = uvicorn.Config(
+        mock_provider(server_ms), host="127.0.0.1", port=port, log_level="error",
+        ssl_certfile=cert[0] if cert else None, ssl_keyfile=cert[1] if cert else None
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, name="mock-provider", daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return port
+
+
+class LatencyProxy:
+    """TCP passthrough adding one-way delay to every chunk (and one round trip to connecting)."""
+
+    def __init__(self, target_port: int, rtt_ms: float):
+        self.target_port = target_port
+        self.delay = rtt_ms / 2000
+        self.connections = 0
+
+    async def _pipe(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                due, data = await chunks.get()
+                wait = due - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        delivery = asyncio.ensure_future(deliver())
+        try:
+            while True:
+                data = await reader.read(65536)
+                chunks.put_nowait((loop.time() + self.delay, data))
+                if not data:
+                    break
+        except ConnectionError:
+            chunks.put_nowait((loop.time(), b""))
+        await delivery
+
+    async def _handle(self, client_reader, client_writer):
+        self.connections += 1
+        # the SYN / SYN-ACK round trip
+        await asyncio.sleep(self.delay * 2)
+        upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", self.target_port)
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer),
+            self._pipe(upstream_reader, client_writer),
+            return_exceptions=True
+        )
+
+    async def _serve(self, port: int):
+        return await asyncio.start_server(self._handle, "127.0.0.1", port)
+
+    def start(self) -> int:
+        port = free_port()
+        get_background_loop("va-bench-proxy").run(self._serve(port))
+        return port
+
+
+class LegacyLLMIntent(LLMIntent):
+    """The provider call as it was: requests.post, a new connection every time."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, verify: Any = True):
+        super().__init__(config)
+        self.verify = verify
+
+    def _call_llm_provider(self, provider: str, prompt: str) -> Dict[str, Any]:
+        url, headers, data = self._request_builder(provider)(prompt)
+        response = requests.post(url, headers=headers, json=data, timeout=self.timeout, verify=self.verify)
+        return self._handle_response(provider, response)
+
+
+def time_sync(module: LLMIntent, calls: int) -> List[float]:
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        result = module.recognize_intent(f"what is the meaning of life {i}")
+        latencies.append((time.perf_counter() - start) * 1000)
+        if not result.get("success"):
+            raise SystemExit(f"Provider call failed: {result}")
+    return latencies
+
+
+def time_burst_sync(module: LLMIntent, calls: int, concurrency: int) -> float:
+    """Wall seconds for calls spread over concurrency threads (the llm executor)."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(lambda i: module.recognize_intent(f"question {i}"), range(calls)))
+    return time.perf_counter() - start
+
+
+async def _time_async(module: LLMIntent, calls: int) -> List[float]:
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await module.recognize_intent_async(f"what is the meaning of life {i}")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def _burst_async(module: LLMIntent, calls: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await module.recognize_intent_async(f"question {i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM provider call latency with and without the shared HTTP client.")
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="simulated network round trip")
+    parser.add_argument("--server-ms", type=float, default=50.0, help="mock provider think time")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel calls in the burst test")
+    parser.add_argument("--no-tls", action="store_true")
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()), format="[%(levelname)s][%(name)s] %(message)s")
+    os.environ.setdefault("OPENAI_API_KEY", "mock-key")
+
+    workdir = tempfile.mkdtemp(prefix="llm-bench-")
+    cert = None if args.no_tls else self_signed_cert(workdir)
+    mock_port = start_mock(args.server_ms, cert)
+    proxy = LatencyProxy(mock_port, args.rtt_ms)
+    proxy_port = proxy.start()
+    scheme = "https" if cert else "http"
+    url = f"{scheme}://127.0.0.1:{proxy_port}/v1/chat/completions"
+    print(f"Mock provider at {url} (rtt {args.rtt_ms} ms, think time {args.server_ms} ms, tls {bool(cert)})\n")
+
+    config = {"settings": {
+        "llm": {"provider": "chatgpt", "openai_api_url": url, "prewarm": True},
+        "http_client": {"ca_file": cert[0] if cert else None, "keepwarm_interval": 0}
+    }}
+
+    rows, report = [], {"rtt_ms": args.rtt_ms, "server_ms": args.server_ms, "tls": bool(cert), "modes": {}}
+
+    legacy = LegacyLLMIntent(config, verify=cert[0] if cert else True)
+    legacy.prewarm = False
+    legacy.initialize()
+    connections_before = proxy.connections
+    latencies = time_sync(legacy, args.calls)
+    burst = time_burst_sync(legacy, args.calls, args.concurrency)
+    report["modes"]["requests"] = {**summarize(latencies), "burst_seconds": round(burst, 3),
+                                   "connections": proxy.connections - connections_before}
+    rows.append({"mode": "requests", **summarize(latencies)})
+
+    shared = LLMIntent(config)
+    connections_before = proxy.connections
+    start = time.perf_counter()
+    shared.initialize()
+    init_ms = (time.perf_counter() - start) * 1000
+    latencies = time_sync(shared, args.calls)
+    burst = time_burst_sync(shared, args.calls, args.concurrency)
+    report["modes"]["shared-sync"] = {**summarize(latencies), "burst_seconds": round(burst, 3), "initialize_ms": round(init_ms, 1)}
+    rows.append({"mode": "shared-sync", **summarize(latencies)})
+
+    loop = asyncio.new_event_loop()
+    latencies = loop.run_until_complete(_time_async(shared, args.calls))
+    burst = loop.run_until_complete(_burst_async(shared, args.calls, args.concurrency))
+    loop.close()
+    report["modes"]["shared-async"] = {**summarize(latencies), "burst_seconds": round(burst, 3)}
+    report["modes"]["shared-async"]["connections"] = proxy.connections - connections_before
+    rows.append({"mode": "shared-async", **summarize(latencies)})
+    report["http_client"] = get_http_client().get_stats()
+
+    print(format_table(rows, COLUMNS))
+    print(f"\nburst of {args.calls} calls, {args.concurrency} at a time (s): "
+          + ", ".join(f"{mode} {stats['burst_seconds']}" for mode, stats in report["modes"].items()))
+    print(f"connections opened: requests {report['modes']['requests']['connections']}, "
+          f"shared {report['modes']['shared-async']['connections']} (pre-warmed during initialize, "
+          f"{report['modes']['shared-sync']['initialize_ms']} ms)")
+    saving = report["modes"]["requests"]["p50"] - report["modes"]["shared-async"]["p50"]
+    print(f"p50 saving per fallback: {saving:.1f} ms   protocol: {report['http_client']['http_versions']}")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResults saved to {args.save}")
+
+    # the proxy loop keeps its connections until the process exits
+    stop_http_client()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
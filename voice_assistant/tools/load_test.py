@@ -0,0 +1,230 @@
+"""
+Concurrent HTTP load generator for the API server.
+
+Closed loop: N workers each send the next request as soon as the previous
+one returns. Open loop: requests arrive at a fixed average rate (Poisson)
+whether or not earlier ones finished, which exposes queueing. A sweep runs
+several levels and reports where throughput stops growing (saturation).
+
+Runs offline against a server using the stand-in modules:
+
+    VA_CONFIG=config.offline.yaml python run_server.py
+    python -m tools.load_test --endpoint process_intent --sweep 1,2,4,8,16,32
+    python -m tools.load_test --mode open --sweep 5,10,20,40 --duration 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+from app.constants import NLU_DATA_PATH
+from tools.bench_utils import summarize, format_table
+
+ENDPOINTS = {
+    "process_intent": "/process_intent",
+    "test_intent": "/test/intent",
+    "test_tts": "/test/tts"
+}
+
+LEVEL_COLUMNS = ["level", "sent", "ok", "errors", "rejected", "timeouts", "error_%", "rps", "p50", "p95", "p99", "max"]
+
+
+class LevelResult:
+    """Outcome of one load level."""
+
+    def __init__(self, level: float):
+        self.level = level
+        self.latencies: List[float] = []
+        self.sent = 0
+        self.ok = 0
+        self.errors = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.elapsed = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        latency = summarize(self.latencies)
+        return {
+            "level": self.level,
+            "sent": self.sent,
+            "ok": self.ok,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "error_%": round((self.errors + self.rejected + self.timeouts) / self.sent * 100, 2) if self.sent else 0.0,
+            "rps": round(self.ok / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50": latency["p50"],
+            "p95": latency["p95"],
+            "p99": latency["p99"],
+            "max": latency["max"]
+        }
+
+
+def load_texts(args) -> List[str]:
+    if args.texts_file:
+        with open(args.texts_file) as file:
+            return [line.strip() for line in file if line.strip()]
+    from app.modules.intent.nlu_data import load_nlu_data
+    return [example.text for example in load_nlu_data(args.nlu_path).examples]
+
+
+async def send(client: httpx.AsyncClient, path: str, text: str, result: LevelResult):
+    """One request; latency is recorded for successful responses only."""
+    result.sent += 1
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, json={"text": text})
+    except httpx.TimeoutException:
+        result.timeouts += 1
+        return
+    except httpx.HTTPError:
+        result.errors += 1
+        return
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    if response.status_code == 429:
+        result.rejected += 1
+        return
+    if response.status_code >= 400:
+        result.errors += 1
+        return
+    try:
+        body = response.json()
+    except ValueError:
+        body = {}
+    if isinstance(body, dict) and body.get("success") is False:
+        result.errors += 1
+        return
+    result.ok += 1
+    result.latencies.append(latency_ms)
+
+
+async def run_closed(client, path: str, texts: List[str], concurrency: int, duration: float, max_requests: Optional[int]) -> LevelResult:
+    result = LevelResult(concurrency)
+    deadline = time.perf_counter() + duration
+    counter = iter(range(max_requests)) if max_requests else None
+
+    async def worker(offset: int):
+        i = offset
+        while time.perf_counter() < deadline:
+            if counter is not None and next(counter, None) is None:
+                return
+            await send(client, path, texts[i % len(texts)], result)
+            i += concurrency
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+async def run_open(client, path: str, texts: List[str], rate: float, duration: float, max_outstanding: int) -> LevelResult:
+    result = LevelResult(rate)
+    tasks = set()
+    start = time.perf_counter()
+    next_arrival = start
+    i = 0
+    while next_arrival - start < duration:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_outstanding:
+            # the client itself is saturated, count it against the server
+            result.sent += 1
+            result.timeouts += 1
+        else:
+            task = asyncio.ensure_future(send(client, path, texts[i % len(texts)], result))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        i += 1
+        next_arrival += random.expovariate(rate)
+    if tasks:
+        await asyncio.gather(*tasks)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def find_saturation(results: List[Dict[str, Any]], min_gain: float, max_error_pct: float) -> Optional[Dict[str, Any]]:
+    """First level where throughput gains less than min_gain, or errors exceed max_error_pct."""
+    best = None
+    for row in results:
+        if row["error_%"] > max_error_pct:
+            return best or row
+        if best and row["rps"] < best["rps"] * (1 + min_gain):
+            return best
+        best = row
+    return None
+
+
+async def run(args):
+    path = ENDPOINTS[args.endpoint]
+    texts = load_texts(args)
+    if args.shuffle:
+        random.Random(args.seed).shuffle(texts)
+    levels = [float(level) for level in args.sweep.split(",")] if args.sweep else [float(args.concurrency if args.mode == "closed" else args.rate)]
+
+    limits = httpx.Limits(max_connections=args.max_outstanding, max_keepalive_connections=args.max_outstanding)
+    results = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        health = await client.get("/health")
+        print(f"Server: {args.url} {health.status_code} {health.json()}")
+        print(f"Endpoint: {path}   mode: {args.mode}   {len(texts)} texts   {args.duration}s per level\n")
+
+        for level in levels:
+            if args.mode == "closed":
+                result = await run_closed(client, path, texts, int(level), args.duration, args.requests)
+            else:
+                result = await run_open(client, path, texts, level, args.duration, args.max_outstanding)
+            row = result.to_dict()
+            results.append(row)
+            print(format_table([row], LEVEL_COLUMNS))
+            print()
+            if args.pause:
+                await asyncio.sleep(args.pause)
+
+    print(format_table(results, LEVEL_COLUMNS))
+    saturation = find_saturation(results, args.min_gain, args.max_error)
+    if saturation:
+        unit = "concurrency" if args.mode == "closed" else "req/s offered"
+        print(f"\nSaturation at {unit} {saturation['level']:g}: {saturation['rps']} req/s, p95 {saturation['p95']} ms")
+    else:
+        print("\nNo saturation reached, try higher levels")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"endpoint": path, "mode": args.mode, "levels": results, "saturation": saturation}, file, indent=2)
+        print(f"Results saved to {args.save}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the voice assistant API with concurrent load.")
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="process_intent")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=4, help="closed loop workers")
+    parser.add_argument("--rate", type=float, default=5.0, help="open loop arrivals per second")
+    parser.add_argument("--sweep", help="comma separated levels (concurrency or rate) to run in turn")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--requests", type=int, help="closed loop: stop after this many requests per level")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-outstanding", type=int, default=256, help="client-side connection/in-flight cap")
+    parser.add_argument("--pause", type=float, default=1.0, help="seconds between levels")
+    parser.add_argument("--texts-file", help="one utterance per line (default: nlu.yml examples)")
+    parser.add_argument("--nlu-path", default=NLU_DATA_PATH)
+    parser.add_argument("--shuffle", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-gain", type=float, default=0.05, help="throughput gain below which a level counts as saturated")
+    parser.add_argument("--max-error", type=float, default=1.0, help="error percentage that counts as saturated")
+    parser.add_argument("--save", help="write the results as JSON")
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
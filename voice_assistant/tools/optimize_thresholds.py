@@ -0,0 +1,234 @@
+"""
+Per-intent LLM fallback thresholds for the local intent module.
+
+Replays labelled utterances (nlu.yml format) through the configured
+local_intent module and, for every predicted intent, sweeps the fallback
+threshold: a prediction at or below it goes to the LLM. Each point of the
+curve gives local precision, recall and the fallback rate. The chosen
+threshold is the one with the fewest fallbacks whose expected accuracy is
+no worse than the global INTENT_CONFIDENCE_THRESHOLD's, with fallbacks
+assumed correct --llm-accuracy of the time.
+
+The result is merged into the thresholds file under the module's class
+name; RequestProcessor picks it up on the next start (or POST
+/admin/thresholds/reload). Scoring on the data the model was trained on is
+optimistic, pass a held-out file with --data where you have one.
+
+    python -m tools.optimize_thresholds --dry-run
+    python -m tools.optimize_thresholds --data held_out.yml --llm-accuracy 0.95 --report curves.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import Dict, Any, List
+
+from app.core.config import Config
+from app.core.module_loader import create_module
+from app.core.intent_thresholds import module_key
+from app.modules.intent.nlu_data import load_nlu_data
+from app.modules.intent.gazetteer import get_gazetteer
+from app.modules.intent.intents import OUT_OF_SCOPE, DEVICE_INTENTS
+from app.constants import NLU_DATA_PATH, INTENT_CONFIDENCE_THRESHOLD, INTENT_THRESHOLDS_PATH
+from tools.bench_utils import format_table
+
+COLUMNS = ["intent", "support", "predicted", "threshold", "fallback_rate", "tuned", "tuned_fallback_rate", "precision", "recall"]
+
+
+def replay(module, examples) -> List[Dict[str, Any]]:
+    """Local prediction for every labelled example. Forced fallbacks do not depend on the threshold."""
+    gazetteer = get_gazetteer()
+    rows = []
+    for example in examples:
+        result = module.recognize_intent(example.text)
+        intent = result.get("intent", "")
+        entities = result.get("entities", {}) or {}
+        if intent in DEVICE_INTENTS:
+            entities = gazetteer.resolve(example.text, entities)
+        forced = bool(result.get("error")) or intent == OUT_OF_SCOPE or (intent in DEVICE_INTENTS and not entities.get("device"))
+        rows.append({
+            "text": example.text,
+            "label": example.intent,
+            "intent": intent,
+            "confidence": float(result.get("confidence", 0) or 0),
+            "forced": forced
+        })
+    return rows
+
+
+def sweep(rows: List[Dict[str, Any]], intent: str, support: int, llm_accuracy: float) -> List[Dict[str, Any]]:
+    """Curve over the cut points of one predicted intent, lowest threshold first."""
+    predicted = sorted((row for row in rows if row["intent"] == intent and not row["forced"]), key=lambda row: row["confidence"])
+    cuts = [0.0] + sorted({row["confidence"] for row in predicted})
+    curve = []
+    for cut in cuts:
+        accepted = [row for row in predicted if row["confidence"] > cut]
+        correct = sum(row["label"] == intent for row in accepted)
+        fallbacks = len(predicted) - len(accepted)
+        curve.append({
+            "cut": cut,
+            "accepted": len(accepted),
+            "fallbacks": fallbacks,
+            "fallback_rate": round(fallbacks / len(predicted), 4) if predicted else 0.0,
+            "precision": round(correct / len(accepted), 4) if accepted else 1.0,
+            "recall": round(correct / support, 4) if support else 0.0,
+            "expected_correct": correct + llm_accuracy * fallbacks
+        })
+    return curve
+
+
+def point_at(curve: List[Dict[str, Any]], threshold: float) -> Dict[str, Any]:
+    """Curve point a threshold falls on (the highest cut not above it)."""
+    point = curve[0]
+    for candidate in curve:
+        if candidate["cut"] <= threshold:
+            point = candidate
+    return point
+
+
+def choose_threshold(curve: List[Dict[str, Any]], baseline: float, min_precision: float,
+                     floor: float, ceiling: float) -> float:
+    """Fewest fallbacks without losing expected accuracy; placed midway to the next accepted confidence."""
+    reference = point_at(curve, baseline)
+    for index, point in enumerate(curve):
+        if point["expected_correct"] + 1e-9 < reference["expected_correct"]:
+            continue
+        if point["accepted"] and point["precision"] < min_precision:
+            continue
+        # the cut is the highest confidence that falls back; leave a margin below the next one
+        upper = curve[index + 1]["cut"] if index + 1 < len(curve) else point["cut"]
+        threshold = (point["cut"] + upper) / 2 if upper > point["cut"] else point["cut"]
+        return round(min(ceiling, max(floor, threshold)), 4)
+    return baseline
+
+
+def totals(rows: List[Dict[str, Any]], thresholds: Dict[str, float], default: float, llm_accuracy: float) -> Dict[str, Any]:
+    """Expected accuracy and fallback rate of the whole corpus under a set of thresholds."""
+    fallbacks = 0
+    correct = 0.0
+    for row in rows:
+        if row["forced"] or row["confidence"] <= thresholds.get(row["intent"], default):
+            fallbacks += 1
+            correct += llm_accuracy
+        else:
+            correct += row["label"] == row["intent"]
+    return {
+        "examples": len(rows),
+        "fallback_rate": round(fallbacks / len(rows), 4) if rows else 0.0,
+        "expected_accuracy": round(correct / len(rows), 4) if rows else 0.0
+    }
+
+
+def optimize(rows: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    support: Dict[str, int] = {}
+    for row in rows:
+        support[row["label"]] = support.get(row["label"], 0) + 1
+
+    thresholds: Dict[str, float] = {}
+    table, curves = [], {}
+    for intent in sorted({row["intent"] for row in rows if not row["forced"]}):
+        curve = sweep(rows, intent, support.get(intent, 0), args.llm_accuracy)
+        predicted = curve[0]["accepted"]
+        if predicted < args.min_support:
+            tuned = args.default
+        else:
+            tuned = choose_threshold(curve, args.default, args.min_precision, args.floor, args.ceiling)
+            thresholds[intent] = tuned
+        before, after = point_at(curve, args.default), point_at(curve, tuned)
+        curves[intent] = curve
+        table.append({
+            "intent": intent,
+            "support": support.get(intent, 0),
+            "predicted": predicted,
+            "threshold": args.default,
+            "fallback_rate": before["fallback_rate"],
+            "tuned": tuned if intent in thresholds else f"{tuned} (n<{args.min_support})",
+            "tuned_fallback_rate": after["fallback_rate"],
+            "precision": after["precision"],
+            "recall": after["recall"]
+        })
+
+    return {
+        "thresholds": thresholds,
+        "table": table,
+        "curves": curves,
+        "global": totals(rows, {}, args.default, args.llm_accuracy),
+        "tuned": totals(rows, thresholds, args.default, args.llm_accuracy)
+    }
+
+
+def write_thresholds(path: str, module, result: Dict[str, Any], args):
+    """Merge this module's table into the thresholds file."""
+    try:
+        with open(path, 'r') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        data = {}
+    data.setdefault("modules", {})[module_key(module)] = {
+        "default": args.default,
+        "intents": result["thresholds"],
+        "model_version": getattr(module, "model_version", None),
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "data": args.data,
+        "llm_accuracy": args.llm_accuracy,
+        "min_precision": args.min_precision,
+        "expected": {"global": result["global"], "tuned": result["tuned"]}
+    }
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune per-intent LLM fallback thresholds for the local intent module.")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--module", default="local_intent", help="module name in the config")
+    parser.add_argument("--data", action="append", help="labelled utterances in nlu.yml format (repeatable)")
+    parser.add_argument("--default", type=float, default=INTENT_CONFIDENCE_THRESHOLD, help="global threshold to beat")
+    parser.add_argument("--llm-accuracy", type=float, default=1.0, help="assumed accuracy of LLM fallbacks")
+    parser.add_argument("--min-precision", type=float, default=0.9, help="local precision an intent must keep")
+    parser.add_argument("--min-support", type=int, default=3, help="predictions needed before an intent gets its own threshold")
+    parser.add_argument("--floor", type=float, default=0.2)
+    parser.add_argument("--ceiling", type=float, default=0.99)
+    parser.add_argument("--output", default=INTENT_THRESHOLDS_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="print the thresholds without writing them")
+    parser.add_argument("--report", help="write the per-intent curves as JSON")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args()
+    args.data = args.data or [NLU_DATA_PATH]
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()), format="[%(levelname)s][%(name)s] %(message)s")
+
+    config = Config(args.config)
+    # the replay needs the complete module, not a partially loaded one
+    config.config_data.setdefault('settings', {}).setdefault('startup', {})['background_loading'] = False
+    get_gazetteer(config.config_data)
+    module = create_module(config.get_module_config(args.module), config.config_data)
+    if hasattr(module, 'initialize') and not module.initialize():
+        raise SystemExit(f"{args.module} failed to initialize")
+
+    examples = [example for path in args.data for example in load_nlu_data(path).examples]
+    if not examples:
+        raise SystemExit("No labelled examples")
+
+    start = time.perf_counter()
+    rows = replay(module, examples)
+    replay_seconds = time.perf_counter() - start
+    result = optimize(rows, args)
+
+    print(f"{module_key(module)} on {len(rows)} examples ({replay_seconds:.1f}s)\n")
+    print(format_table(result["table"], COLUMNS))
+    print(f"\nglobal {args.default}: {result['global']}")
+    print(f"per-intent:  {result['tuned']}")
+
+    if args.report:
+        with open(args.report, 'w') as file:
+            json.dump({key: result[key] for key in ("thresholds", "curves", "global", "tuned")}, file, indent=2)
+        print(f"\nCurves saved to {args.report}")
+    if not args.dry_run:
+        write_thresholds(args.output, module, result, args)
+        print(f"\nThresholds for {module_key(module)} written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
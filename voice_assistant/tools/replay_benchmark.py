@@ -0,0 +1,215 @@
+"""
+Replay benchmark for the request pipeline.
+
+Replays a corpus of utterances (nlu.yml examples or the interaction log)
+through RequestProcessor with the modules from a config file, normally
+config.benchmark.yaml: real Rasa/Piper with stub LLM, MQTT and audio output.
+Reports p50/p95/p99 per stage, throughput and memory, and can compare
+against a saved baseline to catch regressions.
+
+    python -m tools.replay_benchmark --config config.benchmark.yaml --repeat 3
+    python -m tools.replay_benchmark --save baseline.json
+    python -m tools.replay_benchmark --compare baseline.json --max-regression 10
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict, Any, List
+
+from app.core.config import Config
+from app.core.module_loader import ModuleLoader
+from app.core.processor import RequestProcessor
+from app.core.intent_cache import get_intent_cache
+from app.modules.intent.gazetteer import get_gazetteer
+from app.core.intent_thresholds import get_intent_thresholds
+from app.core.intent_router import get_intent_router
+from app.core.tracing import get_tracer, trace
+from app.modules.tts.playback import start_playback_worker, stop_playback_worker
+from app.constants import NLU_DATA_PATH
+from tools.bench_utils import summarize, rss_mb, peak_rss_mb, format_table
+
+STAGE_COLUMNS = ["stage", "count", "mean", "p50", "p95", "p99", "max"]
+
+
+def load_corpus(args) -> List[str]:
+    """Utterances to replay, in order."""
+    if args.source == "log":
+        from app.core.interaction_log import read_interactions
+        texts = [row["text"] for row in read_interactions(args.log_path, limit=args.limit) if row.get("text")]
+    else:
+        from app.modules.intent.nlu_data import load_nlu_data
+        examples = load_nlu_data(args.nlu_path).examples
+        if args.intents:
+            wanted = set(args.intents.split(","))
+            examples = [e for e in examples if e.intent in wanted]
+        texts = [e.text for e in examples]
+    if args.limit:
+        texts = texts[:args.limit]
+    return texts
+
+
+def run_one(text: str, modules: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one utterance through the full pipeline, return its stage timings."""
+    processor = RequestProcessor(
+        text,
+        modules.get('local_intent'),
+        modules.get('llm_intent'),
+        modules.get('actions'),
+        modules.get('tts')
+    )
+    with trace("benchmark", text=text) as request_trace:
+        error = None
+        try:
+            processor.process_intent()
+            processor.process_action()
+            processor.process_speechresponse()
+        except Exception as e:
+            error = str(e)
+    timings = request_trace.stage_timings() if request_trace else {}
+    timings["total"] = request_trace.root.duration_ms if request_trace else 0.0
+    return {
+        "timings": timings,
+        "intent": processor.intent,
+        "llm_fallback_used": processor.llm_fallback_used,
+        "answered_by": processor.answered_by,
+        "error": error
+    }
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    config = Config(args.config)
+    settings = config.config_data.setdefault('settings', {})
+    # every replay must reach the models
+    settings.setdefault('intent_cache', {})['enabled'] = args.cache
+    settings.setdefault('tracing', {})['enabled'] = True
+    settings['tracing'].pop('file', None)
+    settings['tracing'].pop('otlp_endpoint', None)
+
+    get_intent_cache(config.config_data)
+    get_gazetteer(config.config_data)
+    get_intent_thresholds(config.config_data)
+    get_tracer(config.config_data)
+    start_playback_worker(config.config_data)
+
+    rss_start = rss_mb()
+    load_start = time.perf_counter()
+    modules = ModuleLoader(config).load_all_modules()
+    get_intent_router(config.config_data).bind(modules)
+    load_seconds = time.perf_counter() - load_start
+    rss_loaded = rss_mb()
+
+    corpus = load_corpus(args)
+    if not corpus:
+        raise SystemExit("Corpus is empty")
+
+    for text in corpus[:args.warmup]:
+        run_one(text, modules)
+
+    stage_values: Dict[str, List[float]] = {}
+    fallbacks = 0
+    errors = 0
+    intents: Dict[str, int] = {}
+    answered_by: Dict[str, int] = {}
+
+    wall_start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in corpus:
+            result = run_one(text, modules)
+            for stage, value in result["timings"].items():
+                stage_values.setdefault(stage, []).append(value)
+            fallbacks += int(result["llm_fallback_used"])
+            errors += int(result["error"] is not None)
+            intents[str(result["intent"])] = intents.get(str(result["intent"]), 0) + 1
+            answered_by[str(result["answered_by"])] = answered_by.get(str(result["answered_by"]), 0) + 1
+    wall_seconds = time.perf_counter() - wall_start
+    requests = len(corpus) * args.repeat
+
+    stop_playback_worker()
+
+    return {
+        "config": args.config,
+        "corpus": {"source": args.source, "size": len(corpus)},
+        "requests": requests,
+        "errors": errors,
+        "llm_fallbacks": fallbacks,
+        "intents": intents,
+        "answered_by": answered_by,
+        "module_load_seconds": round(load_seconds, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(requests / wall_seconds, 3) if wall_seconds else 0.0,
+        "rss_mb": {"start": rss_start, "after_load": rss_loaded, "end": rss_mb(), "peak": peak_rss_mb()},
+        "stages": {stage: summarize(values) for stage, values in sorted(stage_values.items())}
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\nReplayed {report['requests']} requests ({report['corpus']['size']} utterances from {report['corpus']['source']})")
+    print(f"Throughput: {report['throughput_rps']} req/s   errors: {report['errors']}   LLM fallbacks: {report['llm_fallbacks']}")
+    print(f"Answered by: {report.get('answered_by', {})}")
+    print(f"Module load: {report['module_load_seconds']}s   RSS MB: {report['rss_mb']}\n")
+    rows = [{"stage": stage, **summary} for stage, summary in report["stages"].items()]
+    print(format_table(rows, STAGE_COLUMNS))
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> bool:
+    """Print p95 deltas against the baseline. Returns False on a regression."""
+    ok = True
+    rows = []
+    for stage, summary in report["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base or not base.get("p95"):
+            continue
+        delta = (summary["p95"] - base["p95"]) / base["p95"] * 100
+        regressed = delta > max_regression
+        ok = ok and not regressed
+        rows.append({
+            "stage": stage,
+            "base_p95": base["p95"],
+            "p95": summary["p95"],
+            "delta_%": round(delta, 1),
+            "status": "REGRESSION" if regressed else "ok"
+        })
+    print(f"\nComparison with baseline (max p95 regression {max_regression}%):")
+    print(format_table(rows, ["stage", "base_p95", "p95", "delta_%", "status"]))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay utterances through the voice pipeline and report stage latencies.")
+    parser.add_argument("--config", default="config.benchmark.yaml", help="config file with the modules to benchmark")
+    parser.add_argument("--source", choices=["nlu", "log"], default="nlu", help="corpus: nlu.yml examples or the interaction log")
+    parser.add_argument("--nlu-path", default=NLU_DATA_PATH)
+    parser.add_argument("--log-path", default="logs/interactions.db")
+    parser.add_argument("--intents", help="comma separated intents to keep (nlu source)")
+    parser.add_argument("--limit", type=int, help="max utterances from the corpus")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the corpus")
+    parser.add_argument("--warmup", type=int, default=5, help="utterances run before measuring")
+    parser.add_argument("--cache", action="store_true", help="keep the intent cache enabled")
+    parser.add_argument("--save", help="write the report as JSON")
+    parser.add_argument("--compare", help="baseline JSON report to compare p95 latencies with")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="allowed p95 increase in percent")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()), format="[%(levelname)s][%(name)s] %(message)s")
+
+    report = run_benchmark(args)
+    print_report(report)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nReport saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if not compare(report, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()